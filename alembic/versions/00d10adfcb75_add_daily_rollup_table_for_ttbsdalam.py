@@ -0,0 +1,125 @@
+"""add daily rollup table for TTbsDalam
+
+Revision ID: 00d10adfcb75
+Revises: b5015e702e09
+Create Date: 2026-10-18 09:12:41.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '00d10adfcb75'
+down_revision: Union[str, None] = 'b5015e702e09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Nama tabel sumber seperti dibuat migrasi baseline (b5015e702e09); penting
+# untuk MySQL dengan lower_case_table_names=0
+SOURCE_TABLE = 'TTbsDalam'
+
+TRIGGER_NAMES = (
+    "trg_ttbsdalam_harian_ai",
+    "trg_ttbsdalam_harian_au",
+    "trg_ttbsdalam_harian_ad",
+)
+
+# Tambah satu tiket (NEW) ke baris rekap yang sesuai
+_ADD_NEW_ROW = """
+    IF NEW.TglTransaksiOne IS NOT NULL THEN
+        INSERT INTO ttbsdalamharian
+            (TglTransaksiOne, NamaKebun, NamaProduk, Divisi, Total, JumlahTiket, JumlahJanjang)
+        VALUES
+            (NEW.TglTransaksiOne, COALESCE(NEW.NamaKebun, ''), COALESCE(NEW.NamaProduk, ''),
+             COALESCE(NEW.Divisi, ''), COALESCE(NEW.Total, 0), 1, COALESCE(NEW.JumlahJanjang, 0))
+        ON DUPLICATE KEY UPDATE
+            Total = Total + COALESCE(NEW.Total, 0),
+            JumlahTiket = JumlahTiket + 1,
+            JumlahJanjang = JumlahJanjang + COALESCE(NEW.JumlahJanjang, 0);
+    END IF;
+"""
+
+# Kurangi satu tiket (OLD) dari baris rekap, hapus baris jika tiketnya habis
+_REMOVE_OLD_ROW = """
+    IF OLD.TglTransaksiOne IS NOT NULL THEN
+        UPDATE ttbsdalamharian
+        SET Total = Total - COALESCE(OLD.Total, 0),
+            JumlahTiket = JumlahTiket - 1,
+            JumlahJanjang = JumlahJanjang - COALESCE(OLD.JumlahJanjang, 0)
+        WHERE TglTransaksiOne = OLD.TglTransaksiOne
+          AND NamaKebun = COALESCE(OLD.NamaKebun, '')
+          AND NamaProduk = COALESCE(OLD.NamaProduk, '')
+          AND Divisi = COALESCE(OLD.Divisi, '');
+        DELETE FROM ttbsdalamharian
+        WHERE TglTransaksiOne = OLD.TglTransaksiOne
+          AND NamaKebun = COALESCE(OLD.NamaKebun, '')
+          AND NamaProduk = COALESCE(OLD.NamaProduk, '')
+          AND Divisi = COALESCE(OLD.Divisi, '')
+          AND JumlahTiket <= 0;
+    END IF;
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Tabel bisa saja sudah dibuat oleh Base.metadata.create_all saat startup
+    if not inspector.has_table('ttbsdalamharian'):
+        op.create_table('ttbsdalamharian',
+        sa.Column('TglTransaksiOne', sa.Date(), nullable=False),
+        sa.Column('NamaKebun', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('NamaProduk', sa.String(length=100), nullable=False, server_default=''),
+        sa.Column('Divisi', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('Total', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('JumlahTiket', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('JumlahJanjang', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('TglTransaksiOne', 'NamaKebun', 'NamaProduk', 'Divisi')
+        )
+
+    # Backfill dari data mentah
+    op.execute("DELETE FROM ttbsdalamharian")
+    op.execute(
+        f"""
+        INSERT INTO ttbsdalamharian
+            (TglTransaksiOne, NamaKebun, NamaProduk, Divisi, Total, JumlahTiket, JumlahJanjang)
+        SELECT TglTransaksiOne,
+               COALESCE(NamaKebun, ''), COALESCE(NamaProduk, ''), COALESCE(Divisi, ''),
+               COALESCE(SUM(Total), 0), COUNT(*), COALESCE(SUM(JumlahJanjang), 0)
+        FROM {SOURCE_TABLE}
+        WHERE TglTransaksiOne IS NOT NULL
+        GROUP BY TglTransaksiOne,
+                 COALESCE(NamaKebun, ''), COALESCE(NamaProduk, ''), COALESCE(Divisi, '')
+        """
+    )
+
+    # Trigger hanya untuk MySQL (sumber data produksi dari aplikasi timbangan)
+    if bind.dialect.name != 'mysql':
+        return
+
+    for name in TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    op.execute(
+        f"CREATE TRIGGER trg_ttbsdalam_harian_ai AFTER INSERT ON {SOURCE_TABLE} "
+        f"FOR EACH ROW BEGIN {_ADD_NEW_ROW} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER trg_ttbsdalam_harian_au AFTER UPDATE ON {SOURCE_TABLE} "
+        f"FOR EACH ROW BEGIN {_REMOVE_OLD_ROW} {_ADD_NEW_ROW} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER trg_ttbsdalam_harian_ad AFTER DELETE ON {SOURCE_TABLE} "
+        f"FOR EACH ROW BEGIN {_REMOVE_OLD_ROW} END"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        for name in TRIGGER_NAMES:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('ttbsdalamharian')
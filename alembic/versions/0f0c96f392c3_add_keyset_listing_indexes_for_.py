@@ -0,0 +1,56 @@
+"""add keyset listing indexes for transaction tables
+
+Revision ID: 0f0c96f392c3
+Revises: cc92dcddc17c
+Create Date: 2026-10-18 17:24:29.369419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f0c96f392c3'
+down_revision: Union[str, None] = 'cc92dcddc17c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index keyset (tanggal, waktu, NoTransaksi) DESC untuk /transactions/lintas;
+    # tiga tabel lainnya sudah punya index yang sama dari cc92dcddc17c
+    op.create_index(
+        'idx_ttranslintas_tgl_time_desc',
+        'TTransLintas',
+        [sa.text('TglTmb1 DESC'), sa.text('TimeTmb1 DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+    # Listing yang difilter kebun: kolom kebun di depan supaya keyset tetap
+    # membaca index secara berurutan tanpa menyaring tiket kebun lain
+    op.create_index(
+        'idx_ttbsdalam_kebun_tgl_time_desc',
+        'TTbsDalam',
+        ['NamaKebun', sa.text('TglTransaksiOne DESC'), sa.text('TimeTmbOne DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+    op.create_index(
+        'idx_ttranslintaskeluar_asal_tgl_time_desc',
+        'TTransLintasKeluar',
+        ['Asal', sa.text('TglTmb1 DESC'), sa.text('TimeTmb1 DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+    op.create_index(
+        'idx_ttranspemasaran_asal_tgl_time_desc',
+        'TTransPemasaran',
+        ['Asal', sa.text('TglTmb1 DESC'), sa.text('TimeTmb1 DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ttranspemasaran_asal_tgl_time_desc', table_name='TTransPemasaran')
+    op.drop_index('idx_ttranslintaskeluar_asal_tgl_time_desc', table_name='TTransLintasKeluar')
+    op.drop_index('idx_ttbsdalam_kebun_tgl_time_desc', table_name='TTbsDalam')
+    op.drop_index('idx_ttranslintas_tgl_time_desc', table_name='TTransLintas')
@@ -0,0 +1,109 @@
+"""add mkalender date dimension
+
+Revision ID: 4e7c1d2a9b30
+Revises: 0f0c96f392c3
+Create Date: 2026-10-18 19:05:12.418230
+
+"""
+import os
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7c1d2a9b30'
+down_revision: Union[str, None] = '0f0c96f392c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rentang dimensi (CALENDAR_START/END di app/services/calendar.py); trend di luar ini ditolak 422
+BACKFILL_START = date(2015, 1, 1)
+BACKFILL_END = date(2035, 12, 31)
+
+BUCKET_COLUMNS = (
+    'minggu_mulai',
+    'bulan_mulai',
+    'kuartal_mulai',
+    'tahun_mulai',
+    'kuartal_fiskal_mulai',
+    'tahun_fiskal_mulai',
+)
+
+# Sama dengan FISCAL_YEAR_START_MONTH aplikasi (environment, default Januari). Migrasi
+# tidak mengimpor kode aplikasi; isi tabel dibekukan sesuai aturan saat revisi ini.
+FISCAL_START_MONTH = int(os.environ.get('FISCAL_YEAR_START_MONTH', 1))
+
+
+def add_months(day: date, months: int) -> date:
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def calendar_row(tanggal: date, fiscal_start_month: int) -> dict:
+    # Tahun fiskal dinamai menurut tahun berakhirnya (mulai Juli: Jul 2025 - Jun 2026 = FY2026)
+    iso = tanggal.isocalendar()
+    bulan_mulai = tanggal.replace(day=1)
+    offset = (tanggal.month - fiscal_start_month) % 12
+    tahun_fiskal_mulai = add_months(bulan_mulai, -offset)
+    return {
+        'tanggal': tanggal,
+        'tahun': tanggal.year,
+        'kuartal': (tanggal.month - 1) // 3 + 1,
+        'bulan': tanggal.month,
+        'minggu_iso': iso.week,
+        'hari_iso': iso.weekday,
+        'minggu_mulai': tanggal - timedelta(days=iso.weekday - 1),
+        'bulan_mulai': bulan_mulai,
+        'kuartal_mulai': date(tanggal.year, (tanggal.month - 1) // 3 * 3 + 1, 1),
+        'tahun_mulai': date(tanggal.year, 1, 1),
+        'tahun_fiskal': tahun_fiskal_mulai.year + (1 if fiscal_start_month > 1 else 0),
+        'periode_fiskal': offset + 1,
+        'kuartal_fiskal_mulai': add_months(tahun_fiskal_mulai, offset // 3 * 3),
+        'tahun_fiskal_mulai': tahun_fiskal_mulai,
+    }
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # Tabel bisa saja sudah dibuat oleh Base.metadata.create_all saat startup
+    if not inspector.has_table('mkalender'):
+        op.create_table('mkalender',
+        sa.Column('tanggal', sa.Date(), nullable=False),
+        sa.Column('tahun', sa.SmallInteger(), nullable=False),
+        sa.Column('kuartal', sa.SmallInteger(), nullable=False),
+        sa.Column('bulan', sa.SmallInteger(), nullable=False),
+        sa.Column('minggu_iso', sa.SmallInteger(), nullable=False),
+        sa.Column('hari_iso', sa.SmallInteger(), nullable=False),
+        sa.Column('minggu_mulai', sa.Date(), nullable=False),
+        sa.Column('bulan_mulai', sa.Date(), nullable=False),
+        sa.Column('kuartal_mulai', sa.Date(), nullable=False),
+        sa.Column('tahun_mulai', sa.Date(), nullable=False),
+        sa.Column('tahun_fiskal', sa.Integer(), nullable=False),
+        sa.Column('periode_fiskal', sa.SmallInteger(), nullable=False),
+        sa.Column('kuartal_fiskal_mulai', sa.Date(), nullable=False),
+        sa.Column('tahun_fiskal_mulai', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('tanggal')
+        )
+        for column in BUCKET_COLUMNS:
+            op.create_index(op.f(f'ix_mkalender_{column}'), 'mkalender', [column], unique=False)
+
+    # Isi ulang agar periode fiskal mengikuti FISCAL_YEAR_START_MONTH saat ini
+    table = sa.table('mkalender', *(sa.column(name) for name in (
+        'tanggal', 'tahun', 'kuartal', 'bulan', 'minggu_iso', 'hari_iso', 'tahun_fiskal', 'periode_fiskal',
+    ) + BUCKET_COLUMNS))
+    op.execute("DELETE FROM mkalender")
+    days = (BACKFILL_END - BACKFILL_START).days + 1
+    op.bulk_insert(table, [
+        calendar_row(BACKFILL_START + timedelta(days=i), FISCAL_START_MONTH) for i in range(days)
+    ])
+
+
+def downgrade() -> None:
+    for column in BUCKET_COLUMNS:
+        op.drop_index(op.f(f'ix_mkalender_{column}'), table_name='mkalender')
+    op.drop_table('mkalender')
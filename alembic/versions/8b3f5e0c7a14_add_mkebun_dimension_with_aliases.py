@@ -0,0 +1,60 @@
+"""add mkebun dimension with aliases
+
+Revision ID: 8b3f5e0c7a14
+Revises: 4e7c1d2a9b30
+Create Date: 2026-10-18 20:31:47.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3f5e0c7a14'
+down_revision: Union[str, None] = '4e7c1d2a9b30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Mapping yang sebelumnya hard-coded di app/services/mapping_kebun.py (nama -> kode),
+# disalin ke sini agar isi revisi ini tidak ikut berubah bila DEFAULT_KEBUN diubah
+SEED_KEBUN = {
+    'KENCANA AMAL TANI 1': 'KAT1',
+    'KENCANA AMAL TANI 2': 'KAT2',
+    'KENCANA AMAL TANI 3': 'KAT3',
+    'BANYU BENING UTAMA 1': 'BBU1',
+    'BANYU BENING UTAMA 2': 'BBU2',
+    'PANCA AGRO LESTARI': 'PAL',
+    'PALMA S-1': 'PS1',
+    'PALMA S-2': 'PS2',
+}
+
+
+def upgrade() -> None:
+    mkebun = op.create_table('mkebun',
+    sa.Column('kode_kebun', sa.String(length=20), nullable=False),
+    sa.Column('nama_kebun', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('kode_kebun')
+    )
+    mkebunalias = op.create_table('mkebunalias',
+    sa.Column('alias', sa.String(length=100), nullable=False),
+    sa.Column('kode_kebun', sa.String(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['kode_kebun'], ['mkebun.kode_kebun']),
+    sa.PrimaryKeyConstraint('alias')
+    )
+    op.create_index(op.f('ix_mkebunalias_kode_kebun'), 'mkebunalias', ['kode_kebun'], unique=False)
+
+    op.bulk_insert(mkebun, [
+        {'kode_kebun': kode, 'nama_kebun': nama} for nama, kode in SEED_KEBUN.items()
+    ])
+    op.bulk_insert(mkebunalias, [
+        {'alias': nama, 'kode_kebun': kode} for nama, kode in SEED_KEBUN.items()
+    ])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_mkebunalias_kode_kebun'), table_name='mkebunalias')
+    op.drop_table('mkebunalias')
+    op.drop_table('mkebun')
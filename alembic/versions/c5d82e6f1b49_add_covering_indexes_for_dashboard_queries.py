@@ -0,0 +1,74 @@
+"""add covering indexes for dashboard queries
+
+Revision ID: c5d82e6f1b49
+Revises: 8b3f5e0c7a14
+Create Date: 2026-10-18 21:48:06.215734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d82e6f1b49'
+down_revision: Union[str, None] = '8b3f5e0c7a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BUCKET_COLUMNS = (
+    'minggu_mulai',
+    'bulan_mulai',
+    'kuartal_mulai',
+    'tahun_mulai',
+    'kuartal_fiskal_mulai',
+    'tahun_fiskal_mulai',
+)
+
+# (nama, tabel, kolom) — sama dengan __table_args__ di model; tabel baseline pakai nama dari b5015e702e09
+COVERING_INDEXES = [
+    # Agregat CPO per hari: NamaProduk = 'CPO' AND TglTmb1 BETWEEN ..., SUM(TotalTmb) & FFA dari index
+    ('idx_ttranspemasaran_produk_tgl_cover', 'TTransPemasaran', ['NamaProduk', 'TglTmb1', 'TotalTmb', 'FFA']),
+    # By-location (join alias = NamaKebun apa adanya): per alias kebun, range tanggal
+    # di rekap harian tanpa baca baris tabel. Join ini bergantung collation kolom,
+    # jadi kedua index di bawah diganti index kunci alias di d7a3e9c41f52.
+    ('idx_ttbsdalamharian_kebun_tgl_cover', 'ttbsdalamharian', ['NamaKebun', 'TglTransaksiOne', 'Total']),
+    ('idx_mkebunalias_kode_alias', 'mkebunalias', ['kode_kebun', 'alias']),
+] + [
+    # Trend per periode: range awal periode -> tanggal berurutan untuk GROUP BY
+    (f'idx_mkalender_{column}_tanggal', 'mkalender', [column, 'tanggal']) for column in BUCKET_COLUMNS
+]
+
+# Digantikan index komposit di atas (kolom pertamanya sama)
+REPLACED_INDEXES = [
+    ('ix_mkebunalias_kode_kebun', 'mkebunalias'),
+] + [
+    (f'ix_mkalender_{column}', 'mkalender') for column in BUCKET_COLUMNS
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {
+        table: {index['name'] for index in inspector.get_indexes(table)}
+        for table in {table for _, table, _ in COVERING_INDEXES}
+    }
+
+    # Database dari create_all sudah punya index baru (dan tidak punya yang lama)
+    for name, table, columns in COVERING_INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns, unique=False)
+    # Index baru dibuat dulu: FK mkebunalias.kode_kebun di MySQL butuh index berawalan kode_kebun
+    for name, table in REPLACED_INDEXES:
+        if name in existing[table]:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table in REPLACED_INDEXES:
+        column = name.removeprefix(f'ix_{table}_')
+        op.create_index(name, table, [column], unique=False)
+    for name, table, _ in reversed(COVERING_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""add descending (date, time, NoTransaksi) indexes for activities feed
+
+Revision ID: cc92dcddc17c
+Revises: 00d10adfcb75
+Create Date: 2026-10-18 11:04:27.518330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cc92dcddc17c'
+down_revision: Union[str, None] = '00d10adfcb75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index descending agar top-N terbaru per sumber dibaca langsung dari index
+    # (tanpa filesort) dan keyset cursor "before" bisa melompat ke posisinya
+    op.create_index(
+        'idx_ttbsdalam_tgl_time_desc',
+        'TTbsDalam',
+        [sa.text('TglTransaksiOne DESC'), sa.text('TimeTmbOne DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+    op.create_index(
+        'idx_ttranslintaskeluar_tgl_time_desc',
+        'TTransLintasKeluar',
+        [sa.text('TglTmb1 DESC'), sa.text('TimeTmb1 DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+    op.create_index(
+        'idx_ttranspemasaran_tgl_time_desc',
+        'TTransPemasaran',
+        [sa.text('TglTmb1 DESC'), sa.text('TimeTmb1 DESC'), sa.text('NoTransaksi DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ttranspemasaran_tgl_time_desc', table_name='TTransPemasaran')
+    op.drop_index('idx_ttranslintaskeluar_tgl_time_desc', table_name='TTransLintasKeluar')
+    op.drop_index('idx_ttbsdalam_tgl_time_desc', table_name='TTbsDalam')
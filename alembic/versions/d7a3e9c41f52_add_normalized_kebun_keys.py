@@ -0,0 +1,74 @@
+"""add normalized kebun keys
+
+Revision ID: d7a3e9c41f52
+Revises: c5d82e6f1b49
+Create Date: 2026-10-19 09:26:13.508311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3e9c41f52'
+down_revision: Union[str, None] = 'c5d82e6f1b49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Kunci pencocokan alias: huruf kecil, tanpa spasi di akhir (kolom generated
+# VIRTUAL, jadi trigger rekap harian tidak perlu diubah). Join by-location memakai
+# kunci ini sehingga hasilnya tidak bergantung collation kolom.
+KEY_COLUMNS = [
+    # (tabel, kolom kunci, kolom sumber, panjang)
+    ('mkebunalias', 'alias_key', 'alias', 100),
+    ('ttbsdalamharian', 'NamaKebunKey', 'NamaKebun', 50),
+]
+
+# (nama, tabel, kolom, unique) — sama dengan __table_args__ di model
+KEY_INDEXES = [
+    # GROUP BY kode kebun berurutan dari index, kunci alias ikut terbaca
+    ('idx_mkebunalias_kode_key', 'mkebunalias', ['kode_kebun', 'alias_key'], False),
+    # Dua ejaan dengan kunci sama akan dihitung dua kali di join
+    ('uq_mkebunalias_alias_key', 'mkebunalias', ['alias_key'], True),
+    # Per kunci alias: range tanggal + Total dari index saja
+    ('idx_ttbsdalamharian_kebunkey_tgl_cover', 'ttbsdalamharian', ['NamaKebunKey', 'TglTransaksiOne', 'Total'], False),
+]
+
+# Index dari c5d82e6f1b49 untuk join lama (alias = NamaKebun apa adanya)
+REPLACED_INDEXES = [
+    ('idx_mkebunalias_kode_alias', 'mkebunalias', ['kode_kebun', 'alias']),
+    ('idx_ttbsdalamharian_kebun_tgl_cover', 'ttbsdalamharian', ['NamaKebun', 'TglTransaksiOne', 'Total']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = {table for table, _, _, _ in KEY_COLUMNS}
+    columns = {table: {column['name'] for column in inspector.get_columns(table)} for table in tables}
+    existing = {table: {index['name'] for index in inspector.get_indexes(table)} for table in tables}
+
+    # Database dari create_all sudah punya kolom & index baru
+    for table, column, source, length in KEY_COLUMNS:
+        if column not in columns[table]:
+            op.add_column(table, sa.Column(
+                column, sa.String(length=length), sa.Computed(f'lower(rtrim({source}))', persisted=False),
+            ))
+    for name, table, index_columns, unique in KEY_INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, index_columns, unique=unique)
+    # Index baru dibuat dulu: FK mkebunalias.kode_kebun di MySQL butuh index berawalan kode_kebun
+    for name, table, _ in REPLACED_INDEXES:
+        if name in existing[table]:
+            op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, index_columns in REPLACED_INDEXES:
+        op.create_index(name, table, index_columns, unique=False)
+    for name, table, _, _ in reversed(KEY_INDEXES):
+        op.drop_index(name, table_name=table)
+    for table, column, _, _ in reversed(KEY_COLUMNS):
+        op.drop_column(table, column)
@@ -0,0 +1,388 @@
+# app/core/cache.py
+import functools
+import gzip
+import inspect
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable
+
+import orjson
+from fastapi import Request, Response, params
+from fastapi.encoders import decimal_encoder, jsonable_encoder
+
+logger = logging.getLogger("APN-Riau.cache")
+
+# Perkiraan overhead per entry (key, tuple metadata, node OrderedDict)
+ENTRY_OVERHEAD_BYTES = 256
+
+_MISSING = object()
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    expires_at: float
+    period: tuple[date, date] | None = None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+@dataclass(frozen=True)
+class EncodedResponse:
+    """Body JSON yang sudah di-encode (plus versi gzip bila cukup besar)."""
+    body: bytes
+    gzip_body: bytes | None = None
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzip_body or b"")
+
+
+def json_default(obj: Any) -> Any:
+    # Decimal (SUM di MySQL) diperlakukan sama seperti jsonable_encoder FastAPI
+    if isinstance(obj, Decimal):
+        return decimal_encoder(obj)
+    return jsonable_encoder(obj)
+
+
+def encode_response(value: Any, gzip_min_bytes: int | None = None) -> EncodedResponse:
+    body = orjson.dumps(value, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    gzip_body = None
+    if gzip_min_bytes is not None and len(body) >= gzip_min_bytes:
+        gzip_body = gzip.compress(body, compresslevel=6)
+    return EncodedResponse(body, gzip_body)
+
+
+def accepts_gzip(request: Request | None) -> bool:
+    if request is None:
+        return False
+    return any(
+        part.split(";")[0].strip() == "gzip"
+        for part in request.headers.get("Accept-Encoding", "").split(",")
+    )
+
+
+def encoded_json_response(encoded: EncodedResponse, request: Request | None = None) -> Response:
+    """Response langsung dari bytes cache, tanpa encode ulang."""
+    if encoded.gzip_body is None:
+        return Response(content=encoded.body, media_type="application/json")
+    headers = {"Vary": "Accept-Encoding"}
+    if accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=encoded.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+
+def estimate_size(value: Any) -> int:
+    """Perkiraan ukuran value dalam byte, memakai panjang hasil serialisasi JSON."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + ENTRY_OVERHEAD_BYTES
+    if isinstance(value, EncodedResponse):
+        return value.size + ENTRY_OVERHEAD_BYTES
+    try:
+        return len(orjson.dumps(value, default=str)) + ENTRY_OVERHEAD_BYTES
+    except TypeError:
+        return len(repr(value)) + ENTRY_OVERHEAD_BYTES
+
+
+class LRUTTLCache:
+    """
+    Cache in-memory thread-safe dengan eviction LRU + TTL dan batas ukuran byte.
+    Aman dipakai bersama oleh endpoint sync (threadpool) maupun async.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int,
+        default_ttl: float,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._data: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = CacheStats()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return default
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+            return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        period: tuple[date, date] | None = None,
+    ) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        size = self._sizeof(value)
+        expires_at = math.inf if math.isinf(ttl) else time.monotonic() + ttl
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if size > self.max_bytes:
+                # Value lebih besar dari seluruh budget: jangan disimpan
+                self._stats.evictions += 1
+                return
+            self._data[key] = CacheEntry(value, size, expires_at, period)
+            self._bytes += size
+            self._enforce_limits()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove(key)
+            return True
+
+    def invalidate(self, predicate: Callable[[str, CacheEntry], bool]) -> int:
+        """Hapus semua entry yang memenuhi predicate(key, entry)."""
+        with self._lock:
+            keys = [k for k, e in self._data.items() if predicate(k, e)]
+            for key in keys:
+                self._remove(key)
+            self._stats.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.invalidations += len(self._data)
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            return {
+                "name": self.name,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_ratio": round(self._stats.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._stats.evictions,
+                "expirations": self._stats.expirations,
+                "invalidations": self._stats.invalidations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    # --- internal (lock harus sudah dipegang) ---
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        expired = [k for k, e in self._data.items() if e.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self._stats.expirations += len(expired)
+
+    def _enforce_limits(self) -> None:
+        if len(self._data) <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+        self._purge_expired()
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self._stats.evictions += 1
+
+
+def age_based_ttl(settle_days: int, volatile_ttl: float) -> Callable[[tuple[date, date] | None], float]:
+    """
+    TTL berdasarkan umur data: periode yang berakhir sebelum horizon
+    (hari ini - settle_days) dianggap final dan di-cache tanpa batas waktu,
+    sisanya (ekor yang masih bisa berubah) memakai volatile_ttl.
+    """
+
+    def ttl_for(period: tuple[date, date] | None) -> float:
+        if period is None:
+            return volatile_ttl
+        horizon = date.today() - timedelta(days=settle_days)
+        return math.inf if period[1] < horizon else volatile_ttl
+
+    return ttl_for
+
+
+def overlaps(period: tuple[date, date] | None, start: date, end: date) -> bool:
+    return period is not None and period[0] <= end and period[1] >= start
+
+
+def normalize_param(value: Any) -> str:
+    """Ubah nilai query parameter menjadi string kanonik untuk cache key."""
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return ",".join(normalize_param(v) for v in value)
+    return str(value)
+
+
+def make_cache_key(namespace: str, **query_params: Any) -> str:
+    parts = "&".join(f"{k}={normalize_param(query_params[k])}" for k in sorted(query_params))
+    return f"{namespace}?{parts}"
+
+
+# Nama parameter Request yang ditambahkan ke signature route ber-`encode=True`
+REQUEST_PARAM = "cache_request"
+
+
+def cached_endpoint(
+    cache: LRUTTLCache,
+    namespace: str,
+    *,
+    ttl: float | Callable[[tuple[date, date] | None], float] | None = None,
+    normalize: Callable[[dict], dict] | None = None,
+    encode: bool = False,
+    gzip_min_bytes: int | None = None,
+):
+    """
+    Decorator cache untuk route FastAPI (sync maupun async).
+
+    Cache key dibangun dari query parameter route (parameter dengan Depends(...)
+    tidak ikut), setelah dinormalisasi oleh `normalize` bila diberikan, sehingga
+    mis. start_date=None dan start_date=<awal bulan> berbagi entry yang sama.
+    `ttl` boleh berupa callable(period) untuk TTL yang bergantung pada periode.
+
+    Dengan `encode=True` yang disimpan adalah bytes JSON final (orjson, plus gzip
+    bila body >= `gzip_min_bytes`) dan route mengembalikan Response langsung,
+    sehingga cache hit tidak melewati jsonable_encoder maupun serialisasi lagi.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        key_params = [
+            name for name, p in signature.parameters.items()
+            if not isinstance(p.default, params.Depends)
+        ]
+
+        def prepare(args, kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            call_kwargs = dict(bound.arguments)
+            # Isi default Query(...) bila route dipanggil langsung (bukan via FastAPI)
+            for name, p in signature.parameters.items():
+                if name in call_kwargs or p.default is inspect.Parameter.empty:
+                    continue
+                if isinstance(p.default, params.Depends):
+                    continue
+                call_kwargs[name] = p.default.default if isinstance(p.default, params.Param) else p.default
+            if normalize:
+                call_kwargs = normalize(call_kwargs)
+            key_values = {name: call_kwargs.get(name) for name in key_params}
+            period = None
+            if isinstance(call_kwargs.get("start_date"), date) and isinstance(call_kwargs.get("end_date"), date):
+                period = (call_kwargs["start_date"], call_kwargs["end_date"])
+            return call_kwargs, make_cache_key(namespace, **key_values), period
+
+        def store(key, value, period):
+            if encode:
+                value = encode_response(value, gzip_min_bytes)
+            cache.set(key, value, ttl=ttl(period) if callable(ttl) else ttl, period=period)
+            return value
+
+        def respond(value, request, outcome):
+            if request is not None:
+                request.state.cache = outcome  # ikut tercatat di log request
+            if not encode:
+                return value
+            response = encoded_json_response(value, request)
+            response.headers["X-Cache"] = outcome.upper()  # hit ratio per route terlihat dari client
+            return response
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                request = kwargs.pop(REQUEST_PARAM, None)
+                call_kwargs, key, period = prepare(args, kwargs)
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    logger.info(f"[CACHE HIT] {key}", extra={"cache": "hit", "key": key})
+                    return respond(value, request, "hit")
+                logger.info(f"[CACHE MISS] {key}", extra={"cache": "miss", "key": key})
+                value = store(key, await func(**call_kwargs), period)
+                return respond(value, request, "miss")
+
+            async def refresh(*args, **kwargs):
+                call_kwargs, key, period = prepare(args, kwargs)
+                logger.info(f"[CACHE REFRESH] {key}")
+                store(key, await func(**call_kwargs), period)
+                return key
+
+            wrapper = async_wrapper
+        else:
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                request = kwargs.pop(REQUEST_PARAM, None)
+                call_kwargs, key, period = prepare(args, kwargs)
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    logger.info(f"[CACHE HIT] {key}", extra={"cache": "hit", "key": key})
+                    return respond(value, request, "hit")
+                logger.info(f"[CACHE MISS] {key}", extra={"cache": "miss", "key": key})
+                value = store(key, func(**call_kwargs), period)
+                return respond(value, request, "miss")
+
+            def refresh(*args, **kwargs):
+                call_kwargs, key, period = prepare(args, kwargs)
+                logger.info(f"[CACHE REFRESH] {key}")
+                store(key, func(**call_kwargs), period)
+                return key
+
+            wrapper = sync_wrapper
+
+        # wrapper.refresh(...) menghitung ulang & menimpa entry tanpa melihat cache (cache warmer)
+        wrapper.refresh = refresh
+
+        if encode:
+            # FastAPI menyuntikkan Request lewat parameter tambahan ini (untuk Accept-Encoding)
+            request_param = inspect.Parameter(
+                REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Request
+            )
+            wrapper.__signature__ = signature.replace(
+                parameters=[*signature.parameters.values(), request_param]
+            )
+        return wrapper
+
+    return decorator
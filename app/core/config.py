@@ -4,6 +4,39 @@ from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
 
+# Profil engine SQLAlchemy. pool_recycle < wait_timeout MySQL agar koneksi idle
+# tidak diputus server, pool_pre_ping menangkap koneksi yang sudah mati.
+ENGINE_PROFILES = {
+    "production": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": 30000,
+        "echo": False,
+    },
+    "development": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_timeout_ms": None,
+        "echo": True,
+    },
+    "test": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "statement_timeout_ms": None,
+        "echo": False,
+    },
+}
+
+
 class Settings(BaseSettings):
     # === App Info ===
     APP_NAME: str
@@ -13,18 +46,96 @@ class Settings(BaseSettings):
     # === Database ===
     DATABASE_URL: str
     SQLALCHEMY_DATABASE_URI: str | None = None
+    ASYNC_DATABASE_URL: str | None = None  # default: DATABASE_URL dengan driver async
+
+    # === Database Engine (profil + override per nilai) ===
+    DB_ENGINE_PROFILE: str = "production"
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_TIMEOUT: int | None = None
+    DB_POOL_RECYCLE: int | None = None
+    DB_POOL_PRE_PING: bool | None = None
+    DB_STATEMENT_TIMEOUT_MS: int | None = None
+    DB_ECHO: bool | None = None
 
     # === Security ===
     SECRET_KEY: str | None = None
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_USERNAMES: list[str] = []  # opt-in: /auth/register terbuka, jadi tidak ada admin bawaan
+    PASSWORD_HASH_WORKERS: int = 2  # thread khusus hashing password
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16  # antrean lebih dari ini -> 503
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # token terverifikasi -> payload
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_ENTRIES: int = 1000  # username -> baris users
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # === Cache Dashboard ===
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_TTL_SECONDS: int = 3600  # jaring pengaman periode belum final (UPDATE di ekor dideteksi watermark)
+    CACHE_SETTLE_DAYS: int = 3  # data lebih tua dari D-n dianggap final
+    ACTIVITIES_CACHE_TTL_SECONDS: int = 30
+    CACHE_GZIP_MIN_BYTES: int | None = 1024  # None = tanpa versi gzip
+    CACHE_WARM_INTERVAL_SECONDS: float = 600  # < CACHE_TTL_SECONDS; 0 = warmer nonaktif
+    CACHE_WARM_CONCURRENCY: int = 2
+    CACHE_WARM_RANGES: list[str] = ["month_to_date", "last_7_days", "previous_month", "year_to_date"]
+    PARTIAL_CACHE_MAX_ENTRIES: int = 20000
+    PARTIAL_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    WATERMARK_REFRESH_SECONDS: float = 5  # interval cek data baru untuk ETag
+    CHANGE_POLL_SECONDS: float = 10  # poller watermark -> invalidasi cache; 0 = nonaktif
+
+    # === Kalender & trend ===
+    FISCAL_YEAR_START_MONTH: int = 1  # bulan awal tahun fiskal (1 = Januari)
+    TREND_MAX_POINTS_LIMIT: int = 2000  # batas atas parameter max_points
+
+    # === Dimensi kebun ===
+    KEBUN_REFRESH_SECONDS: float = 30  # interval cek perubahan mkebun/mkebunalias
+
+    # === Export ===
+    EXPORT_BATCH_SIZE: int = 5000  # baris per fetch server-side cursor
 
     # === Logging ===
     LOG_DIR: str = "logs"
     LOG_FILE: str = "app.log"
+    LOG_FORMAT: str = "json"  # json | text
+    LOG_QUEUE_SIZE: int = 10000  # antrean penuh -> record dibuang
+    LOG_SAMPLE_RATES: dict[str, float] = {  # sampling INFO per logger bervolume tinggi
+        "APN-Riau.cache": 0.05,
+        "APN-Riau.partial_aggregates": 0.1,
+    }
+
+    # === Slow query log ===
+    SLOW_QUERY_MS: float = 500  # ambang statement lambat; 0 = nonaktif
+    SLOW_QUERY_EXPLAIN: bool = True  # EXPLAIN sekali per shape statement
+    SLOW_QUERY_RING_SIZE: int = 200  # entry terakhir yang disimpan di memori
+
+    # === Metrics (Prometheus) ===
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str | None = None  # jika diisi, /metrics butuh "Authorization: Bearer <token>"
 
     model_config = ConfigDict(env_file=".env.production", env_file_encoding = "utf-8")
 
+    def engine_profile(self) -> dict:
+        """Opsi engine dari DB_ENGINE_PROFILE, ditimpa oleh DB_* yang di-set eksplisit."""
+        if self.DB_ENGINE_PROFILE not in ENGINE_PROFILES:
+            raise ValueError(f"DB_ENGINE_PROFILE tidak dikenal: {self.DB_ENGINE_PROFILE}")
+        profile = dict(ENGINE_PROFILES[self.DB_ENGINE_PROFILE])
+        overrides = {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "statement_timeout_ms": self.DB_STATEMENT_TIMEOUT_MS,
+            "echo": self.DB_ECHO,
+        }
+        profile.update({k: v for k, v in overrides.items() if v is not None})
+        return profile
+
 settings = Settings()
 
 settings.SQLALCHEMY_DATABASE_URI = settings.DATABASE_URL
@@ -1,12 +1,95 @@
 # app/core/database.py
-from sqlalchemy import create_engine
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.metrics import attach_statement_timing
+from app.core.pool_metrics import PoolTelemetry, timed_async_queue_pool, timed_queue_pool
+from app.core.slow_query import SlowQueryRecorder
+
+engine_profile = settings.engine_profile()
+
+sync_pool_telemetry = PoolTelemetry("sync")
+async_pool_telemetry = PoolTelemetry("async")
+slow_queries = SlowQueryRecorder(
+    settings.SLOW_QUERY_MS,
+    capacity=settings.SLOW_QUERY_RING_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
+
+
+def engine_options(url: str, pool_class) -> dict:
+    """Opsi create_engine dari profil; SQLite in-memory tetap memakai pool bawaannya."""
+    options = {"echo": engine_profile["echo"]}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return options
+    options.update(
+        poolclass=pool_class,
+        pool_size=engine_profile["pool_size"],
+        max_overflow=engine_profile["max_overflow"],
+        pool_timeout=engine_profile["pool_timeout"],
+        pool_recycle=engine_profile["pool_recycle"],
+        pool_pre_ping=engine_profile["pool_pre_ping"],
+    )
+    return options
+
 
-engine = create_engine(settings.DATABASE_URL, echo=True, future=True)
+def apply_statement_timeout(sync_engine, timeout_ms: int | None) -> None:
+    """Batasi lama eksekusi SELECT per koneksi (MAX_EXECUTION_TIME MySQL)."""
+    if not timeout_ms or sync_engine.dialect.name != "mysql":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {int(timeout_ms)}")
+        cursor.close()
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    future=True,
+    **engine_options(settings.DATABASE_URL, timed_queue_pool(sync_pool_telemetry)),
+)
+apply_statement_timeout(engine, engine_profile["statement_timeout_ms"])
+sync_pool_telemetry.attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+attach_statement_timing(engine, "sync", Base.metadata)
+slow_queries.attach(engine, "sync")
+
+
+# === Async engine (aiomysql untuk MySQL, aiosqlite untuk testing) ===
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Ganti driver sync di DATABASE_URL dengan driver async yang setara."""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_options(ASYNC_DATABASE_URL, timed_async_queue_pool(async_pool_telemetry)),
+)
+apply_statement_timeout(async_engine.sync_engine, engine_profile["statement_timeout_ms"])
+async_pool_telemetry.attach(async_engine.sync_engine)
+attach_statement_timing(async_engine.sync_engine, "async", Base.metadata)
+slow_queries.attach(async_engine.sync_engine, "async")
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 # Dependency untuk FastAPI endpoint
 def get_db():
@@ -15,3 +98,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency untuk endpoint async
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def run_concurrently(*jobs: Callable[[AsyncSession], Awaitable[Any]]) -> list[Any]:
+    """
+    Jalankan beberapa query independen secara paralel. Setiap job mendapat
+    AsyncSession (dan koneksi) sendiri karena satu session tidak boleh dipakai
+    bersamaan; latency total = query paling lambat, bukan jumlah semuanya.
+    """
+
+    async def run(job):
+        async with AsyncSessionLocal() as session:
+            return await job(session)
+
+    return await asyncio.gather(*(run(job) for job in jobs))
@@ -0,0 +1,119 @@
+# app/core/logging_config.py
+import atexit
+import copy
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+import orjson
+
+# Atribut LogRecord bawaan; selain ini dianggap field terstruktur dari `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record: waktu, level, logger, pesan, plus field `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        data.update({k: v for k, v in vars(record).items() if k not in _RESERVED})
+        if record.exc_text or record.exc_info:
+            data["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return orjson.dumps(data, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Sampling event INFO bervolume tinggi per logger (mis. cache hit/miss).
+    WARNING ke atas selalu lolos.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        return rate is None or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler yang membuang record saat antrean penuh alih-alih memblok caller."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format pesan (args) di sini; field `extra` tetap utuh untuk JsonFormatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    log_file_path: str,
+    log_format: str = "json",
+    sample_rates: dict[str, float] | None = None,
+    queue_size: int = 10000,
+    max_bytes: int = 5 * 1024 * 1024,
+) -> QueueListener:
+    """
+    Logger "APN-Riau" hanya memasukkan record ke antrean (tidak menyentuh disk di
+    event loop); QueueListener di thread terpisah yang menulis ke file rotating
+    dan console. Antrean penuh -> record dibuang, bukan memblok request.
+    """
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(name)s: %(message)s", "%Y-%m-%d %H:%M:%S")
+
+    # Log ke file (rotating, default 5 MB)
+    file_handler = RotatingFileHandler(log_file_path, maxBytes=max_bytes, backupCount=3)
+    file_handler.setFormatter(formatter)
+
+    # Log ke console
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    logger = logging.getLogger("APN-Riau")
+    logger.setLevel(logging.INFO)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_listener, listener)
+    return listener
+
+
+def stop_listener(listener: QueueListener) -> None:
+    """Flush sisa antrean lalu hentikan thread listener; aman dipanggil lebih dari sekali."""
+    if listener._thread is not None:
+        listener.stop()
+
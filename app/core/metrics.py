@@ -0,0 +1,261 @@
+# app/core/metrics.py
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+
+# Bucket (detik) untuk latency HTTP dan eksekusi statement DB
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "EXPLAIN"}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Dasar metrik berlabel; nilai label harus dari himpunan terbatas (template route, dsb)."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}_total{format_labels(self.labels, key)} {format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{format_labels(self.labels, key)} {format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: tuple = HTTP_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [jumlah per bucket (non-kumulatif, + slot +Inf), sum]
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Kumpulan metrik + collector yang dibaca saat scrape (mis. statistik cache)."""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.collectors: list[Callable[[], list[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Latency request HTTP per template route",
+    labels=("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "Request HTTP yang sedang diproses",
+    labels=("method",),
+))
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds",
+    "Waktu eksekusi statement DB (cursor.execute) per operasi & tabel",
+    labels=("engine", "operation", "table"),
+    buckets=DB_BUCKETS,
+))
+db_statement_errors = registry.register(Counter(
+    "db_statement_errors",
+    "Statement DB yang gagal dieksekusi",
+    labels=("engine", "operation", "table"),
+))
+
+
+def method_label(method: str) -> str:
+    return method if method in HTTP_METHODS else "OTHER"
+
+
+# === Timing statement DB ===
+_OPERATION = re.compile(r"^\s*(?:/\*.*?\*/\s*)?(\w+)", re.S)
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+[`\"\[]?(\w+)", re.I)
+
+
+def statement_labels(statement: str, known_tables) -> tuple[str, str]:
+    """
+    Label (operasi, tabel) dari teks SQL. Tabel hanya diambil dari daftar tabel
+    model yang dikenal agar kardinalitas label tetap terbatas.
+    """
+    match = _OPERATION.match(statement)
+    operation = match.group(1).upper() if match else "OTHER"
+    if operation == "WITH":
+        operation = "SELECT"
+    elif operation not in SQL_OPERATIONS:
+        operation = "OTHER"
+    for name in _TABLE.findall(statement):
+        if name in known_tables:
+            return operation, name
+    return operation, "other"
+
+
+def attach_statement_timing(engine, name: str, metadata) -> None:
+    """
+    Ukur durasi tiap cursor.execute lewat event before/after_cursor_execute.
+    `metadata.tables` dibaca saat eksekusi (model bisa di-import setelah engine dibuat).
+    """
+    tables = metadata.tables
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation, table = statement_labels(statement, tables)
+        db_statement_duration.observe(elapsed, engine=name, operation=operation, table=table)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("query_start") if conn is not None else None
+        if starts:
+            starts.pop()
+        operation, table = statement_labels(exception_context.statement or "", tables)
+        db_statement_errors.inc(engine=name, operation=operation, table=table)
+
+
+def cache_collector(caches: list) -> Callable[[], list[str]]:
+    """Counter hit/miss/eviction & gauge ukuran dari LRUTTLCache.stats(), dibaca saat scrape."""
+    counters = ("hits", "misses", "evictions", "expirations", "invalidations")
+    gauges = ("entries", "bytes")
+
+    def collect() -> list[str]:
+        snapshots = [cache.stats() for cache in caches]
+        lines = []
+        for field in counters:
+            metric = f"cache_{field}_total"
+            lines += [f"# HELP {metric} Jumlah {field} cache", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{cache="{escape_label(s["name"])}"}} {s[field]}' for s in snapshots]
+        for field in gauges:
+            metric = f"cache_{field}"
+            lines += [f"# HELP {metric} Ukuran cache ({field})", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{cache="{escape_label(s["name"])}"}} {s[field]}' for s in snapshots]
+        return lines
+
+    return collect
+
+
+def pool_collector(telemetries: list) -> Callable[[], list[str]]:
+    """Gauge pool koneksi dari PoolTelemetry.snapshot()."""
+
+    def collect() -> list[str]:
+        snapshots = [telemetry.snapshot() for telemetry in telemetries]
+        lines = []
+        for field in ("checked_out", "overflow"):
+            metric = f"db_pool_{field}"
+            lines += [f"# HELP {metric} Pool koneksi: {field}", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{engine="{s["name"]}"}} {s[field]}' for s in snapshots if field in s]
+        metric = "db_pool_acquire_max_seconds"
+        lines += [f"# HELP {metric} Waktu tunggu koneksi terlama", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{engine="{s["name"]}"}} {s["acquire"]["max_ms"] / 1000}' for s in snapshots]
+        return lines
+
+    return collect
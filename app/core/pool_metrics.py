@@ -0,0 +1,92 @@
+# app/core/pool_metrics.py
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolTelemetry:
+    """Counter & gauge pool koneksi satu engine, diisi lewat event pool SQLAlchemy."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.acquire_count = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+
+    def observe_acquire(self, seconds: float) -> None:
+        with self._lock:
+            self.acquire_count += 1
+            self.acquire_seconds_total += seconds
+            self.acquire_seconds_max = max(self.acquire_seconds_max, seconds)
+
+    def _incr(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def attach(self, engine) -> None:
+        """Pasang listener event pool pada engine (sync_engine untuk AsyncEngine)."""
+        self.pool = engine.pool
+        event.listen(engine, "connect", lambda *a: self._incr("connects"))
+        event.listen(engine, "checkout", lambda *a: self._incr("checkouts"))
+        event.listen(engine, "checkin", lambda *a: self._incr("checkins"))
+        event.listen(engine, "invalidate", lambda *a: self._incr("invalidations"))
+        event.listen(engine, "soft_invalidate", lambda *a: self._incr("soft_invalidations"))
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            data = {
+                "name": self.name,
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "acquire": {
+                    "count": self.acquire_count,
+                    "avg_ms": round(self.acquire_seconds_total / self.acquire_count * 1000, 3)
+                    if self.acquire_count else 0.0,
+                    "max_ms": round(self.acquire_seconds_max * 1000, 3),
+                },
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+def _timed_pool_class(base, telemetry: PoolTelemetry):
+    """Subclass pool yang mengukur lama menunggu koneksi (termasuk connect bila overflow)."""
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                telemetry.observe_acquire(time.perf_counter() - start)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def timed_queue_pool(telemetry: PoolTelemetry):
+    return _timed_pool_class(QueuePool, telemetry)
+
+
+def timed_async_queue_pool(telemetry: PoolTelemetry):
+    return _timed_pool_class(AsyncAdaptedQueuePool, telemetry)
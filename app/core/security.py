@@ -1,12 +1,24 @@
 # app/core/security.py
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import LRUTTLCache
 from app.core.config import settings
 
-# Konfigurasi hashing password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Konfigurasi hashing password: argon2 untuk hash baru, bcrypt lama tetap bisa
+# diverifikasi dan otomatis di-rehash saat login (deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 # Fungsi hash & verifikasi password
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -17,6 +29,64 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPoolBusy(Exception):
+    """Antrean hashing penuh; router menerjemahkannya menjadi 503 + Retry-After."""
+
+
+class PasswordHashPool:
+    """
+    Thread pool khusus hashing (argon2/bcrypt melepas GIL) dengan batas antrean.
+    Lonjakan login tidak memakan threadpool request; bila antrean penuh request
+    langsung ditolak (PasswordHashPoolBusy) alih-alih menunggu lama.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.capacity = workers + queue_limit
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise PasswordHashPoolBusy()
+            self.pending += 1
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Slot dilepas saat hashing benar-benar selesai (atau batal sebelum jalan),
+        # bukan saat request yang menunggu dibatalkan sementara thread masih bekerja
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": self.pending, "capacity": self.capacity, "rejected": self.rejected}
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """(valid, hash_baru) — hash_baru terisi bila hash lama perlu di-upgrade (bcrypt / parameter lama)."""
+    return await password_hash_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 # Token (JWT)
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -24,13 +94,31 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+# Token yang sudah terverifikasi -> payload, berlaku paling lama sampai `exp` token.
+# Token invalid tidak di-cache supaya cache tidak bisa dibanjiri token sampah.
+token_cache = LRUTTLCache(
+    name="verified_tokens",
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    max_bytes=settings.TOKEN_CACHE_MAX_ENTRIES * 1024,
+    default_ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+
 def decode_access_token(token: str):
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(token, payload, ttl=ttl)
+    return payload
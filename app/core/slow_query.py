@@ -0,0 +1,187 @@
+# app/core/slow_query.py
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+logger = logging.getLogger("APN-Riau.slow_query")
+
+# Scope ASGI request yang sedang berjalan; diisi middleware HTTP. Route (template)
+# baru diketahui setelah routing, jadi dibaca dari scope saat query tercatat.
+request_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?|__\[POSTCOMPILE_\w+\]")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_SPACES = re.compile(r"\s+")
+# Tanggal/jam (range periode) aman ditampilkan; string lain bisa berisi hash password, email, dsb.
+_TEMPORAL = re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?|\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?")
+REDACTED = "<redacted>"
+
+MAX_PARAMS_CHARS = 500
+
+
+def normalize_statement(statement: str) -> str:
+    """Bentuk statement tanpa literal/parameter: query yang sama dengan nilai berbeda jadi satu shape."""
+    shape = _STRING.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+def redact_parameters(parameters):
+    """Parameter bind tanpa nilai string/bytes (kecuali tanggal/jam); angka & None dibiarkan."""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(redact_parameters(value) for value in parameters)
+    if isinstance(parameters, str):
+        return parameters if _TEMPORAL.fullmatch(parameters) else REDACTED
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return REDACTED
+    return parameters
+
+
+def fingerprint(shape: str) -> str:
+    return hashlib.blake2b(shape.encode(), digest_size=8).hexdigest()
+
+
+def is_select(shape: str) -> bool:
+    return shape.split(" ", 1)[0].upper() in ("SELECT", "WITH")
+
+
+def current_route() -> str | None:
+    scope = request_scope.get()
+    if scope is None:
+        return None  # di luar request (warmer, poller, script)
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+def explain_statement(conn, statement: str, parameters) -> list[dict]:
+    """
+    EXPLAIN lewat cursor DBAPI baru pada koneksi yang sama (tanpa memicu event
+    engine lagi). SQLite memakai EXPLAIN QUERY PLAN.
+    """
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        columns = [column[0] for column in cursor.description or ()]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SlowQueryRecorder:
+    """
+    Mencatat statement yang lebih lambat dari ambang batas ke ring buffer di
+    memori (ukuran tetap) dan ke log. EXPLAIN dijalankan sekali per shape
+    statement (kemunculan pertama) agar biayanya tidak berulang. Parameter
+    bind disimpan ter-redaksi (lihat `redact_parameters`).
+    """
+
+    def __init__(self, threshold_ms: float, capacity: int = 200, explain: bool = True, max_plans: int = 500):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.max_plans = max_plans
+        self._lock = threading.Lock()
+        self._entries: deque[dict] = deque(maxlen=capacity)
+        self._plans: OrderedDict[str, list[dict] | str | None] = OrderedDict()
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def attach(self, engine, name: str) -> None:
+        if not self.enabled:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["slow_query_start"].pop()
+            if elapsed >= self.threshold:
+                self.record(conn, cursor, statement, parameters, context, executemany, elapsed, name)
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(exception_context):
+            conn = exception_context.connection
+            starts = conn.info.get("slow_query_start") if conn is not None else None
+            if starts:
+                starts.pop()
+
+    def record(self, conn, cursor, statement, parameters, context, executemany, elapsed, engine_name) -> None:
+        shape = normalize_statement(statement)
+        key = fingerprint(shape)
+        rowcount = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+
+        # Server-side cursor (export) masih membaca hasil: koneksi belum boleh dipakai query lain
+        streaming = bool(context is not None and context.execution_options.get("stream_results"))
+        with self._lock:
+            first_seen = key not in self._plans
+            if first_seen:
+                self._plans[key] = None
+                while len(self._plans) > self.max_plans:
+                    self._plans.popitem(last=False)
+
+        if first_seen and self.explain and not executemany and not streaming and is_select(shape):
+            try:
+                plan = explain_statement(conn, statement, parameters)
+            except Exception as e:
+                plan = f"EXPLAIN gagal: {e}"
+            with self._lock:
+                if key in self._plans:
+                    self._plans[key] = plan
+
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(elapsed * 1000, 2),
+            "engine": engine_name,
+            "route": current_route(),
+            "fingerprint": key,
+            "statement": statement,
+            "parameters": repr(redact_parameters(parameters))[:MAX_PARAMS_CHARS],
+            "rowcount": rowcount,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+        logger.warning(
+            f"[SLOW QUERY] {entry['duration_ms']} ms route={entry['route']} rows={rowcount} {shape[:200]}",
+            extra={k: entry[k] for k in ("duration_ms", "engine", "route", "fingerprint", "parameters", "rowcount")},
+        )
+
+    def snapshot(self, limit: int | None = None) -> list[dict]:
+        """Entry terbaru lebih dulu, lengkap dengan rencana EXPLAIN shape-nya (bila ada)."""
+        with self._lock:
+            entries = list(self._entries)[::-1][:limit]
+            return [{**entry, "explain": self._plans.get(entry["fingerprint"])} for entry in entries]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "explain": self.explain,
+                "recorded": self.recorded,
+                "entries": len(self._entries),
+                "capacity": self._entries.maxlen,
+                "shapes": len(self._plans),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
@@ -1,42 +1,33 @@
+import asyncio
 import logging
-from logging.handlers import RotatingFileHandler
 from fastapi import FastAPI, Request, Depends
+from fastapi.responses import ORJSONResponse
 from urllib.parse import urlparse
 from app.core.config import settings
-from app.core.database import Base, engine
-from app.routers import auth, dashboard
+from app.core.database import Base, SessionLocal, engine, async_engine
+from app.core.logging_config import setup_logging
+from app.core.security import password_hash_pool
+from app.core.slow_query import request_scope
+from app.core.metrics import http_request_duration, http_requests_in_flight, method_label
+from app.routers import admin, auth, dashboard, export, metrics, transactions
+from app.services.cache_warmer import run_cache_warmer
+from app.services.calendar import seed_calendar
+from app.services.mapping_kebun import seed_default_kebun
+from app.services.watermark import poll_watermarks
 import time
-from jose import JWTError
-from app.core.security import decode_access_token
+from app.services.security import bearer_token, request_principal
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 
-# === Setup Logging ===
-log_formatter = logging.Formatter(
-    "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s",
-    "%Y-%m-%d %H:%M:%S",
+# === Setup Logging (antrean + listener thread, format JSON) ===
+setup_logging(
+    f"{settings.LOG_DIR}/{settings.LOG_FILE}",
+    log_format=settings.LOG_FORMAT,
+    sample_rates=settings.LOG_SAMPLE_RATES,
+    queue_size=settings.LOG_QUEUE_SIZE,
 )
-
-log_file_path = f"{settings.LOG_DIR}/{settings.LOG_FILE}"
-
-# Log ke file (rotating 5 MB)
-file_handler = RotatingFileHandler(
-    log_file_path, maxBytes=5 * 1024 * 1024, backupCount=3
-)
-file_handler.setFormatter(log_formatter)
-file_handler.setLevel(logging.INFO)
-
-# Log ke console
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(log_formatter)
-console_handler.setLevel(logging.INFO)
-
-# Setup logger utama
 logger = logging.getLogger("APN-Riau")
-logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -56,10 +47,39 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables ready.")
 
+    # Database baru (tanpa alembic): isi mkebun dengan mapping kebun bawaan
+    with SessionLocal() as db:
+        if seeded := seed_default_kebun(db):
+            logger.info(f"mkebun diisi {seeded} kebun bawaan.")
+        # ...dan dimensi tanggal untuk trend per periode
+        if seeded := seed_calendar(db, settings.FISCAL_YEAR_START_MONTH):
+            logger.info(f"mkalender diisi {seeded} tanggal.")
+
+    # Deteksi data baru per tabel sumber -> invalidasi cache dashboard per tanggal
+    poller = None
+    if settings.CHANGE_POLL_SECONDS > 0:
+        poller = asyncio.create_task(poll_watermarks(dashboard.watermarks, settings.CHANGE_POLL_SECONDS))
+        logger.info(f"Change detector aktif (setiap {settings.CHANGE_POLL_SECONDS} detik).")
+
+    # Pre-warm view default dashboard + rentang umum, lalu refresh berkala
+    warmer = None
+    if settings.CACHE_WARM_INTERVAL_SECONDS > 0:
+        warmer = asyncio.create_task(run_cache_warmer(
+            dashboard.WARM_VIEWS,
+            settings.CACHE_WARM_RANGES,
+            settings.CACHE_WARM_INTERVAL_SECONDS,
+            settings.CACHE_WARM_CONCURRENCY,
+        ))
+
     # yield = FastAPI “running” phase
     yield
 
     # === Shutdown ===
+    for task in (poller, warmer):
+        if task:
+            task.cancel()
+    password_hash_pool.shutdown()
+    await async_engine.dispose()
     logger.info("=== Application Shutdown ===")
 
 
@@ -67,6 +87,7 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -87,6 +108,12 @@ app.add_middleware(
     allow_headers=["*"],      # izinkan semua header
 )
 
+def route_template(request: Request) -> str:
+    """Template route (mis. /export/{table}) agar field log/metrik tidak meledak per path."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
 # === Middleware: HTTP Request Logging + Username ===
 @app.middleware("http")
 async def log_http_requests(request: Request, call_next):
@@ -96,31 +123,45 @@ async def log_http_requests(request: Request, call_next):
     """
     start_time = time.time()
     username = "anonymous"  # default jika belum login
+    method = method_label(request.method)
+    request_scope.set(request.scope)  # route pemanggil untuk slow-query log
 
-    # Coba ambil username dari Authorization header
-    try:
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            payload = decode_access_token(token)
-            username = payload.get("sub", "unknown") if payload else "anonymous"
-    except JWTError:
-        username = "invalid_token"
+    # Verifikasi token sekali; hasilnya disimpan di request.state untuk dependency
+    if bearer_token(request):
+        payload = request_principal(request)
+        username = payload.get("sub", "unknown") if payload else "invalid_token"
 
     # Jalankan endpoint target
+    http_requests_in_flight.inc(method=method)
     try:
         response = await call_next(request)
     except Exception as e:
-        logger.exception(f"[{username}] {request.method} {request.url.path} raised error: {e}")
+        http_request_duration.observe(time.time() - start_time, method=method, route=route_template(request), status=500)
+        logger.exception(
+            f"[{username}] {request.method} {request.url.path} raised error: {e}",
+            extra={"route": route_template(request), "user": username, "method": request.method},
+        )
         raise
+    finally:
+        http_requests_in_flight.dec(method=method)
 
     # Hitung waktu proses
     process_time = (time.time() - start_time) * 1000  # ms
+    http_request_duration.observe(process_time / 1000, method=method, route=route_template(request), status=response.status_code)
     client_host = request.client.host if request.client else "unknown"
 
     logger.info(
         f"[{username}] {request.method} {request.url.path} "
-        f"- {response.status_code} ({process_time:.2f} ms) from {client_host}"
+        f"- {response.status_code} ({process_time:.2f} ms) from {client_host}",
+        extra={
+            "route": route_template(request),
+            "user": username,
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": round(process_time, 2),
+            "client": client_host,
+            "cache": getattr(request.state, "cache", None),
+        },
     )
 
     return response
@@ -135,3 +176,7 @@ def root():
 # Tambahkan router auth
 app.include_router(auth.router, tags=["Authentication"])
 app.include_router(dashboard.router, tags=["Dashboard"])
+app.include_router(admin.router, tags=["Admin"])
+app.include_router(export.router, tags=["Export"])
+app.include_router(transactions.router, tags=["Transactions"])
+app.include_router(metrics.router)
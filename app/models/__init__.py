@@ -1,17 +1,24 @@
 from app.models.user import User
 from app.core.database import Base
 from app.models.t_tbs_dalam import TTbsDalam
+from app.models.t_tbs_dalam_harian import TTbsDalamHarian
 from app.models.t_trans_lintas import TTransLintas
 from app.models.t_trans_lintas_keluar import TTransLintasKeluar
 from app.models.t_trans_pemasaran import TTransPemasaran
 from app.models.m_lokasi import MLokasi
+from app.models.m_kalender import MKalender
+from app.models.m_kebun import MKebun, MKebunAlias
 
 __all__ = [
     "User",
     "Base",
     "TTbsDalam",
+    "TTbsDalamHarian",
     "TTransLintas",
     "TTransLintasKeluar",
     "TTransPemasaran",
     "MLokasi",
+    "MKalender",
+    "MKebun",
+    "MKebunAlias",
     ]
\ No newline at end of file
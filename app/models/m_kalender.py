@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Date, Index, Integer, SmallInteger
+from app.core.database import Base
+
+
+class MKalender(Base):
+    """
+    Dimensi tanggal: satu baris per hari beserta awal minggu/bulan/kuartal/tahun
+    dan periode fiskal (tahun fiskal mulai FISCAL_YEAR_START_MONTH). Dipakai untuk
+    GROUP BY per granularity tanpa fungsi tanggal yang berbeda-beda per dialek.
+    """
+    __tablename__ = "mkalender"
+
+    tanggal = Column(Date, primary_key=True)
+    tahun = Column(SmallInteger, nullable=False)
+    kuartal = Column(SmallInteger, nullable=False)
+    bulan = Column(SmallInteger, nullable=False)
+    minggu_iso = Column(SmallInteger, nullable=False)
+    hari_iso = Column(SmallInteger, nullable=False)  # 1 = Senin
+    minggu_mulai = Column(Date, nullable=False)
+    bulan_mulai = Column(Date, nullable=False)
+    kuartal_mulai = Column(Date, nullable=False)
+    tahun_mulai = Column(Date, nullable=False)
+    tahun_fiskal = Column(Integer, nullable=False)
+    periode_fiskal = Column(SmallInteger, nullable=False)  # 1..12 sejak awal tahun fiskal
+    kuartal_fiskal_mulai = Column(Date, nullable=False)
+    tahun_fiskal_mulai = Column(Date, nullable=False)
+
+    # (awal periode, tanggal): GROUP BY per periode langsung berurutan dari index
+    __table_args__ = tuple(
+        Index(f"idx_mkalender_{column}_tanggal", column, "tanggal")
+        for column in (
+            "minggu_mulai", "bulan_mulai", "kuartal_mulai",
+            "tahun_mulai", "kuartal_fiskal_mulai", "tahun_fiskal_mulai",
+        )
+    )
+
+    def __repr__(self):
+        return f"<MKalender(tanggal={self.tanggal}, tahun_fiskal={self.tahun_fiskal}, periode={self.periode_fiskal})>"
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Computed, ForeignKey, Index, String
+from app.core.database import Base
+
+
+def kebun_key_sql(column: str) -> str:
+    """
+    Kunci pencocokan NamaKebun <-> alias sebagai ekspresi SQL (kolom generated):
+    huruf kecil, tanpa spasi di akhir. Sama dengan `kebun_key` / `normalize_alias`
+    di app/services/mapping_kebun.py; join memakai kunci ini, bukan collation kolom.
+    """
+    return f"lower(rtrim({column}))"
+
+
+class MKebun(Base):
+    """Dimensi kebun asal TBS: kode kebun beserta nama resminya."""
+    __tablename__ = "mkebun"
+
+    kode_kebun = Column(String(20), primary_key=True)
+    nama_kebun = Column(String(100), nullable=False)
+
+    def __repr__(self):
+        return f"<MKebun(kode_kebun={self.kode_kebun}, nama_kebun='{self.nama_kebun}')>"
+
+
+class MKebunAlias(Base):
+    """
+    Ejaan NamaKebun yang muncul di data timbangan -> kode kebun. Hanya tabel
+    ini yang dipakai untuk pemetaan, jadi nama resmi juga harus terdaftar sebagai alias.
+    """
+    __tablename__ = "mkebunalias"
+
+    alias = Column(String(100), primary_key=True)
+    kode_kebun = Column(String(20), ForeignKey("mkebun.kode_kebun"), nullable=False)
+    alias_key = Column(String(100), Computed(kebun_key_sql("alias"), persisted=False))
+
+    __table_args__ = (
+        # By-location: GROUP BY kode kebun berurutan dari index, kunci alias untuk join ikut terbaca
+        Index("idx_mkebunalias_kode_key", kode_kebun, alias_key),
+        # Dua ejaan dengan kunci sama akan dihitung dua kali di join
+        Index("uq_mkebunalias_alias_key", alias_key, unique=True),
+    )
+
+    def __repr__(self):
+        return f"<MKebunAlias(alias='{self.alias}', kode_kebun={self.kode_kebun})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Time
+from sqlalchemy import Column, String, Integer, Date, Time, Index
 from app.core.database import Base
 
 
@@ -26,5 +26,16 @@ class TTbsDalam(Base):
     JenisTbs = Column(String(50))
     lokasi_penimbangan = Column(String(100), nullable=True)
 
+    # Index yang dipakai query dashboard (sama dengan migrasi Alembic, agar
+    # database dari create_all punya rencana query yang sama)
+    __table_args__ = (
+        Index("idx_ttbsdalam_tgl_time_desc", TglTransaksiOne.desc(), TimeTmbOne.desc(), NoTransaksi.desc()),
+        # Listing /transactions yang difilter kebun: keyset tetap berurutan dalam satu kebun
+        Index(
+            "idx_ttbsdalam_kebun_tgl_time_desc",
+            NamaKebun, TglTransaksiOne.desc(), TimeTmbOne.desc(), NoTransaksi.desc(),
+        ),
+    )
+
     def __repr__(self):
         return f"<TTbsDalam(NoTransaksi={self.NoTransaksi}, Total={self.Total}, Kebun={self.NamaKebun})>"
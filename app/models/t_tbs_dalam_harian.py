@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Computed, String, Integer, BigInteger, Date, Index
+from app.core.database import Base
+from app.models.m_kebun import kebun_key_sql
+
+
+class TTbsDalamHarian(Base):
+    """
+    Rekap harian TTbsDalam per (TglTransaksiOne, NamaKebun, NamaProduk, Divisi).
+    Diisi incremental oleh trigger MySQL di tabel ttbsdalam (lihat migrasi Alembic),
+    nilai NULL pada kolom kunci disimpan sebagai string kosong.
+    """
+    __tablename__ = "ttbsdalamharian"
+
+    TglTransaksiOne = Column(Date, primary_key=True)
+    NamaKebun = Column(String(50), primary_key=True, default="")
+    NamaProduk = Column(String(100), primary_key=True, default="")
+    Divisi = Column(String(50), primary_key=True, default="")
+    Total = Column(BigInteger, nullable=False, default=0)
+    JumlahTiket = Column(Integer, nullable=False, default=0)
+    JumlahJanjang = Column(BigInteger, nullable=False, default=0)
+    # Kunci join ke mkebunalias.alias_key (generated, tidak diisi trigger/rebuild)
+    NamaKebunKey = Column(String(50), Computed(kebun_key_sql("NamaKebun"), persisted=False))
+
+    __table_args__ = (
+        # By-location: per alias (dari mkebunalias) range tanggal + Total dibaca dari index saja
+        Index("idx_ttbsdalamharian_kebunkey_tgl_cover", NamaKebunKey, TglTransaksiOne, Total),
+    )
+
+    def __repr__(self):
+        return (
+            f"<TTbsDalamHarian(Tgl={self.TglTransaksiOne}, Kebun={self.NamaKebun}, "
+            f"Produk={self.NamaProduk}, Total={self.Total})>"
+        )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Time
+from sqlalchemy import Column, String, Integer, Date, Time, Index
 from app.core.database import Base
 
 
@@ -29,5 +29,10 @@ class TTransLintas(Base):
     Tujuan = Column(String(50))
     id_lokasi = Column(Integer, nullable=True)
 
+    # Index keyset untuk /transactions/lintas (sama dengan migrasi Alembic)
+    __table_args__ = (
+        Index("idx_ttranslintas_tgl_time_desc", TglTmb1.desc(), TimeTmb1.desc(), NoTransaksi.desc()),
+    )
+
     def __repr__(self):
         return f"<TTransLintas(NoTransaksi={self.NoTransaksi}, Produk={self.NamaProduk}, Total={self.Total})>"
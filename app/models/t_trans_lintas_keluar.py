@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Time
+from sqlalchemy import Column, String, Integer, Date, Time, Index
 from app.core.database import Base
 
 
@@ -35,5 +35,12 @@ class TTransLintasKeluar(Base):
     BJR = Column(String(50))
     id_lokasi = Column(Integer, nullable=True)
 
+    # Index yang dipakai query dashboard (sama dengan migrasi Alembic)
+    __table_args__ = (
+        Index("idx_ttranslintaskeluar_tgl_time_desc", TglTmb1.desc(), TimeTmb1.desc(), NoTransaksi.desc()),
+        # Listing /transactions yang difilter asal
+        Index("idx_ttranslintaskeluar_asal_tgl_time_desc", Asal, TglTmb1.desc(), TimeTmb1.desc(), NoTransaksi.desc()),
+    )
+
     def __repr__(self):
         return f"<TTransLintasKeluar(NoTransaksi={self.NoTransaksi}, Produk={self.NamaProduk}, Total={self.Total})>"
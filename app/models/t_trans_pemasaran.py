@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Date, Time
+from sqlalchemy import Column, String, Integer, Float, Date, Time, Index
 from app.core.database import Base
 
 class TTransPemasaran(Base):
@@ -40,3 +40,12 @@ class TTransPemasaran(Base):
     StatusSambungDO = Column(String(50))
     NoSambungDO = Column(String(50))
     id_lokasi = Column(Integer)
+
+    # Index yang dipakai query dashboard (sama dengan migrasi Alembic)
+    __table_args__ = (
+        Index("idx_ttranspemasaran_tgl_time_desc", TglTmb1.desc(), TimeTmb1.desc(), NoTransaksi.desc()),
+        # Agregat CPO per hari (NamaProduk = 'CPO' AND TglTmb1 BETWEEN ...) dibaca dari index saja
+        Index("idx_ttranspemasaran_produk_tgl_cover", NamaProduk, TglTmb1, TotalTmb, FFA),
+        # Listing /transactions yang difilter asal
+        Index("idx_ttranspemasaran_asal_tgl_time_desc", Asal, TglTmb1.desc(), TimeTmb1.desc(), NoTransaksi.desc()),
+    )
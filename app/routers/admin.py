@@ -0,0 +1,86 @@
+# app/routers/admin.py
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import async_pool_telemetry, engine_profile, get_db, slow_queries, sync_pool_telemetry
+from app.core.security import token_cache
+from app.routers.auth import user_cache
+from app.routers.dashboard import dashboard_cache, invalidate_period, partial_store
+from app.services.rekap_tbs import rebuild_rekap_tbs
+from app.services.security import get_admin_user
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Statistik cache dashboard & auth (hit/miss/eviction, jumlah entry & byte)"""
+    return {
+        "message": "Cache statistics retrieved successfully",
+        "data": [
+            dashboard_cache.stats(),
+            partial_store.cache.stats(),
+            token_cache.stats(),
+            user_cache.stats(),
+        ],
+    }
+
+
+@router.post("/cache/invalidate")
+def invalidate_cache_period(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    rebuild_rekap: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """
+    Invalidasi cache untuk periode tertentu, mis. setelah koreksi timbangan back-dated.
+    Jika rebuild_rekap=true, rekap harian TBS untuk periode tsb juga dihitung ulang.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date harus <= end_date")
+
+    rebuilt_rows = rebuild_rekap_tbs(db, start_date, end_date) if rebuild_rekap else None
+    invalidated = invalidate_period(start_date, end_date)
+
+    return {
+        "message": "Cache invalidated successfully",
+        "period": {"start_date": str(start_date), "end_date": str(end_date)},
+        "data": {**invalidated, "rekap_rows_rebuilt": rebuilt_rows},
+    }
+
+
+@router.get("/db/pool")
+def get_pool_telemetry():
+    """Telemetri pool koneksi: checked-out, overflow, waktu tunggu koneksi, invalidasi"""
+    return {
+        "message": "Connection pool telemetry retrieved successfully",
+        "profile": dict(engine_profile),
+        "data": [sync_pool_telemetry.snapshot(), async_pool_telemetry.snapshot()],
+    }
+
+
+@router.get("/db/slow-queries")
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Statement terakhir yang melewati SLOW_QUERY_MS: durasi, parameter, route
+    pemanggil, jumlah baris, dan EXPLAIN (sekali per shape statement).
+    """
+    return {
+        "message": "Slow queries retrieved successfully",
+        "stats": slow_queries.stats(),
+        "data": slow_queries.snapshot(limit),
+    }
+
+
+@router.delete("/db/slow-queries")
+def clear_slow_queries():
+    """Kosongkan ring slow query (mis. setelah menambah index, untuk mengukur ulang)."""
+    slow_queries.clear()
+    return {"message": "Slow queries cleared", "data": slow_queries.stats()}
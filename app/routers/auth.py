@@ -2,72 +2,119 @@
 from datetime import timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.cache import LRUTTLCache
+from app.core.database import get_async_db, get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut, Token
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    PasswordHashPoolBusy,
     create_access_token,
-    decode_access_token,
+    hash_password_async,
+    verify_and_update_password,
 )
 from app.core.config import settings
-from jose import JWTError
+from app.services.security import request_principal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# username -> User (detached) agar endpoint yang sering dipanggil tidak SELECT users tiap request
+user_cache = LRUTTLCache(
+    name="users",
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    max_bytes=settings.USER_CACHE_MAX_ENTRIES * 2048,
+    default_ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def server_busy() -> HTTPException:
+    """503 untuk antrean hashing penuh; klien boleh mencoba lagi sebentar kemudian."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server sedang sibuk, silakan coba lagi",
+        headers={"Retry-After": "1"},
+    )
+
 
 @router.post("/register", response_model=UserOut)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
+async def register_user(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # cek username/email sudah ada
-    exists = db.query(User).filter((User.username == payload.username) | (User.email == payload.email)).first()
+    exists = (await db.execute(
+        select(User).where((User.username == payload.username) | (User.email == payload.email))
+    )).scalars().first()
     if exists:
         raise HTTPException(status_code=400, detail="Username atau email sudah digunakan")
 
-    hashed = get_password_hash(payload.password)
+    try:
+        hashed = await hash_password_async(payload.password)
+    except PasswordHashPoolBusy:
+        raise server_busy()
     user = User(username=payload.username, email=payload.email, hashed_password=hashed)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
     # OAuth2PasswordRequestForm menyediakan .username dan .password (client biasanya kirim username)
     # Kita mendukung login via username atau email:
     field = form_data.username
-    user = db.query(User).filter((User.username == field) | (User.email == field)).first()
+    user = (await db.execute(
+        select(User).where((User.username == field) | (User.email == field))
+    )).scalars().first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credensial tidak valid")
 
-    if not verify_password(form_data.password, user.hashed_password):
+    # Verifikasi di pool hashing, bukan di threadpool request
+    try:
+        valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    except PasswordHashPoolBusy:
+        raise server_busy()
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credensial tidak valid")
+    if new_hash:
+        # Hash lama (bcrypt / parameter argon2 lama) di-upgrade secara transparan
+        user.hashed_password = new_hash
+        await db.commit()
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(data={"sub": user.username}, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    from jose import JWTError  # lokal import untuk kejelasan
-    try:
-        payload = decode_access_token(token)
-        username: Optional[str] = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token tidak valid")
-    except JWTError:
+def token_username(request: Request, token: str) -> str:
+    payload = request_principal(request, token)
+    username: Optional[str] = payload.get("sub") if payload else None
+    if username is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token tidak valid")
-
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User tidak ditemukan")
+    return username
+
+
+def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    username = token_username(request, token)
+    user = user_cache.get(username)
+    if user is None:
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User tidak ditemukan")
+        db.expunge(user)
+        user_cache.set(username, user)
     return user
 
 
@@ -76,15 +123,9 @@ def read_current_user(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.post("/refresh", response_model=Token)
-def refresh_token(token: str = Depends(oauth2_scheme)):
+def refresh_token(request: Request, token: str = Depends(oauth2_scheme)):
     """Generate new access token if the current one is still valid (before expiry)."""
-    try:
-        payload = decode_access_token(token)
-        username: Optional[str] = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token tidak valid")
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token tidak valid")
+    username = token_username(request, token)
 
     # Buat token baru
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from datetime import date, datetime, timedelta
-from sqlalchemy import func, and_, distinct, cast, Float
-from app.core.database import get_db
-from app.services.security import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from sqlalchemy import false, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, time
+from itertools import islice
+from typing import Literal
+from app.core.cache import LRUTTLCache, age_based_ttl, cached_endpoint, overlaps
+from app.core.config import settings
+from app.core.database import get_async_db, run_concurrently
+from app.services.security import get_current_user, request_principal
 from app.models.t_tbs_dalam import TTbsDalam
 from app.models.t_trans_lintas_keluar import TTransLintasKeluar
 from app.models.t_trans_pemasaran import TTransPemasaran
-from app.services.mapping_kebun import get_kode_kebun
-from cachetools import TTLCache, cached
-from cachetools.keys import hashkey
+from app.services.calendar import CALENDAR_END, CALENDAR_START, bucket_totals_statement, calendar_covers
+from app.services.downsample import lttb
+from app.services.mapping_kebun import kebun_directory, kebun_totals_statement, normalize_kode
+from app.services.pagination import (
+    before_keyset,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_date,
+    parse_cursor_time,
+)
+from app.services.partial_aggregates import CPO, TBS, PartialAggregateStore, merge_spans
+from app.services.watermark import WATERMARK_SOURCES, DataWatermarks, etag_matches, make_etag
+import heapq
 import logging
 # from app.models.m_lokasi import MLokasi
 
@@ -17,26 +33,121 @@ import logging
 logger = logging.getLogger("APN-Riau.dashboard")
 logger.propagate = True  # biarkan log ini diteruskan ke root handler
 
+# Watermark data sumber untuk ETag; satu instance per proses
+watermarks = DataWatermarks(
+    WATERMARK_SOURCES, settings.WATERMARK_REFRESH_SECONDS, tail_days=settings.CACHE_SETTLE_DAYS
+)
+
+
+def has_valid_bearer(request: Request) -> bool:
+    payload = request_principal(request)
+    return bool(payload and payload.get("sub"))
+
+
+class WatermarkETagRoute(APIRoute):
+    """
+    Route GET dengan ETag dari watermark data + path + query parameter.
+    If-None-Match yang cocok langsung dijawab 304 sebelum dependency, agregasi,
+    maupun serialisasi dijalankan. Route yang butuh login hanya boleh 304 bila
+    bearer token valid; selain itu diteruskan ke handler biasa (-> 401).
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if "GET" not in self.methods:
+            return handler
+        requires_auth = bool(get_flat_dependant(self.dependant).security_requirements)
+
+        async def etag_handler(request: Request) -> Response:
+            await kebun_directory.ensure_fresh()  # perubahan mkebun membuang cache lewat subscriber
+            token = await watermarks.token()
+            etag = make_etag(token, request.url.path, request.query_params.multi_items())
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("If-None-Match"), etag) and (
+                not requires_auth or has_valid_bearer(request)
+            ):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            response = await handler(request)
+            if response.status_code == status.HTTP_200_OK:
+                response.headers.update(headers)
+            return response
+
+        return etag_handler
+
+
 router = APIRouter(
     prefix="/dashboard",
     tags=["Dashboard"],
+    route_class=WatermarkETagRoute,
 )
 
-# ==== SIMPLE IN-MEMORY CACHE ====
-cache_store = {}
-CACHE_TTL = timedelta(minutes=5)
+# ==== IN-MEMORY CACHE (LRU + TTL, dibatasi jumlah entry & byte) ====
+# Periode yang sudah final (sebelum D-CACHE_SETTLE_DAYS) tidak pernah kedaluwarsa
+period_ttl = age_based_ttl(settings.CACHE_SETTLE_DAYS, settings.CACHE_TTL_SECONDS)
 
-def get_cache(key):
-    if key in cache_store:
-        value, expiry = cache_store[key]
-        if datetime.now() < expiry:
-            return value
-        else:
-            del cache_store[key]  # expired
-    return None
+dashboard_cache = LRUTTLCache(
+    name="dashboard",
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    max_bytes=settings.CACHE_MAX_BYTES,
+    default_ttl=settings.CACHE_TTL_SECONDS,
+)
+
+# Agregat parsial per hari / per bulan, dipakai ulang lintas periode
+partial_store = PartialAggregateStore(
+    LRUTTLCache(
+        name="dashboard_partials",
+        max_entries=settings.PARTIAL_CACHE_MAX_ENTRIES,
+        max_bytes=settings.PARTIAL_CACHE_MAX_BYTES,
+        default_ttl=settings.CACHE_TTL_SECONDS,
+    ),
+    ttl_for=period_ttl,
+)
+
+
+# Response dashboard di-cache sebagai bytes JSON final (lihat cached_endpoint)
+ENCODED = {"encode": True, "gzip_min_bytes": settings.CACHE_GZIP_MIN_BYTES}
+
+
+def invalidate_period(start_date: date, end_date: date) -> dict:
+    """Buang cache response & agregat parsial yang beririsan dengan periode."""
+    responses = dashboard_cache.invalidate(
+        lambda key, entry: overlaps(entry.period, start_date, end_date)
+    )
+    partials = partial_store.invalidate(start_date, end_date)
+    watermarks.bump()  # ETag lama tidak berlaku lagi
+    logger.info(f"[CACHE INVALIDATE] {start_date} -> {end_date}: {responses} response, {partials} parsial")
+    return {"responses": responses, "partials": partials}
+
+
+def invalidate_changed_dates(table: str, dates: set[date] | None) -> None:
+    """
+    Subscriber watermark: buang hanya cache yang periodenya mencakup tanggal
+    yang berubah. Tanggal tidak diketahui (hapus/koreksi) -> buang semua periode.
+    """
+    if dates is None:
+        invalidate_period(date.min, date.max)
+    else:
+        for start, end in merge_spans([(d, d) for d in dates]):
+            invalidate_period(start, end)
+    # Feed aktivitas tidak punya periode: selalu dibuang bila ada tiket baru
+    dashboard_cache.invalidate(lambda key, entry: key.startswith("activities"))
+
+
+watermarks.subscribe(invalidate_changed_dates)
+
+# View yang isinya bergantung pada mkebun/mkebunalias
+KEBUN_VIEWS = ("by_location", "composition", "overview")
+
+
+def invalidate_kebun_views() -> None:
+    """Subscriber KebunDirectory: mapping kebun berubah -> buang response yang memakainya."""
+    responses = dashboard_cache.invalidate(lambda key, entry: key.startswith(KEBUN_VIEWS))
+    watermarks.bump()
+    logger.info(f"[CACHE INVALIDATE] mkebun berubah: {responses} response")
+
+
+kebun_directory.subscribe(invalidate_kebun_views)
 
-def set_cache(key, value):
-    cache_store[key] = (value, datetime.now() + CACHE_TTL)
 
 # Filter berdasarkan periode tanggal
 def get_date_filters(start_date: date | None, end_date: date | None):
@@ -48,55 +159,84 @@ def get_date_filters(start_date: date | None, end_date: date | None):
     return start, end
 
 
-@router.get("/summary")
-def get_production_summary(
-    start_date: date | None = Query(None),
-    end_date: date | None = Query(None),
-    db: Session = Depends(get_db)
-):
-    today = date.today()
-    if not start_date:
-        start_date = today.replace(day=1)
-    if not end_date:
-        end_date = today
-
-    cache_key = f"summary_{start_date}_{end_date}"
-    cached = get_cache(cache_key)
-    if cached:
-        logger.info(f"[CACHE HIT] summary {start_date} -> {end_date}")
-        return cached
+def normalize_dashboard_params(params: dict) -> dict:
+    """Normalisasi query parameter sebelum dipakai sebagai cache key & filter."""
+    if "start_date" in params or "end_date" in params:
+        params["start_date"], params["end_date"] = get_date_filters(
+            params.get("start_date"), params.get("end_date")
+        )
+    if "nama_kebun" in params:
+        params["nama_kebun"] = (params["nama_kebun"] or "").strip() or None
+    if "kode_kebun" in params:
+        params["kode_kebun"] = normalize_kode(params["kode_kebun"])
+    return params
 
-    logger.info(f"[CACHE MISS] summary {start_date} -> {end_date}")
 
+# === Turunan widget dari agregat TBS/CPO (dipakai endpoint tunggal & /overview) ===
+def summary_data(tbs, cpo) -> dict:
     # --- PRODUKSI TBS ---
-    tbs_query = (
-        db.query(
-            func.sum(TTbsDalam.Total).label("total_panen"),
-            func.count(distinct(TTbsDalam.TglTransaksiOne)).label("jumlah_hari")
-        )
-        .filter(TTbsDalam.TglTransaksiOne >= start_date)
-        .filter(TTbsDalam.TglTransaksiOne <= end_date)
-    )
-
-    tbs_result = tbs_query.first()
-    total_tbs = tbs_result.total_panen or 0
-    hari_tbs = tbs_result.jumlah_hari or 1
+    total_tbs = tbs.total or 0
+    hari_tbs = tbs.jumlah_hari or 1
     rata_tbs_per_hari = total_tbs / hari_tbs
 
     # --- PEMASARAN CPO ---
-    cpo_query = (
-        db.query(
-            func.sum(TTransPemasaran.TotalTmb).label("total_terjual"),
-            func.avg(cast(TTransPemasaran.FFA, Float)).label("rata_rata_ffa"),
-            func.max(cast(TTransPemasaran.FFA, Float)).label("max_ffa"),
-            func.min(cast(TTransPemasaran.FFA, Float)).label("min_ffa")
-        )
-        .filter(TTransPemasaran.NamaProduk == "CPO")
-        .filter(TTransPemasaran.TglTmb1 >= start_date)
-        .filter(TTransPemasaran.TglTmb1 <= end_date)
-    )
+    return {
+        "tbs": {
+            "total_panen": total_tbs,
+            "rata_rata_per_hari": rata_tbs_per_hari,
+        },
+        "cpo": {
+            "total_terjual": cpo.total_terjual or 0,
+            "rata_rata_ffa": cpo.rata_rata_ffa or 0,
+            "max_ffa": cpo.ffa_max or 0,
+            "min_ffa": cpo.ffa_min or 0
+        }
+    }
+
+
+def trend_data(tbs) -> list[dict]:
+    return [
+        {"tanggal": tanggal.isoformat(), "total": total or 0}
+        for tanggal, total in sorted(tbs.daily.items())
+    ]
+
+
+async def kebun_totals(db: AsyncSession, start_date: date, end_date: date) -> list:
+    return (await db.execute(kebun_totals_statement(start_date, end_date))).all()
+
+
+def by_location_data(rows) -> list[dict]:
+    # NamaKebun tanpa alias di mkebunalias tidak ikut (inner join)
+    return [{"kode_kebun": kode_kebun, "total": total or 0} for kode_kebun, total in rows]
 
-    cpo_result = cpo_query.first()
+
+def composition_data(tbs, nama_kebun: str | None, kode_kebun: str | None = None) -> list[dict]:
+    # Aturan alias sama dengan join by-location (normalize_alias); nama + kode = keduanya berlaku
+    results = tbs.by_produk(kebun_directory.names_for(kode_kebun, nama_kebun))
+    total_all = sum(float(total) for total in results.values())
+
+    # NamaProduk kosong di rekap = NULL di data mentah
+    return [
+        {
+            "nama_produk": nama_produk or None,
+            "total": float(total),
+            "persentase": round((float(total) / total_all * 100), 2) if total_all > 0 else 0,
+        }
+        for nama_produk, total in results.items()
+    ]
+
+
+@router.get("/summary")
+@cached_endpoint(dashboard_cache, "summary", ttl=period_ttl, normalize=normalize_dashboard_params, **ENCODED)
+async def get_production_summary(
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+):
+    # TBS (agregat parsial rekap harian) dan CPO di-query paralel
+    tbs, cpo = await run_concurrently(
+        lambda db: partial_store.aggregate(db, TBS, start_date, end_date),
+        lambda db: partial_store.aggregate(db, CPO, start_date, end_date),
+    )
 
     response = {
         "message": "Production & CPO summary retrieved successfully",
@@ -104,224 +244,247 @@ def get_production_summary(
             "start_date": str(start_date),
             "end_date": str(end_date)
         },
-        "data": {
-            "tbs": {
-                "total_panen": total_tbs,
-                "rata_rata_per_hari": rata_tbs_per_hari,
-            },
-            "cpo": {
-                "total_terjual": cpo_result.total_terjual or 0,
-                "rata_rata_ffa": cpo_result.rata_rata_ffa or 0,
-                "max_ffa": cpo_result.max_ffa or 0,
-                "min_ffa": cpo_result.min_ffa or 0
-            }
-        }
+        "data": summary_data(tbs, cpo),
     }
 
-    set_cache(cache_key, response)
     return response
 
+# Sumber feed aktivitas: (label, urutan, NoTransaksi, produk, total, tanggal, waktu).
+# `urutan` jadi tie-breaker antar sumber untuk transaksi dengan tanggal & waktu yang sama.
+ACTIVITY_SOURCES = [
+    ("TBS Dalam", 0, TTbsDalam.NoTransaksi, TTbsDalam.NamaProduk, TTbsDalam.Total,
+     TTbsDalam.TglTransaksiOne, TTbsDalam.TimeTmbOne),
+    ("Lintas Keluar", 1, TTransLintasKeluar.NoTransaksi, TTransLintasKeluar.NamaProduk, TTransLintasKeluar.Total,
+     TTransLintasKeluar.TglTmb1, TTransLintasKeluar.TimeTmb1),
+    ("Pemasaran", 2, TTransPemasaran.NoTransaksi, TTransPemasaran.NamaProduk, TTransPemasaran.TotalTmb,
+     TTransPemasaran.TglTmb1, TTransPemasaran.TimeTmb1),
+]
+
+
+def activity_branch(source_def, limit: int, cursor: dict | None):
+    """SELECT top-N satu sumber, urut (tanggal, waktu, NoTransaksi) DESC memakai index descending."""
+    source, urutan, no_transaksi, produk, total, tanggal, waktu = source_def
+    query = (
+        select(
+            literal(source).label("source"),
+            literal(urutan).label("urutan"),
+            no_transaksi.label("no_transaksi"),
+            produk.label("produk"),
+            total.label("total"),
+            tanggal.label("tanggal"),
+            waktu.label("waktu"),
+        )
+        .where(tanggal.is_not(None))
+    )
+    if cursor:
+        if urutan < cursor["urutan"]:
+            tie = true()
+        elif urutan > cursor["urutan"]:
+            tie = false()
+        else:
+            tie = no_transaksi < cursor["no_transaksi"]
+        query = query.where(before_keyset(tanggal, waktu, cursor["tanggal"], cursor["waktu"], tie))
+    return query.order_by(tanggal.desc(), waktu.desc(), no_transaksi.desc()).limit(limit)
+
+
+def activity_sort_key(row):
+    """Urutan global feed: tanggal, waktu (NULL paling akhir), urutan sumber, NoTransaksi."""
+    return (row.tanggal, row.waktu is not None, row.waktu or time.min, row.urutan, row.no_transaksi)
+
+
+def parse_activity_cursor(before: str | None) -> dict | None:
+    if not before:
+        return None
+    values = decode_cursor(before)
+    return {
+        "tanggal": parse_cursor_date(values.get("tanggal")),
+        "waktu": parse_cursor_time(values.get("waktu")),
+        "urutan": int(values.get("urutan", 0)),
+        "no_transaksi": str(values.get("no_transaksi", "")),
+    }
+
+
+def activity_item(row) -> dict:
+    return {
+        "source": row.source,
+        "no_transaksi": row.no_transaksi,
+        "produk": row.produk,
+        "total": row.total,
+        "tanggal": str(row.tanggal),
+        "waktu": str(row.waktu) if row.waktu is not None else None,
+    }
+
+
 @router.get("/activities")
-def get_dashboard_activities(db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)):
+@cached_endpoint(dashboard_cache, "activities", ttl=settings.ACTIVITIES_CACHE_TTL_SECONDS, **ENCODED)
+async def get_dashboard_activities(
+    limit: int = Query(20, ge=1, le=100),
+    before: str | None = Query(None, description="Cursor dari next_cursor halaman sebelumnya"),
+    current_user: dict = Depends(get_current_user),
+):
     """Menampilkan kombinasi aktifitas terbaru dari TBS Dalam, Lintas Keluar, dan Pemasaran"""
-    from sqlalchemy import desc
+    cursor = parse_activity_cursor(before)
 
-    tbs_activities = (
-        db.query(TTbsDalam.NoTransaksi, TTbsDalam.NamaProduk, TTbsDalam.Total, TTbsDalam.TglTransaksiOne)
-        .order_by(desc(TTbsDalam.TglTransaksiOne))
-        .limit(10)
-        .all()
-    )
-    lintas_activities = (
-        db.query(TTransLintasKeluar.NoTransaksi, TTransLintasKeluar.NamaProduk, TTransLintasKeluar.Total, TTransLintasKeluar.TglTmb1)
-        .order_by(desc(TTransLintasKeluar.TglTmb1))
-        .limit(5)
-        .all()
-    )
-    pemasaran_activities = (
-        db.query(TTransPemasaran.NoTransaksi, TTransPemasaran.NamaProduk, TTransPemasaran.TotalTmb, TTransPemasaran.TglTmb1)
-        .order_by(desc(TTransPemasaran.TglTmb1))
-        .limit(5)
-        .all()
-    )
+    # Top-N tiap sumber di-query paralel (masing-masing sudah terurut dari index),
+    # lalu digabung dengan k-way merge dan dipotong ke `limit`
+    async def fetch(db: AsyncSession, source_def):
+        return (await db.execute(activity_branch(source_def, limit, cursor))).all()
 
-    combined = []
-    for trx in tbs_activities:
-        combined.append({
-            "source": "TBS Dalam",
-            "no_transaksi": trx.NoTransaksi,
-            "produk": trx.NamaProduk,
-            "total": trx.Total,
-            "tanggal": str(trx.TglTransaksiOne)
-        })
-    for trx in lintas_activities:
-        combined.append({
-            "source": "Lintas Keluar",
-            "no_transaksi": trx.NoTransaksi,
-            "produk": trx.NamaProduk,
-            "total": trx.Total,
-            "tanggal": str(trx.TglTmb1)
-        })
-    for trx in pemasaran_activities:
-        combined.append({
-            "source": "Pemasaran",
-            "no_transaksi": trx.NoTransaksi,
-            "produk": trx.NamaProduk,
-            "total": trx.TotalTmb,
-            "tanggal": str(trx.TglTmb1)
+    streams = await run_concurrently(
+        *[lambda db, src=src: fetch(db, src) for src in ACTIVITY_SOURCES]
+    )
+    rows = list(islice(heapq.merge(*streams, key=activity_sort_key, reverse=True), limit))
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            "tanggal": last.tanggal,
+            "waktu": last.waktu,
+            "urutan": last.urutan,
+            "no_transaksi": last.no_transaksi,
         })
 
-    # Sort all activities descending by date
-    combined = sorted(combined, key=lambda x: x["tanggal"], reverse=True)
-
     return {
         "message": "Recent activities retrieved successfully",
-        "data": combined[:20],
+        "data": [activity_item(row) for row in rows],
+        "next_cursor": next_cursor,
     }
 
 @router.get("/production/trend")
-def get_production_trend(
+@cached_endpoint(dashboard_cache, "trend", ttl=period_ttl, normalize=normalize_dashboard_params, **ENCODED)
+async def get_production_trend(
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
-    db: Session = Depends(get_db)
+    granularity: Literal["day", "week", "month", "quarter", "year", "fiscal_quarter", "fiscal_year"] = Query(
+        "day", description="Satu titik per hari/minggu/bulan/kuartal/tahun (atau periode fiskal)"
+    ),
+    max_points: int | None = Query(
+        None, ge=3, le=settings.TREND_MAX_POINTS_LIMIT,
+        description="Downsampling LTTB di server bila titik lebih banyak dari ini",
+    ),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    today = date.today()
-    if not start_date:
-        start_date = today.replace(day=1)
-    if not end_date:
-        end_date = today
-
-    cache_key = f"trend_{start_date}_{end_date}"
-    cached = get_cache(cache_key)
-    if cached:
-        logger.info(f"[CACHE HIT] trend {start_date} -> {end_date}")
-        return cached
-
-    logger.info(f"[CACHE MISS] trend {start_date} -> {end_date}")
-
-    query = (
-        db.query(
-            TTbsDalam.TglTransaksiOne.label("tanggal"),
-            func.sum(TTbsDalam.Total).label("total_produksi")
-        )
-        .filter(TTbsDalam.TglTransaksiOne >= start_date)
-        .filter(TTbsDalam.TglTransaksiOne <= end_date)
-        .group_by(TTbsDalam.TglTransaksiOne)
-        .order_by(TTbsDalam.TglTransaksiOne)
-    )
+    """
+    Trend produksi TBS. Granularity selain "day" dikelompokkan di SQL lewat
+    dimensi tanggal mkalender (label = tanggal awal periode; periode di tepi
+    rentang bisa parsial) dan hanya tersedia dalam rentang mkalender.
+    `max_points` membatasi jumlah titik apa pun panjang rentangnya.
+    """
+    if granularity == "day":
+        tbs = await partial_store.aggregate(db, TBS, start_date, end_date)
+        data = trend_data(tbs)
+    else:
+        if not calendar_covers(start_date, end_date):
+            raise HTTPException(
+                status_code=422,
+                detail=f"granularity {granularity} hanya untuk periode {CALENDAR_START} s/d {CALENDAR_END}",
+            )
+        statement = bucket_totals_statement(granularity, start_date, end_date, settings.FISCAL_YEAR_START_MONTH)
+        rows = (await db.execute(statement)).all()
+        data = [{"tanggal": bucket.isoformat(), "total": total or 0} for bucket, total in rows]
 
-    results = query.all()
-    data = [
-        {"tanggal": r.tanggal.isoformat(), "total": r.total_produksi or 0}
-        for r in results
-    ]
+    if max_points and len(data) > max_points:
+        points = [(date.fromisoformat(p["tanggal"]).toordinal(), float(p["total"])) for p in data]
+        data = [data[i] for i in lttb(points, max_points)]
 
     response = {
         "message": "Production trend retrieved successfully",
         "period": {"start_date": str(start_date), "end_date": str(end_date)},
+        "granularity": granularity,
         "data": data
     }
 
-    set_cache(cache_key, response)
     return response
 
 @router.get("/production/by-location")
-def get_production_by_location(
+@cached_endpoint(dashboard_cache, "by_location", ttl=period_ttl, normalize=normalize_dashboard_params, **ENCODED)
+async def get_production_by_location(
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    today = date.today()
-    if not start_date:
-        start_date = today.replace(day=1)
-    if not end_date:
-        end_date = today
-
-    cache_key = f"by_location_{start_date}_{end_date}"
-    cached = get_cache(cache_key)
-    if cached:
-        logger.info(f"[CACHE HIT] by-location {start_date} -> {end_date}")
-        return cached
-
-    logger.info(f"[CACHE MISS] by-location {start_date} -> {end_date}")
-
-    query = (
-        db.query(
-            TTbsDalam.NamaKebun.label("nama_kebun"),
-            func.sum(TTbsDalam.Total).label("total_produksi")
-        )
-        .filter(TTbsDalam.TglTransaksiOne >= start_date)
-        .filter(TTbsDalam.TglTransaksiOne <= end_date)
-        .group_by(TTbsDalam.NamaKebun)
-    )
-
-    results = query.all()
-    data = []
-    for r in results:
-        kode_kebun = get_kode_kebun(r.nama_kebun)
-        if not kode_kebun:
-            continue  # skip kebun yang tidak dikenali
-        data.append({
-            "kode_kebun": kode_kebun,
-            "total": r.total_produksi or 0
-        })
+    """Total TBS per kode kebun; NamaKebun dipetakan lewat mkebunalias dan dikelompokkan di SQL."""
+    rows = await kebun_totals(db, start_date, end_date)
 
     response = {
         "message": "Production by location (KodeKebun) retrieved successfully",
         "period": {"start_date": str(start_date), "end_date": str(end_date)},
-        "data": data,
+        "data": by_location_data(rows),
     }
 
-    set_cache(cache_key, response)
     return response
 
 @router.get("/production/composition")
-def get_production_composition(
+@cached_endpoint(dashboard_cache, "composition", ttl=period_ttl, normalize=normalize_dashboard_params, **ENCODED)
+async def get_production_composition(
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
     nama_kebun: str | None = Query(None),
-    db: Session = Depends(get_db),
+    kode_kebun: str | None = Query(None, description="Semua alias NamaKebun untuk kode ini"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Menampilkan proporsi produk berdasarkan NamaProduk (pie chart).
-    Bisa difilter berdasarkan tanggal dan NamaKebun.
+    Bisa difilter berdasarkan tanggal dan NamaKebun dan/atau KodeKebun
+    (keduanya diisi = NamaKebun harus alias dari kode tersebut).
     """
-    start, end = get_date_filters(start_date, end_date)
-
-    query = (
-        db.query(
-            TTbsDalam.NamaProduk,
-            func.sum(TTbsDalam.Total).label("total")
-        )
-        .filter(
-            and_(
-                TTbsDalam.TglTransaksiOne >= start,
-                TTbsDalam.TglTransaksiOne <= end,
-            )
-        )
-    )
+    tbs = await partial_store.aggregate(db, TBS, start_date, end_date)
 
-    if nama_kebun:
-        query = query.filter(TTbsDalam.NamaKebun == nama_kebun)
+    return {
+        "message": "Production composition retrieved successfully",
+        "filters": {
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "nama_kebun": nama_kebun,
+            "kode_kebun": kode_kebun,
+        },
+        "data": composition_data(tbs, nama_kebun, kode_kebun),
+    }
 
-    results = query.group_by(TTbsDalam.NamaProduk).all()
-    total_all = sum(float(r.total) for r in results)
 
-    data = [
-        {
-            "nama_produk": r.NamaProduk,
-            "total": float(r.total),
-            "persentase": round((float(r.total) / total_all * 100), 2) if total_all > 0 else 0,
-        }
-        for r in results
-    ]
+@router.get("/overview")
+@cached_endpoint(dashboard_cache, "overview", ttl=period_ttl, normalize=normalize_dashboard_params, **ENCODED)
+async def get_dashboard_overview(
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    nama_kebun: str | None = Query(None, description="Filter untuk widget komposisi"),
+    kode_kebun: str | None = Query(None, description="Filter untuk widget komposisi"),
+):
+    """
+    Semua widget halaman utama dalam satu request. Satu agregat TBS per
+    (tanggal, NamaKebun, NamaProduk) dipakai bersama untuk summary, trend,
+    dan composition; by-location dari GROUP BY kode kebun yang jalan paralel.
+    Isi tiap bagian sama dengan endpoint-nya masing-masing.
+    """
+    tbs, cpo, kebun_rows = await run_concurrently(
+        lambda db: partial_store.aggregate(db, TBS, start_date, end_date),
+        lambda db: partial_store.aggregate(db, CPO, start_date, end_date),
+        lambda db: kebun_totals(db, start_date, end_date),
+    )
 
     return {
-        "message": "Production composition retrieved successfully",
+        "message": "Dashboard overview retrieved successfully",
         "filters": {
-            "start_date": str(start),
-            "end_date": str(end),
+            "start_date": str(start_date),
+            "end_date": str(end_date),
             "nama_kebun": nama_kebun,
+            "kode_kebun": kode_kebun,
+        },
+        "data": {
+            "summary": summary_data(tbs, cpo),
+            "trend": trend_data(tbs),
+            "by_location": by_location_data(kebun_rows),
+            "composition": composition_data(tbs, nama_kebun, kode_kebun),
         },
-        "data": data,
     }
+
+
+# View yang di-warm di background (lihat app/services/cache_warmer.py)
+WARM_VIEWS = [
+    get_production_summary,
+    get_production_trend,
+    get_production_by_location,
+    get_production_composition,
+    get_dashboard_overview,
+]
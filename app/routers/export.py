@@ -0,0 +1,75 @@
+# app/routers/export.py
+import logging
+from datetime import date
+from typing import Literal
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.export import EXPORT_FORMATS, EXPORT_TABLES, export_batches, gzip_stream
+from app.services.mapping_kebun import normalize_kode
+from app.services.security import get_current_user
+
+logger = logging.getLogger("APN-Riau.export")
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+class ExportStreamingResponse(StreamingResponse):
+    """StreamingResponse yang selalu menutup generator (dan koneksi DB-nya), juga saat client putus."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        except BaseException:
+            logger.warning(f"[EXPORT] {scope.get('path')} dihentikan sebelum selesai (client putus/error)")
+            raise
+        finally:
+            # shield: saat client putus scope-nya sudah dibatalkan, koneksi tetap harus dikembalikan
+            with anyio.CancelScope(shield=True):
+                await self.body_iterator.aclose()
+
+
+@router.get("/{table}")
+async def export_table(
+    table: str,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    nama_kebun: str | None = Query(None),
+    kode_kebun: str | None = Query(None, description="Semua alias NamaKebun untuk kode ini"),
+    format: Literal["csv", "ndjson", "arrow", "parquet"] = Query("csv"),
+    gzip: bool = Query(False, description="Kompres output menjadi file .gz"),
+):
+    """
+    Unduh baris mentah transaksi satu periode sebagai CSV, NDJSON, atau kolumnar
+    (Arrow IPC stream / Parquet, skema dari tipe kolom model). Data dibaca per
+    batch lewat server-side cursor dan langsung dialirkan ke client.
+    """
+    spec = EXPORT_TABLES.get(table)
+    if spec is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Tabel '{table}' tidak tersedia untuk export")
+    if start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date harus <= end_date")
+
+    nama_kebun = (nama_kebun or "").strip() or None
+    kode_kebun = normalize_kode(kode_kebun)
+    body = export_batches(spec, format, start_date, end_date, nama_kebun, settings.EXPORT_BATCH_SIZE, kode_kebun)
+    filename = f"{table}_{start_date}_{end_date}.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        body = gzip_stream(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    logger.info(f"[EXPORT] {table} {start_date} -> {end_date} kebun={nama_kebun or kode_kebun} format={format} gzip={gzip}")
+    return ExportStreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,31 @@
+# app/routers/metrics.py
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
+
+from app.core.config import settings
+from app.core.database import async_pool_telemetry, sync_pool_telemetry
+from app.core.metrics import CONTENT_TYPE, cache_collector, pool_collector, registry
+from app.core.security import token_cache
+from app.routers.auth import user_cache
+from app.routers.dashboard import dashboard_cache, partial_store
+from app.services.security import bearer_token
+
+router = APIRouter(tags=["Metrics"])
+
+registry.add_collector(cache_collector([dashboard_cache, partial_store.cache, token_cache, user_cache]))
+registry.add_collector(pool_collector([sync_pool_telemetry, async_pool_telemetry]))
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(request: Request):
+    """
+    Metrik format teks Prometheus: latency per template route, request in-flight,
+    hit/miss/eviction cache, durasi statement DB, dan pool koneksi.
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not secrets.compare_digest(bearer_token(request) or "", settings.METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token metrics tidak valid")
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,123 @@
+# app/routers/transactions.py
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.services.mapping_kebun import normalize_kode
+from app.services.security import get_current_user
+from app.services.transactions import (
+    TRANSACTION_TABLES,
+    listing_page,
+    listing_statement,
+    parse_listing_cursor,
+)
+
+router = APIRouter(
+    prefix="/transactions",
+    tags=["Transactions"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+async def list_transactions(
+    table: str,
+    db: AsyncSession,
+    limit: int,
+    before: str | None,
+    start_date: date | None,
+    end_date: date | None,
+    nama_kebun: str | None,
+    nama_produk: str | None,
+    lokasi: str | None,
+    kode_kebun: str | None = None,
+) -> dict:
+    spec = TRANSACTION_TABLES[table]
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "nama_kebun": (nama_kebun or "").strip() or None,
+        "kode_kebun": normalize_kode(kode_kebun),
+        "nama_produk": (nama_produk or "").strip() or None,
+        "lokasi": (lokasi or "").strip() or None,
+    }
+    cursor = parse_listing_cursor(table, before)
+    rows = (await db.execute(listing_statement(spec, cursor, limit, **filters))).all()
+    data, next_cursor = listing_page(table, spec, rows, limit)
+    return {
+        "message": f"Transactions {table} retrieved successfully",
+        "filters": {key: str(value) if value is not None else None for key, value in filters.items()},
+        "data": data,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/tbs-dalam")
+async def list_tbs_dalam(
+    limit: int = Query(50, ge=1, le=500),
+    before: str | None = Query(None, description="Cursor dari next_cursor halaman sebelumnya"),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    nama_kebun: str | None = Query(None),
+    kode_kebun: str | None = Query(None, description="Semua alias NamaKebun untuk kode ini"),
+    nama_produk: str | None = Query(None),
+    lokasi: str | None = Query(None, description="lokasi_penimbangan"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Daftar tiket TBS Dalam terbaru dengan keyset pagination (tanggal, waktu, NoTransaksi)"""
+    return await list_transactions(
+        "ttbsdalam", db, limit, before, start_date, end_date, nama_kebun, nama_produk, lokasi, kode_kebun
+    )
+
+
+@router.get("/lintas")
+async def list_lintas(
+    limit: int = Query(50, ge=1, le=500),
+    before: str | None = Query(None, description="Cursor dari next_cursor halaman sebelumnya"),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    nama_produk: str | None = Query(None),
+    lokasi: str | None = Query(None, description="id_lokasi"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Daftar transaksi Lintas terbaru dengan keyset pagination (tanggal, waktu, NoTransaksi)"""
+    return await list_transactions(
+        "ttranslintas", db, limit, before, start_date, end_date, None, nama_produk, lokasi
+    )
+
+
+@router.get("/lintas-keluar")
+async def list_lintas_keluar(
+    limit: int = Query(50, ge=1, le=500),
+    before: str | None = Query(None, description="Cursor dari next_cursor halaman sebelumnya"),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    nama_kebun: str | None = Query(None, description="Asal"),
+    kode_kebun: str | None = Query(None, description="Semua alias Asal untuk kode ini"),
+    nama_produk: str | None = Query(None),
+    lokasi: str | None = Query(None, description="id_lokasi"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Daftar transaksi Lintas Keluar terbaru dengan keyset pagination (tanggal, waktu, NoTransaksi)"""
+    return await list_transactions(
+        "ttranslintaskeluar", db, limit, before, start_date, end_date, nama_kebun, nama_produk, lokasi, kode_kebun
+    )
+
+
+@router.get("/pemasaran")
+async def list_pemasaran(
+    limit: int = Query(50, ge=1, le=500),
+    before: str | None = Query(None, description="Cursor dari next_cursor halaman sebelumnya"),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    nama_kebun: str | None = Query(None, description="Asal"),
+    kode_kebun: str | None = Query(None, description="Semua alias Asal untuk kode ini"),
+    nama_produk: str | None = Query(None),
+    lokasi: str | None = Query(None, description="id_lokasi"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Daftar transaksi Pemasaran terbaru dengan keyset pagination (tanggal, waktu, NoTransaksi)"""
+    return await list_transactions(
+        "ttranspemasaran", db, limit, before, start_date, end_date, nama_kebun, nama_produk, lokasi, kode_kebun
+    )
@@ -0,0 +1,109 @@
+import io
+from contextlib import aclosing
+from typing import AsyncIterator, Iterable
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import BigInteger, Date, Float, Integer, String, Time
+
+# Kolom teks dengan nilai berulang (sedikit variasi) -> dictionary encoding
+DICTIONARY_COLUMNS = {"NamaKebun", "NamaProduk", "Divisi", "NamaPT", "JenisTbs", "Asal", "Tujuan"}
+
+# Urutan penting: BigInteger turunan Integer
+ARROW_TYPES = [
+    (BigInteger, pa.int64()),
+    (Integer, pa.int32()),
+    (Float, pa.float64()),
+    (Date, pa.date32()),
+    (Time, pa.time64("us")),
+    (String, pa.string()),
+]
+
+
+def arrow_field(column) -> pa.Field:
+    """Field Arrow dari tipe kolom SQLAlchemy."""
+    for sa_type, arrow_type in ARROW_TYPES:
+        if isinstance(column.type, sa_type):
+            break
+    else:
+        arrow_type = pa.string()
+    if column.name in DICTIONARY_COLUMNS and arrow_type == pa.string():
+        arrow_type = pa.dictionary(pa.int32(), pa.string())
+    return pa.field(column.name, arrow_type, nullable=True)
+
+
+def arrow_schema(columns) -> pa.Schema:
+    return pa.schema([arrow_field(column) for column in columns])
+
+
+def record_batch(schema: pa.Schema, rows: list) -> pa.RecordBatch:
+    """Susun RecordBatch kolom per kolom dari list baris (tuple) hasil query."""
+    values = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for field, column in zip(schema, values):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(column, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(column, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ChunkSink(io.RawIOBase):
+    """Sink tulis-saja yang menampung bytes sampai diambil; posisi tetap dihitung kumulatif."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def open_writer(fmt: str, sink: ChunkSink, schema: pa.Schema):
+    if fmt == "arrow":
+        return pa.ipc.new_stream(sink, schema)
+    # Parquet: tiap batch jadi row group tersendiri, dikompres zstd
+    return pq.ParquetWriter(sink, schema, compression="zstd")
+
+
+async def encode_columnar(batches: AsyncIterator[list], columns, fmt: str) -> AsyncIterator[bytes]:
+    """Tulis batch baris sebagai Arrow IPC stream atau Parquet, dialirkan per record batch."""
+    schema = arrow_schema(columns)
+    sink = ChunkSink()
+    writer = open_writer(fmt, sink, schema)
+    try:
+        async with aclosing(batches):
+            async for rows in batches:
+                writer.write_batch(record_batch(schema, rows))
+                data = sink.drain()
+                if data:
+                    yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def encode_columnar_rows(rows: Iterable, columns, fmt: str, batch_size: int) -> bytes:
+    """Versi sinkron (untuk benchmark/test): semua baris sekaligus menjadi satu file."""
+    schema = arrow_schema(columns)
+    sink = ChunkSink()
+    writer = open_writer(fmt, sink, schema)
+    rows = list(rows)
+    for start in range(0, len(rows), batch_size):
+        writer.write_batch(record_batch(schema, rows[start:start + batch_size]))
+    writer.close()
+    return sink.drain()
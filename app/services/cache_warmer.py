@@ -0,0 +1,70 @@
+import asyncio
+import inspect
+import logging
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Callable
+
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger("APN-Riau.cache_warmer")
+
+
+def previous_month(today: date) -> tuple[date, date]:
+    last_day = today.replace(day=1) - timedelta(days=1)
+    return last_day.replace(day=1), last_day.replace(day=monthrange(last_day.year, last_day.month)[1])
+
+
+# Rentang tanggal yang bisa dipilih lewat CACHE_WARM_RANGES
+WARM_RANGES: dict[str, Callable[[date], tuple[date, date]]] = {
+    "month_to_date": lambda today: (today.replace(day=1), today),  # default semua endpoint dashboard
+    "last_7_days": lambda today: (today - timedelta(days=6), today),
+    "previous_month": previous_month,
+    "year_to_date": lambda today: (date(today.year, 1, 1), today),
+}
+
+
+def resolve_ranges(names: list[str], today: date | None = None) -> dict[str, tuple[date, date]]:
+    today = today or date.today()
+    unknown = [name for name in names if name not in WARM_RANGES]
+    if unknown:
+        logger.warning(f"[WARMER] Rentang tidak dikenal diabaikan: {', '.join(unknown)}")
+    return {name: WARM_RANGES[name](today) for name in names if name in WARM_RANGES}
+
+
+async def warm_view(view, start_date: date, end_date: date, semaphore: asyncio.Semaphore) -> bool:
+    """Hitung ulang satu view (route ber-cached_endpoint) untuk satu periode."""
+    async with semaphore:
+        try:
+            if "db" in inspect.signature(view).parameters:
+                async with AsyncSessionLocal() as db:
+                    await view.refresh(start_date=start_date, end_date=end_date, db=db)
+            else:
+                await view.refresh(start_date=start_date, end_date=end_date)
+            return True
+        except Exception:
+            logger.exception(f"[WARMER] Gagal warm {view.__name__} {start_date} -> {end_date}")
+            return False
+
+
+async def warm_once(views: list, range_names: list[str], concurrency: int) -> int:
+    """
+    Isi ulang cache semua view x rentang. `concurrency` membatasi job yang jalan
+    bersamaan (tiap job memakai 1-2 koneksi) agar warming tidak menghabiskan pool.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    ranges = resolve_ranges(range_names)
+    results = await asyncio.gather(*(
+        warm_view(view, start, end, semaphore)
+        for view in views
+        for start, end in ranges.values()
+    ))
+    return sum(results)
+
+
+async def run_cache_warmer(views: list, range_names: list[str], interval: float, concurrency: int) -> None:
+    """Background task: warm saat startup, lalu berkala sebelum entry volatile kedaluwarsa."""
+    while True:
+        warmed = await warm_once(views, range_names, concurrency)
+        logger.info(f"[WARMER] {warmed} view di-warm ({', '.join(range_names)})")
+        await asyncio.sleep(interval)
@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.m_kalender import MKalender
+from app.models.t_tbs_dalam_harian import TTbsDalamHarian
+
+# Granularity trend -> kolom awal periode di mkalender ("day" langsung dari rekap harian)
+GRANULARITY_COLUMNS = {
+    "week": "minggu_mulai",
+    "month": "bulan_mulai",
+    "quarter": "kuartal_mulai",
+    "year": "tahun_mulai",
+    "fiscal_quarter": "kuartal_fiskal_mulai",
+    "fiscal_year": "tahun_fiskal_mulai",
+}
+
+# Rentang mkalender (sama dengan backfill migrasi 4e7c1d2a9b30); trend per periode
+# di luar rentang ini ditolak, endpoint GET tidak pernah menulis ke mkalender
+CALENDAR_START = date(2015, 1, 1)
+CALENDAR_END = date(2035, 12, 31)
+
+
+def add_months(day: date, months: int) -> date:
+    """Tanggal 1 dari bulan `day` digeser `months` bulan."""
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+def calendar_row(tanggal: date, fiscal_start_month: int) -> dict:
+    """
+    Satu baris mkalender. Tahun fiskal dinamai menurut tahun berakhirnya
+    (mulai Juli: Jul 2025 - Jun 2026 = FY2026); mulai Januari = tahun kalender.
+    """
+    iso = tanggal.isocalendar()
+    bulan_mulai = tanggal.replace(day=1)
+    offset = (tanggal.month - fiscal_start_month) % 12  # bulan ke-n dalam tahun fiskal (0-based)
+    tahun_fiskal_mulai = add_months(bulan_mulai, -offset)
+    return {
+        "tanggal": tanggal,
+        "tahun": tanggal.year,
+        "kuartal": (tanggal.month - 1) // 3 + 1,
+        "bulan": tanggal.month,
+        "minggu_iso": iso.week,
+        "hari_iso": iso.weekday,
+        "minggu_mulai": tanggal - timedelta(days=iso.weekday - 1),
+        "bulan_mulai": bulan_mulai,
+        "kuartal_mulai": date(tanggal.year, (tanggal.month - 1) // 3 * 3 + 1, 1),
+        "tahun_mulai": date(tanggal.year, 1, 1),
+        "tahun_fiskal": tahun_fiskal_mulai.year + (1 if fiscal_start_month > 1 else 0),
+        "periode_fiskal": offset + 1,
+        "kuartal_fiskal_mulai": add_months(tahun_fiskal_mulai, offset // 3 * 3),
+        "tahun_fiskal_mulai": tahun_fiskal_mulai,
+    }
+
+
+def calendar_rows(start: date, end: date, fiscal_start_month: int) -> list[dict]:
+    return [
+        calendar_row(start + timedelta(days=i), fiscal_start_month)
+        for i in range((end - start).days + 1)
+    ]
+
+
+def calendar_covers(start: date, end: date) -> bool:
+    return CALENDAR_START <= start and end <= CALENDAR_END
+
+
+def seed_calendar(db: Session, fiscal_start_month: int) -> int:
+    """
+    Isi tanggal mkalender yang belum ada dalam CALENDAR_START..CALENDAR_END
+    (database dari create_all, tanpa alembic). Mengganti FISCAL_YEAR_START_MONTH
+    butuh `DELETE FROM mkalender` lebih dulu.
+    """
+    days = (CALENDAR_END - CALENDAR_START).days + 1
+    if db.scalar(select(func.count()).select_from(MKalender)) >= days:
+        return 0
+    existing = set(db.scalars(select(MKalender.tanggal).where(MKalender.tanggal.between(CALENDAR_START, CALENDAR_END))))
+    missing = [
+        row for row in calendar_rows(CALENDAR_START, CALENDAR_END, fiscal_start_month)
+        if row["tanggal"] not in existing
+    ]
+    if missing:
+        db.execute(insert(MKalender), missing)
+        db.commit()
+    return len(missing)
+
+
+def bucket_totals_statement(granularity: str, start: date, end: date, fiscal_start_month: int = 1):
+    """
+    Total TBS per awal periode (minggu/bulan/kuartal/tahun/fiskal), di-GROUP BY di SQL.
+    Range pada kolom periode membuat mkalender dibaca dari index (periode, tanggal)
+    dalam urutan GROUP BY, lalu rekap harian dicari per tanggal. LEFT JOIN mengunci
+    urutan itu (planner tidak bisa membalik join ke rekap harian + sort); periode
+    tanpa tiket dibuang lagi oleh HAVING, sama seperti inner join.
+    """
+    column = GRANULARITY_COLUMNS[granularity]
+    bucket = getattr(MKalender, column)
+    first_bucket = calendar_row(start, fiscal_start_month)[column]
+    return (
+        select(bucket, func.sum(TTbsDalamHarian.Total))
+        .select_from(MKalender)
+        .outerjoin(TTbsDalamHarian, TTbsDalamHarian.TglTransaksiOne == MKalender.tanggal)
+        .where(bucket.between(first_bucket, end), MKalender.tanggal.between(start, end))
+        .group_by(bucket)
+        .having(func.count(TTbsDalamHarian.TglTransaksiOne) > 0)
+        .order_by(bucket)
+    )
@@ -0,0 +1,41 @@
+from typing import Sequence
+
+
+def lttb(points: Sequence[tuple[float, float]], threshold: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets: pilih `threshold` indeks titik yang paling
+    menjaga bentuk kurva. Titik pertama & terakhir selalu ikut; tiap bucket di
+    antaranya menyumbang titik yang membentuk segitiga terbesar dengan titik
+    terpilih sebelumnya dan rata-rata bucket berikutnya.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    selected = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Rata-rata bucket berikutnya (bucket terakhir = titik terakhir)
+        next_start, next_end = end, min(int((i + 2) * bucket_size) + 1, n)
+        if i == threshold - 3:
+            next_start, next_end = n - 1, n
+        span = next_end - next_start
+        avg_x = sum(points[j][0] for j in range(next_start, next_end)) / span
+        avg_y = sum(points[j][1] for j in range(next_start, next_end)) / span
+
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    selected.append(n - 1)
+    return selected
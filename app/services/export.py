@@ -0,0 +1,123 @@
+import csv
+import io
+import logging
+import zlib
+from contextlib import aclosing
+from datetime import date
+from typing import AsyncIterator, Iterable
+
+import orjson
+from sqlalchemy import select
+
+from app.core.database import async_engine
+from app.services.arrow_export import encode_columnar
+from app.services.transactions import TRANSACTION_TABLES, TransactionTable, apply_filters
+
+logger = logging.getLogger("APN-Riau.export")
+
+
+# Tabel transaksi yang boleh diekspor
+EXPORT_TABLES = {
+    name: TRANSACTION_TABLES[name]
+    for name in ("ttbsdalam", "ttranslintaskeluar", "ttranspemasaran")
+}
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNAR_FORMATS = {"arrow", "parquet"}
+
+
+def export_statement(
+    spec: TransactionTable,
+    start_date: date,
+    end_date: date,
+    nama_kebun: str | None = None,
+    kode_kebun: str | None = None,
+):
+    """SELECT baris mentah satu periode, urut (tanggal, NoTransaksi) memakai index tanggal."""
+    query = (
+        select(*spec.columns)
+        .order_by(spec.column(spec.date_column), spec.model.NoTransaksi)
+        # Export boleh lebih lama dari DB_STATEMENT_TIMEOUT_MS yang berlaku untuk dashboard
+        .prefix_with("/*+ MAX_EXECUTION_TIME(0) */", dialect="mysql")
+    )
+    return apply_filters(
+        query, spec, start_date=start_date, end_date=end_date, nama_kebun=nama_kebun, kode_kebun=kode_kebun
+    )
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def encode_csv_batch(rows: Iterable, header: list[str] | None = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(header)
+    writer.writerows([csv_value(v) for v in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson_batch(rows: Iterable, keys: list[str]) -> bytes:
+    return b"".join(
+        orjson.dumps(dict(zip(keys, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows
+    )
+
+
+async def stream_rows(statement, batch_size: int) -> AsyncIterator[list]:
+    """
+    Baca hasil query per batch lewat server-side cursor (stream_results/yield_per),
+    sehingga memori tetap datar berapapun jumlah barisnya. Koneksi dikembalikan
+    ke pool begitu generator ditutup, termasuk saat client memutus download.
+    """
+    async with async_engine.connect() as conn:
+        result = await conn.stream(statement.execution_options(yield_per=batch_size))
+        async for batch in result.partitions(batch_size):
+            yield batch
+
+
+async def export_batches(
+    spec: TransactionTable,
+    fmt: str,
+    start_date: date,
+    end_date: date,
+    nama_kebun: str | None,
+    batch_size: int,
+    kode_kebun: str | None = None,
+) -> AsyncIterator[bytes]:
+    keys = [column.name for column in spec.columns]
+    statement = export_statement(spec, start_date, end_date, nama_kebun, kode_kebun)
+    if fmt in COLUMNAR_FORMATS:
+        async with aclosing(encode_columnar(stream_rows(statement, batch_size), spec.columns, fmt)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+        return
+    if fmt == "csv":
+        yield encode_csv_batch([], header=keys)
+    # aclosing: generator dalam ikut ditutup bila generator ini ditutup lebih awal
+    async with aclosing(stream_rows(statement, batch_size)) as batches:
+        async for batch in batches:
+            if fmt == "csv":
+                yield encode_csv_batch(batch)
+            else:
+                yield encode_ndjson_batch(batch, keys)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Kompres aliran chunk menjadi satu file gzip secara bertahap."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> header gzip
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+    yield compressor.flush()
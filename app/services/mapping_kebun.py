@@ -1,9 +1,21 @@
 import logging
+import time
+from datetime import date
+from typing import Callable
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.m_kebun import MKebun, MKebunAlias
+from app.models.t_tbs_dalam_harian import TTbsDalamHarian
 
 logger = logging.getLogger("APN-Riau.kebun_mapping")
 
-# === Mapping NamaKebun → KodeKebun ===
-KEBUN_CODE_MAP = {
+# === Isi awal mkebun (NamaKebun resmi → KodeKebun) ===
+# Sumber kebenaran ada di tabel; ini hanya untuk database baru / migrasi
+DEFAULT_KEBUN = {
     "KENCANA AMAL TANI 1": "KAT1",
     "KENCANA AMAL TANI 2": "KAT2",
     "KENCANA AMAL TANI 3": "KAT3",
@@ -14,15 +26,142 @@ KEBUN_CODE_MAP = {
     "PALMA S-2": "PS2",
 }
 
-def get_kode_kebun(nama_kebun: str) -> str | None:
+
+# === Aturan pencocokan NamaKebun <-> alias ===
+# Satu aturan: huruf kecil, tanpa spasi di akhir (lihat kebun_key_sql di model).
+# Di SQL lewat kolom generated alias_key / NamaKebunKey atau `kebun_key`, di Python
+# (agregat parsial di cache) lewat `normalize_alias`. LOWER() SQLite hanya
+# mengubah huruf ASCII; nama kebun di data timbangan memang ASCII.
+
+def kebun_key(column):
+    """Kunci pencocokan untuk kolom kebun yang tidak punya kolom generated (mis. Asal)."""
+    return func.lower(func.rtrim(column))
+
+
+def normalize_alias(nama_kebun: str) -> str:
+    return nama_kebun.rstrip(" ").lower()
+
+
+def normalize_kode(kode_kebun: str | None) -> str | None:
+    return (kode_kebun or "").strip().upper() or None
+
+
+def seed_default_kebun(db: Session) -> int:
+    """Isi mkebun & mkebunalias dari DEFAULT_KEBUN bila mkebun masih kosong."""
+    if db.scalar(select(func.count()).select_from(MKebun)):
+        return 0
+    db.execute(insert(MKebun), [
+        {"kode_kebun": kode, "nama_kebun": nama} for nama, kode in DEFAULT_KEBUN.items()
+    ])
+    db.execute(insert(MKebunAlias), [
+        {"alias": nama, "kode_kebun": kode} for nama, kode in DEFAULT_KEBUN.items()
+    ])
+    db.commit()
+    return len(DEFAULT_KEBUN)
+
+
+def kebun_totals_statement(start: date, end: date):
     """
-    Mengembalikan kode kebun berdasarkan nama kebun.
-    Jika nama tidak ditemukan, akan log peringatan dan return None.
+    Total TBS per kode kebun: mkebunalias di-join ke rekap harian lewat kunci
+    alias (kolom generated ber-index, tidak bergantung collation) dan di-GROUP BY di SQL.
     """
-    if not nama_kebun:
-        return None
+    return (
+        select(MKebunAlias.kode_kebun, func.sum(TTbsDalamHarian.Total))
+        .select_from(MKebunAlias)
+        .join(TTbsDalamHarian, TTbsDalamHarian.NamaKebunKey == MKebunAlias.alias_key)
+        .where(TTbsDalamHarian.TglTransaksiOne.between(start, end))
+        .group_by(MKebunAlias.kode_kebun)
+        .order_by(MKebunAlias.kode_kebun)
+    )
+
+
+def kode_kebun_filter(column, kode_kebun: str):
+    """Baris yang NamaKebun/Asal-nya alias dari kode ini, dengan aturan yang sama dengan by-location."""
+    return kebun_key(column).in_(
+        select(MKebunAlias.alias_key).where(MKebunAlias.kode_kebun == kode_kebun)
+    )
+
+
+class KebunDirectory:
+    """
+    Salinan mkebun + mkebunalias di memori proses. Kedua tabel kecil, jadi
+    refresh cukup membaca ulang semuanya (paling sering sekali per
+    `refresh_seconds`) dan membandingkannya dengan salinan lama. Bila berbeda,
+    salinan diganti dan subscriber dipanggil (mis. untuk membuang cache dashboard).
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.rows: tuple | None = None
+        self.names: dict[str, str] = {}
+        self.aliases: dict[str, tuple[str, ...]] = {}
+        self.by_alias: dict[str, str] = {}
+        self.refreshed_at: float | None = None
+        self.subscribers: list[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        self.subscribers.append(callback)
+
+    def is_stale(self) -> bool:
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_seconds
+
+    def load(self, rows: tuple) -> None:
+        names, aliases, by_alias = {}, {}, {}
+        for kode, nama, alias, alias_key in rows:
+            names[kode] = nama
+            aliases.setdefault(kode, [])
+            if alias is not None:
+                aliases[kode].append(alias)
+                by_alias[alias_key] = kode
+        # Ganti referensi sekaligus; request yang sedang berjalan memakai salinan lama
+        self.names = names
+        self.aliases = {kode: tuple(values) for kode, values in aliases.items()}
+        self.by_alias = by_alias
+        self.rows = rows
+
+    async def refresh(self) -> bool:
+        """Baca ulang tabel; True bila isinya berubah sejak refresh sebelumnya."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(MKebun.kode_kebun, MKebun.nama_kebun, MKebunAlias.alias, MKebunAlias.alias_key)
+                .outerjoin(MKebunAlias, MKebunAlias.kode_kebun == MKebun.kode_kebun)
+                .order_by(MKebun.kode_kebun, MKebunAlias.alias)
+            )
+            rows = tuple(tuple(row) for row in result)
+        self.refreshed_at = time.monotonic()
+        if rows == self.rows:
+            return False
+        initial = self.rows is None
+        self.load(rows)
+        if not initial:
+            logger.info(f"[KEBUN] mkebun berubah: {len(self.names)} kebun, {len(self.by_alias)} alias")
+            for callback in self.subscribers:
+                callback()
+        return True
+
+    async def ensure_fresh(self) -> None:
+        if self.is_stale():
+            await self.refresh()
+
+    def kode_for(self, nama_kebun: str | None) -> str | None:
+        return self.by_alias.get(normalize_alias(nama_kebun)) if nama_kebun else None
+
+    def aliases_for(self, kode_kebun: str) -> tuple[str, ...]:
+        """Semua ejaan NamaKebun untuk satu kode; kode tidak dikenal -> kosong."""
+        return self.aliases.get(kode_kebun, ())
+
+    def names_for(self, kode_kebun: str | None, nama_kebun: str | None = None) -> list[str] | None:
+        """
+        NamaKebun yang dicakup filter kebun (None = tanpa filter). Bila kode dan
+        nama sama-sama diisi keduanya berlaku: nama harus alias dari kode tersebut.
+        """
+        if not kode_kebun:
+            return [nama_kebun] if nama_kebun else None
+        if nama_kebun:
+            return [nama_kebun] if self.kode_for(nama_kebun) == kode_kebun else []
+        return list(self.aliases_for(kode_kebun))
+
+
+# Satu instance per proses, dipakai dashboard, listing transaksi, dan export
+kebun_directory = KebunDirectory(settings.KEBUN_REFRESH_SECONDS)
 
-    kode = KEBUN_CODE_MAP.get(nama_kebun)
-    if not kode:
-        logger.warning(f"Nama kebun tidak dikenali: {nama_kebun}")
-    return kode
\ No newline at end of file
@@ -0,0 +1,63 @@
+import base64
+import binascii
+from datetime import date, time
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: dict) -> str:
+    """Encode posisi keyset menjadi token opaque (base64 url-safe, tanpa padding)."""
+    raw = orjson.dumps(values, default=str)
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, orjson.JSONDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor tidak valid")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor tidak valid")
+    return values
+
+
+def parse_cursor_date(value) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor tidak valid")
+
+
+def parse_cursor_time(value) -> time | None:
+    if value is None:
+        return None
+    try:
+        return time.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor tidak valid")
+
+
+def before_keyset(date_col, time_col, cur_date: date, cur_time: time | None, tie_condition):
+    """
+    Kondisi keyset "sebelum cursor" untuk urutan (date DESC, time DESC, ...).
+    NULL pada kolom waktu diurutkan paling akhir dalam satu tanggal (perilaku
+    default MySQL/SQLite untuk DESC). `tie_condition` menentukan urutan untuk
+    baris dengan tanggal & waktu yang sama dengan cursor. Batas luar
+    `date <= cursor` membuat planner memakai satu range index yang sudah urut
+    (tanpa OR multi-index + sort ulang).
+    """
+    if cur_time is None:
+        same_day = and_(date_col == cur_date, time_col.is_(None), tie_condition)
+    else:
+        same_day = and_(
+            date_col == cur_date,
+            or_(
+                time_col < cur_time,
+                time_col.is_(None),
+                and_(time_col == cur_time, tie_condition),
+            ),
+        )
+    return and_(date_col <= cur_date, or_(date_col < cur_date, same_day))
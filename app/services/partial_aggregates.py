@@ -0,0 +1,292 @@
+import logging
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import Float, and_, cast, func, or_, select
+
+from app.core.cache import LRUTTLCache, overlaps
+from app.models.t_tbs_dalam_harian import TTbsDalamHarian
+from app.models.t_trans_pemasaran import TTransPemasaran
+from app.services.mapping_kebun import normalize_alias
+
+logger = logging.getLogger("APN-Riau.partial_aggregates")
+
+
+# === Agregat parsial & aturan merge ===
+
+@dataclass
+class TbsAggregate:
+    """
+    Agregat TBS untuk satu potongan periode.
+    `daily` = total per tanggal (hanya tanggal yang punya tiket),
+    `totals` = total per (NamaKebun, NamaProduk); string kosong berarti NULL.
+    """
+    daily: dict[date, Any] = field(default_factory=dict)
+    totals: dict[tuple[str, str], Any] = field(default_factory=dict)
+
+    @classmethod
+    def merge(cls, parts: list["TbsAggregate"]) -> "TbsAggregate":
+        merged = cls()
+        for part in parts:
+            merged.daily.update(part.daily)  # potongan periode tidak pernah overlap
+            for key, total in part.totals.items():
+                merged.totals[key] = merged.totals[key] + total if key in merged.totals else total
+        return merged
+
+    @property
+    def total(self):
+        return sum(self.daily.values()) if self.daily else None
+
+    @property
+    def jumlah_hari(self) -> int:
+        return len(self.daily)
+
+    def by_produk(self, nama_kebun: str | Iterable[str] | None = None) -> dict[str, Any]:
+        """Total per NamaProduk, opsional hanya untuk satu NamaKebun atau sekumpulan alias."""
+        if isinstance(nama_kebun, str):
+            nama_kebun = [nama_kebun] if nama_kebun else None
+        targets = {normalize_alias(nama) for nama in nama_kebun} if nama_kebun is not None else None
+        result: dict[str, Any] = {}
+        for (kebun, nama_produk), total in sorted(self.totals.items()):
+            if targets is not None and normalize_alias(kebun) not in targets:
+                continue
+            result[nama_produk] = result[nama_produk] + total if nama_produk in result else total
+        return result
+
+
+@dataclass
+class CpoAggregate:
+    """
+    Agregat penjualan CPO. Rata-rata FFA dibawa sebagai (sum, count) agar hasil
+    merge setara dengan AVG langsung; min/max di-merge dengan min/max.
+    Penjumlahan float di sini urutannya berbeda dengan SUM di database, jadi
+    total/rata-rata bisa selisih di digit terakhir (bandingkan dengan toleransi).
+    """
+    total_terjual: Any = None
+    ffa_sum: float = 0.0
+    ffa_count: int = 0
+    ffa_min: float | None = None
+    ffa_max: float | None = None
+
+    @classmethod
+    def merge(cls, parts: list["CpoAggregate"]) -> "CpoAggregate":
+        merged = cls()
+        for part in parts:
+            if part.total_terjual is not None:
+                merged.total_terjual = (
+                    part.total_terjual if merged.total_terjual is None
+                    else merged.total_terjual + part.total_terjual
+                )
+            merged.ffa_sum += part.ffa_sum
+            merged.ffa_count += part.ffa_count
+            if part.ffa_min is not None:
+                merged.ffa_min = part.ffa_min if merged.ffa_min is None else min(merged.ffa_min, part.ffa_min)
+            if part.ffa_max is not None:
+                merged.ffa_max = part.ffa_max if merged.ffa_max is None else max(merged.ffa_max, part.ffa_max)
+        return merged
+
+    @property
+    def rata_rata_ffa(self) -> float | None:
+        return self.ffa_sum / self.ffa_count if self.ffa_count else None
+
+
+# === Query sumber per hari ===
+
+def _span_filter(column, spans: list[tuple[date, date]]):
+    # BETWEEN luar = satu range index berurutan (GROUP BY tanpa sort); OR per span menyaring celahnya
+    envelope = column.between(min(start for start, _ in spans), max(end for _, end in spans))
+    if len(spans) == 1:
+        return envelope
+    return and_(envelope, or_(*[column.between(start, end) for start, end in spans]))
+
+
+def tbs_partials_statement(spans: list[tuple[date, date]]):
+    return (
+        select(
+            TTbsDalamHarian.TglTransaksiOne,
+            TTbsDalamHarian.NamaKebun,
+            TTbsDalamHarian.NamaProduk,
+            func.sum(TTbsDalamHarian.Total),
+        )
+        .where(_span_filter(TTbsDalamHarian.TglTransaksiOne, spans))
+        .group_by(
+            TTbsDalamHarian.TglTransaksiOne,
+            TTbsDalamHarian.NamaKebun,
+            TTbsDalamHarian.NamaProduk,
+        )
+    )
+
+
+def tbs_partials_from_rows(rows) -> dict[date, TbsAggregate]:
+    per_day: dict[date, TbsAggregate] = {}
+    for tanggal, nama_kebun, nama_produk, total in rows:
+        agg = per_day.setdefault(tanggal, TbsAggregate())
+        agg.daily[tanggal] = agg.daily[tanggal] + total if tanggal in agg.daily else total
+        agg.totals[(nama_kebun, nama_produk)] = total
+    return per_day
+
+
+def cpo_partials_statement(spans: list[tuple[date, date]]):
+    ffa = cast(TTransPemasaran.FFA, Float)
+    return (
+        select(
+            TTransPemasaran.TglTmb1,
+            func.sum(TTransPemasaran.TotalTmb),
+            func.sum(ffa),
+            func.count(ffa),
+            func.min(ffa),
+            func.max(ffa),
+        )
+        .where(TTransPemasaran.NamaProduk == "CPO")
+        .where(_span_filter(TTransPemasaran.TglTmb1, spans))
+        .group_by(TTransPemasaran.TglTmb1)
+    )
+
+
+def cpo_partials_from_rows(rows) -> dict[date, CpoAggregate]:
+    return {
+        tanggal: CpoAggregate(
+            total_terjual=total,
+            ffa_sum=ffa_sum or 0.0,
+            ffa_count=ffa_count or 0,
+            ffa_min=ffa_min,
+            ffa_max=ffa_max,
+        )
+        for tanggal, total, ffa_sum, ffa_count, ffa_min, ffa_max in rows
+    }
+
+
+@dataclass(frozen=True)
+class PartialKind:
+    name: str
+    aggregate: type
+    statement: Callable[[list[tuple[date, date]]], Any]
+    from_rows: Callable[[Any], dict]
+
+
+TBS = PartialKind("tbs", TbsAggregate, tbs_partials_statement, tbs_partials_from_rows)
+CPO = PartialKind("cpo", CpoAggregate, cpo_partials_statement, cpo_partials_from_rows)
+
+
+# === Pemecahan periode: bulan yang sudah tutup + sisa hari ===
+
+def split_period(start: date, end: date, today: date) -> list[tuple[date, date]]:
+    """
+    Pecah [start, end] menjadi potongan bulan penuh (hanya bulan yang sudah
+    selesai) dan potongan per hari untuk sisanya. Indeks dua tingkat ini membuat
+    jumlah potongan yang di-merge ~ jumlah bulan + 60 hari, bukan jumlah hari.
+    """
+    pieces = []
+    current = start
+    while current <= end:
+        month_end = current.replace(day=monthrange(current.year, current.month)[1])
+        if current.day == 1 and month_end <= end and month_end < today:
+            pieces.append((current, month_end))
+            current = month_end + timedelta(days=1)
+        else:
+            pieces.append((current, current))
+            current += timedelta(days=1)
+    return pieces
+
+
+def merge_spans(pieces: list[tuple[date, date]]) -> list[tuple[date, date]]:
+    spans: list[tuple[date, date]] = []
+    for start, end in sorted(pieces):
+        if spans and start <= spans[-1][1] + timedelta(days=1):
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def piece_key(kind: PartialKind, piece: tuple[date, date]) -> str:
+    start, end = piece
+    if start == end:
+        return f"{kind.name}:day:{start.isoformat()}"
+    return f"{kind.name}:month:{start.year:04d}-{start.month:02d}"
+
+
+@dataclass
+class PartialPlan:
+    """Hasil lookup cache untuk satu periode: potongan yang sudah ada dan yang perlu di-query."""
+    kind: PartialKind
+    pieces: list[tuple[date, date]]
+    found: dict[tuple[date, date], Any]
+    missing: list[tuple[date, date]]
+    # Potongan bulan pertama & terakhir periode: hanya ini yang disimpan juga per hari
+    edge_months: set[tuple[date, date]] = field(default_factory=set)
+
+    @property
+    def missing_spans(self) -> list[tuple[date, date]]:
+        return merge_spans(self.missing)
+
+
+class PartialAggregateStore:
+    """
+    Menyimpan agregat parsial per hari / per bulan di cache dan menyusun periode
+    sembarang dari potongan tersebut, sehingga hanya hari yang belum ada yang
+    di-query ke database.
+    """
+
+    def __init__(
+        self,
+        cache: LRUTTLCache,
+        ttl_for: Callable[[tuple[date, date]], float] | None = None,
+    ):
+        self.cache = cache
+        self.ttl_for = ttl_for or (lambda piece: None)
+
+    def plan(self, kind: PartialKind, start: date, end: date) -> PartialPlan:
+        found, missing = {}, []
+        pieces = split_period(start, end, date.today())
+        for piece in pieces:
+            agg = self.cache.get(piece_key(kind, piece))
+            if agg is None:
+                missing.append(piece)
+            else:
+                found[piece] = agg
+        months = [piece for piece in pieces if piece[0] != piece[1]]
+        edge_months = {months[0], months[-1]} if months else set()
+        return PartialPlan(kind, pieces, found, missing, edge_months)
+
+    def fill(self, plan: PartialPlan, rows) -> Any:
+        """Simpan hasil query untuk potongan yang hilang lalu kembalikan agregat gabungan."""
+        kind = plan.kind
+        per_day = kind.from_rows(rows)
+        empty = kind.aggregate()
+        parts = dict(plan.found)
+
+        for piece in plan.missing:
+            start, end = piece
+            days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+            day_parts = [per_day.get(d, empty) for d in days]
+            agg = kind.aggregate.merge(day_parts)
+            self.cache.set(piece_key(kind, piece), agg, ttl=self.ttl_for(piece), period=piece)
+            if piece in plan.edge_months:
+                # Periode yang digeser beberapa hari memotong bulan di tepi menjadi per hari;
+                # bulan di tengah tetap utuh, jadi tidak perlu disimpan per hari
+                for d, day_agg in zip(days, day_parts):
+                    self.cache.set(
+                        piece_key(kind, (d, d)), day_agg, ttl=self.ttl_for((d, d)), period=(d, d)
+                    )
+            parts[piece] = agg
+
+        if plan.missing:
+            logger.info(
+                f"[PARTIAL MISS] {kind.name}: {len(plan.missing)} potongan dari "
+                f"{len(plan.missing_spans)} rentang di-query"
+            )
+        # Urutan kronologis tetap: penjumlahan float tidak bergantung isi cache
+        return kind.aggregate.merge([parts[piece] for piece in plan.pieces])
+
+    def invalidate(self, start: date, end: date) -> int:
+        """Buang semua potongan (hari maupun bulan) yang beririsan dengan periode."""
+        return self.cache.invalidate(lambda key, entry: overlaps(entry.period, start, end))
+
+    async def aggregate(self, db, kind: PartialKind, start: date, end: date):
+        """plan -> query potongan yang hilang (AsyncSession) -> merge."""
+        plan = self.plan(kind, start, end)
+        rows = (await db.execute(kind.statement(plan.missing_spans))).all() if plan.missing else []
+        return self.fill(plan, rows)
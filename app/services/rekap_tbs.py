@@ -0,0 +1,70 @@
+import logging
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.t_tbs_dalam import TTbsDalam
+from app.models.t_tbs_dalam_harian import TTbsDalamHarian
+
+logger = logging.getLogger("APN-Riau.rekap_tbs")
+
+
+def rekap_source_query(start_date: date | None = None, end_date: date | None = None):
+    """
+    SELECT agregasi TTbsDalam per hari/kebun/produk/divisi, dengan urutan kolom
+    yang sama seperti TTbsDalamHarian. Dipakai untuk backfill dan rebuild.
+    """
+    query = (
+        select(
+            TTbsDalam.TglTransaksiOne,
+            func.coalesce(TTbsDalam.NamaKebun, ""),
+            func.coalesce(TTbsDalam.NamaProduk, ""),
+            func.coalesce(TTbsDalam.Divisi, ""),
+            func.coalesce(func.sum(TTbsDalam.Total), 0),
+            func.count(),
+            func.coalesce(func.sum(TTbsDalam.JumlahJanjang), 0),
+        )
+        .where(TTbsDalam.TglTransaksiOne.is_not(None))
+        .group_by(
+            TTbsDalam.TglTransaksiOne,
+            func.coalesce(TTbsDalam.NamaKebun, ""),
+            func.coalesce(TTbsDalam.NamaProduk, ""),
+            func.coalesce(TTbsDalam.Divisi, ""),
+        )
+    )
+    if start_date:
+        query = query.where(TTbsDalam.TglTransaksiOne >= start_date)
+    if end_date:
+        query = query.where(TTbsDalam.TglTransaksiOne <= end_date)
+    return query
+
+
+def rebuild_rekap_tbs(db: Session, start_date: date, end_date: date) -> int:
+    """
+    Hitung ulang rekap harian untuk rentang tanggal tertentu dari data mentah.
+    Trigger MySQL sudah menjaga rekap tetap sinkron; fungsi ini dipakai untuk
+    koreksi manual dan database tanpa trigger (mis. SQLite saat testing).
+    """
+    db.execute(
+        delete(TTbsDalamHarian)
+        .where(TTbsDalamHarian.TglTransaksiOne >= start_date)
+        .where(TTbsDalamHarian.TglTransaksiOne <= end_date)
+    )
+    result = db.execute(
+        insert(TTbsDalamHarian).from_select(
+            [
+                TTbsDalamHarian.TglTransaksiOne,
+                TTbsDalamHarian.NamaKebun,
+                TTbsDalamHarian.NamaProduk,
+                TTbsDalamHarian.Divisi,
+                TTbsDalamHarian.Total,
+                TTbsDalamHarian.JumlahTiket,
+                TTbsDalamHarian.JumlahJanjang,
+            ],
+            rekap_source_query(start_date, end_date),
+        )
+    )
+    db.commit()
+    logger.info(f"Rekap TBS harian dibangun ulang: {start_date} -> {end_date}")
+    return result.rowcount
@@ -1,23 +1,52 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from app.core.config import settings
+from app.core.security import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def bearer_token(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+def request_principal(request: Request, token: str | None = None) -> dict | None:
+    """
+    Payload JWT untuk request ini. Diverifikasi sekali (middleware atau dependency
+    pertama) lalu disimpan di request.state; berikutnya dipakai ulang tanpa HMAC.
+    """
+    token = token or bearer_token(request)
+    if not token:
+        return None
+    if getattr(request.state, "access_token", None) == token:
+        return request.state.principal
+    payload = decode_access_token(token)
+    request.state.access_token = token
+    request.state.principal = payload
+    return payload
+
+
+def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
     """Extract and validate current user from JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return {"username": username}
-    except JWTError:
+    payload = request_principal(request, token)
+    username: str | None = payload.get("sub") if payload else None
+    if username is None:
         raise credentials_exception
+    return {"username": username}
+
+
+
+def get_admin_user(current_user: dict = Depends(get_current_user)):
+    """Hanya user yang terdaftar di ADMIN_USERNAMES yang boleh mengakses endpoint admin"""
+    if current_user["username"] not in settings.ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Akses admin diperlukan",
+        )
+    return current_user
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from datetime import date
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, select
+
+from app.models.t_tbs_dalam import TTbsDalam
+from app.models.t_trans_lintas import TTransLintas
+from app.models.t_trans_lintas_keluar import TTransLintasKeluar
+from app.models.t_trans_pemasaran import TTransPemasaran
+from app.services.mapping_kebun import kode_kebun_filter
+from app.services.pagination import (
+    before_keyset,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_date,
+    parse_cursor_time,
+)
+
+
+@dataclass(frozen=True)
+class TransactionTable:
+    """Tabel transaksi timbangan beserta kolom tanggal/waktu dan kolom filternya."""
+    model: type
+    date_column: str
+    time_column: str
+    kebun_column: str | None
+    lokasi_column: str
+
+    @property
+    def columns(self) -> list:
+        return list(self.model.__table__.columns)
+
+    def column(self, name: str):
+        return getattr(self.model, name)
+
+
+TRANSACTION_TABLES = {
+    "ttbsdalam": TransactionTable(TTbsDalam, "TglTransaksiOne", "TimeTmbOne", "NamaKebun", "lokasi_penimbangan"),
+    "ttranslintas": TransactionTable(TTransLintas, "TglTmb1", "TimeTmb1", None, "id_lokasi"),
+    "ttranslintaskeluar": TransactionTable(TTransLintasKeluar, "TglTmb1", "TimeTmb1", "Asal", "id_lokasi"),
+    "ttranspemasaran": TransactionTable(TTransPemasaran, "TglTmb1", "TimeTmb1", "Asal", "id_lokasi"),
+}
+
+
+def apply_filters(
+    query,
+    spec: TransactionTable,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    nama_kebun: str | None = None,
+    nama_produk: str | None = None,
+    lokasi: str | None = None,
+    kode_kebun: str | None = None,
+):
+    """
+    Filter periode, kebun, produk, dan lokasi yang sama untuk listing maupun export.
+    `kode_kebun` memakai aturan alias yang sama dengan by-location (kunci
+    huruf kecil tanpa spasi di akhir, lihat mapping_kebun); kode tidak dikenal
+    -> tidak ada baris. `nama_kebun` tetap persis sama agar index kolom kebun terpakai.
+    """
+    tanggal = spec.column(spec.date_column)
+    if start_date:
+        query = query.where(tanggal >= start_date)
+    if end_date:
+        query = query.where(tanggal <= end_date)
+    if (nama_kebun or kode_kebun) and spec.kebun_column is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Filter kebun tidak tersedia untuk {spec.model.__tablename__}",
+        )
+    if nama_kebun:
+        query = query.where(spec.column(spec.kebun_column) == nama_kebun)
+    if kode_kebun:
+        query = query.where(kode_kebun_filter(spec.column(spec.kebun_column), kode_kebun))
+    if nama_produk:
+        query = query.where(spec.model.NamaProduk == nama_produk)
+    if lokasi:
+        lokasi_col = spec.column(spec.lokasi_column)
+        if isinstance(lokasi_col.type, Integer):
+            if not lokasi.isdigit():
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lokasi harus berupa id_lokasi")
+            lokasi = int(lokasi)
+        query = query.where(lokasi_col == lokasi)
+    return query
+
+
+def parse_listing_cursor(table: str, before: str | None) -> dict | None:
+    if not before:
+        return None
+    values = decode_cursor(before)
+    # Cursor hanya berlaku untuk tabel yang menerbitkannya
+    if values.get("t") != table:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor tidak valid")
+    return {
+        "tanggal": parse_cursor_date(values.get("tanggal")),
+        "waktu": parse_cursor_time(values.get("waktu")),
+        "no_transaksi": str(values.get("no_transaksi", "")),
+    }
+
+
+def listing_statement(spec: TransactionTable, cursor: dict | None, limit: int, **filters):
+    """
+    Satu halaman listing urut (tanggal, waktu, NoTransaksi) DESC. Keyset cursor
+    membuat halaman ke-500 sama murahnya dengan halaman pertama (tanpa OFFSET).
+    Mengambil limit + 1 baris untuk mengetahui apakah masih ada halaman berikutnya.
+    """
+    tanggal = spec.column(spec.date_column)
+    waktu = spec.column(spec.time_column)
+    no_transaksi = spec.model.NoTransaksi
+    query = apply_filters(select(*spec.columns).where(tanggal.is_not(None)), spec, **filters)
+    if cursor:
+        query = query.where(
+            before_keyset(
+                tanggal, waktu, cursor["tanggal"], cursor["waktu"],
+                no_transaksi < cursor["no_transaksi"],
+            )
+        )
+    return query.order_by(tanggal.desc(), waktu.desc(), no_transaksi.desc()).limit(limit + 1)
+
+
+def listing_page(table: str, spec: TransactionTable, rows: list, limit: int) -> tuple[list[dict], str | None]:
+    """Potong hasil ke `limit` baris dan buat next_cursor dari baris terakhir."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor({
+            "t": table,
+            "tanggal": last[spec.date_column],
+            "waktu": last[spec.time_column],
+            "no_transaksi": last["NoTransaksi"],
+        })
+    return [dict(row._mapping) for row in rows], next_cursor
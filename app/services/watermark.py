@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.t_tbs_dalam import TTbsDalam
+from app.models.t_trans_lintas_keluar import TTransLintasKeluar
+from app.models.t_trans_pemasaran import TTransPemasaran
+
+logger = logging.getLogger("APN-Riau.watermark")
+
+# Tabel sumber dashboard: (nama, kolom NoTransaksi, kolom tanggal, kolom berat yang diagregasi)
+WATERMARK_SOURCES = [
+    ("ttbsdalam", TTbsDalam.NoTransaksi, TTbsDalam.TglTransaksiOne, TTbsDalam.Total),
+    ("ttranslintaskeluar", TTransLintasKeluar.NoTransaksi, TTransLintasKeluar.TglTmb1, TTransLintasKeluar.Total),
+    ("ttranspemasaran", TTransPemasaran.NoTransaksi, TTransPemasaran.TglTmb1, TTransPemasaran.TotalTmb),
+]
+
+
+def watermark_statement(no_transaksi, tanggal):
+    """MAX(NoTransaksi) & MAX(tanggal): masing-masing satu lookup di ujung index PK / tanggal."""
+    return select(func.max(no_transaksi), func.max(tanggal))
+
+
+def tail_statement(tanggal, total, since: date):
+    """COUNT & SUM berat per tanggal untuk hari yang belum final (range scan index tanggal)."""
+    return (
+        select(tanggal, func.count(), func.sum(total))
+        .where(tanggal >= since)
+        .group_by(tanggal)
+        .order_by(tanggal)
+    )
+
+
+def new_rows_statement(no_transaksi, tanggal, after_no_transaksi: str):
+    """Tanggal & jumlah tiket dengan NoTransaksi di atas watermark lama (range scan PK)."""
+    return (
+        select(tanggal, func.count())
+        .where(no_transaksi > after_no_transaksi)
+        .group_by(tanggal)
+    )
+
+
+class DataWatermarks:
+    """
+    Watermark data per tabel sumber, disimpan di memori aplikasi dan di-refresh
+    paling sering sekali per `refresh_seconds`. Token gabungannya berubah bila
+    ada tiket baru, bila COUNT/SUM berat di `tail_days` hari terakhir berubah
+    (tiket hapus/UPDATE di tempat, mis. timbang kedua), atau bila `bump()`
+    dipanggil (invalidasi admin setelah koreksi data lama yang sudah final —
+    perubahan di luar ekor yang tidak menaikkan MAX(NoTransaksi) tidak terlihat).
+
+    Subscriber (`subscribe`) dipanggil dengan (tabel, tanggal yang berubah)
+    setiap kali refresh menemukan watermark suatu tabel bergeser. Tanggal
+    diturunkan dari tiket di atas MAX(NoTransaksi) lama ditambah hari di ekor
+    yang COUNT/SUM-nya berbeda; None = tidak diketahui (refresh pertama, atau
+    tiket teratas dihapus tanpa jejak di ekor).
+
+    Refresh bersifat single-flight: request yang menemukan watermark basi saat
+    refresh lain sedang berjalan menunggu hasil yang sama, bukan menjalankan
+    query sendiri.
+    """
+
+    def __init__(self, sources, refresh_seconds: float, tail_days: int = 0):
+        self.sources = sources
+        self.refresh_seconds = refresh_seconds
+        self.tail_days = tail_days
+        self.values: dict[str, tuple] = {}
+        self.generation = 0
+        self.refreshed_at: float | None = None
+        self._bump_lock = threading.Lock()
+        self._refreshing: asyncio.Future | None = None
+        self.subscribers: list[Callable[[str, set[date] | None], None]] = []
+
+    def subscribe(self, callback: Callable[[str, set[date] | None], None]) -> None:
+        self.subscribers.append(callback)
+
+    def bump(self) -> None:
+        with self._bump_lock:
+            self.generation += 1
+
+    def is_stale(self) -> bool:
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_seconds
+
+    async def refresh(self) -> None:
+        task = self._refreshing
+        if task is None or task.done():
+            task = self._refreshing = asyncio.ensure_future(self._refresh())
+        # shield: request yang dibatalkan tidak ikut membatalkan refresh milik pemanggil lain
+        await asyncio.shield(task)
+
+    async def _refresh(self) -> None:
+        values, changes = {}, {}
+        since = date.today() - timedelta(days=self.tail_days)
+        async with AsyncSessionLocal() as db:
+            for name, no_transaksi, tanggal, total in self.sources:
+                row = (await db.execute(watermark_statement(no_transaksi, tanggal))).one()
+                tail = (await db.execute(tail_statement(tanggal, total, since))).all()
+                values[name] = (*row, tuple(tuple(day) for day in tail))
+                old = self.values.get(name)
+                if old is not None and old != values[name]:
+                    changes[name] = await self.changed_dates(db, no_transaksi, tanggal, old, values[name], since)
+        self.values = values
+        self.refreshed_at = time.monotonic()
+        for name, dates in changes.items():
+            changed = ", ".join(str(d) for d in sorted(dates)) if dates is not None else "tanggal tidak diketahui"
+            logger.info(f"[WATERMARK] {name} berubah: {changed}")
+            for callback in self.subscribers:
+                callback(name, dates)
+
+    @staticmethod
+    async def changed_dates(db, no_transaksi, tanggal, old: tuple, new: tuple, since: date) -> set[date] | None:
+        old_max, _, old_tail = old
+        new_max, _, new_tail = new
+        if old_max is None:
+            return None
+        rows = (await db.execute(new_rows_statement(no_transaksi, tanggal, old_max))).all()
+        # Hari yang keluar dari ekor karena pergantian tanggal tidak dihitung berubah
+        old_days = {day[0]: day[1:] for day in old_tail if day[0] >= since}
+        new_days = {day[0]: day[1:] for day in new_tail}
+        updated = {d for d in old_days.keys() | new_days.keys() if old_days.get(d) != new_days.get(d)}
+        if (new_max is None or new_max < old_max) and not updated:
+            return None
+        return {tanggal for tanggal, _ in rows if tanggal is not None} | updated
+
+    async def token(self) -> str:
+        """Token watermark saat ini; query ulang (single-flight) hanya bila sudah lewat refresh_seconds."""
+        if self.is_stale():
+            await self.refresh()
+        raw = repr((sorted(self.values.items()), self.generation, date.today()))
+        return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+async def poll_watermarks(watermarks: DataWatermarks, interval: float) -> None:
+    """Background task: refresh watermark berkala agar subscriber tahu ada data baru."""
+    while True:
+        try:
+            await watermarks.refresh()
+        except Exception:
+            logger.exception("[WATERMARK] Gagal refresh watermark")
+        await asyncio.sleep(interval)
+
+
+def make_etag(token: str, path: str, query_items) -> str:
+    """ETag weak dari watermark + path + query parameter (urutan parameter diabaikan)."""
+    raw = repr((token, path, sorted(query_items)))
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Perbandingan weak: W/"x" dan "x" dianggap sama
+    strip = lambda tag: tag[2:] if tag.startswith("W/") else tag
+    return "*" in candidates or any(strip(tag) == strip(etag) for tag in candidates)
@@ -0,0 +1,87 @@
+"""
+Perbandingan ukuran file & waktu load export TBS satu tahun: CSV, NDJSON,
+Arrow IPC, dan Parquet. Baris dibangkitkan sintetis (kolom & tipe sesuai
+model TTbsDalam) lalu di-encode dengan fungsi yang sama seperti /export.
+
+Jalankan dari root repo (butuh konfigurasi .env seperti aplikasi):
+    python -m benchmarks.bench_columnar_export [--tickets-per-day 800]
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.models.t_tbs_dalam import TTbsDalam
+from app.services.arrow_export import encode_columnar_rows
+from app.services.export import encode_csv_batch, encode_ndjson_batch
+from benchmarks.datagen import daily_counts, tbs_rows
+
+BATCH_SIZE = 5000
+
+
+def generate_rows(start: date, days: int, tickets_per_day: int, seed: int = 42) -> list[tuple]:
+    """Baris TBS dari generator benchmark (distribusi kebun/musim yang sama), sebagai tuple kolom."""
+    rng = random.Random(seed)
+    counts = daily_counts(rng, start, days, days * tickets_per_day)
+    columns = [column.name for column in TTbsDalam.__table__.columns]
+    return [tuple(row[name] for name in columns) for row in tbs_rows(rng, start, counts, ["PKS"])]
+
+
+def batched(rows: list, size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+COLUMNS = list(TTbsDalam.__table__.columns)
+KEYS = [column.name for column in COLUMNS]
+
+# Encode persis seperti jalur /export (per batch BATCH_SIZE baris)
+ENCODERS = {
+    "csv": lambda rows: encode_csv_batch([], header=KEYS) + b"".join(
+        encode_csv_batch(batch) for batch in batched(rows, BATCH_SIZE)
+    ),
+    "ndjson": lambda rows: b"".join(encode_ndjson_batch(batch, KEYS) for batch in batched(rows, BATCH_SIZE)),
+    "arrow": lambda rows: encode_columnar_rows(rows, COLUMNS, "arrow", BATCH_SIZE),
+    "parquet": lambda rows: encode_columnar_rows(rows, COLUMNS, "parquet", BATCH_SIZE),
+}
+
+
+# Cara "load" yang umum di notebook untuk tiap format
+LOADERS = {
+    "csv": lambda data: list(csv.DictReader(io.StringIO(data.decode()))),
+    "ndjson": lambda data: [orjson.loads(line) for line in data.splitlines()],
+    "arrow": lambda data: pa.ipc.open_stream(data).read_all(),
+    "parquet": lambda data: pq.read_table(io.BytesIO(data)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets-per-day", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = generate_rows(date(2024, 1, 1), 366, args.tickets_per_day)
+    print(f"TBS 1 tahun: {len(rows):,} baris")
+    print(f"  {'format':<8} {'ukuran (MB)':>12} {'encode (s)':>11} {'load (s)':>9}")
+
+    for fmt, encode in ENCODERS.items():
+        start = time.perf_counter()
+        data = encode(rows)
+        encode_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            LOADERS[fmt](data)
+        load_seconds = (time.perf_counter() - start) / args.repeat
+        print(f"  {fmt:<8} {len(data) / 1_000_000:>12.2f} {encode_seconds:>11.3f} {load_seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
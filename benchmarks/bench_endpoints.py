@@ -0,0 +1,175 @@
+"""
+Benchmark semua endpoint GET /dashboard: cold (cache aplikasi kosong) dan warm
+(request berulang) untuk beberapa panjang rentang, lalu tulis laporan JSON
+yang bisa dibandingkan antar run.
+
+Isi database dulu dengan benchmarks.datagen, lalu jalankan dari root repo:
+    python -m benchmarks.bench_endpoints --database-url sqlite:///bench.db --out before.json
+    python -m benchmarks.bench_endpoints --database-url sqlite:///bench.db --out after.json --compare before.json
+
+Request dipanggil langsung ke app ASGI (tanpa socket) dengan token JWT yang
+dibuat sendiri, jadi tidak bergantung pada user admin di database. Warmer
+dan poller cache tidak dijalankan (lifespan tidak dipanggil).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+import orjson
+
+from benchmarks.bench_response_cache import asgi_request
+
+DEFAULT_RANGES = [1, 7, 30, 90, 365]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dashboard_routes(app) -> list[tuple[str, bool]]:
+    """(path, menerima start_date/end_date) untuk tiap endpoint GET /dashboard."""
+    routes = []
+    for route in app.routes:
+        if not getattr(route, "path", "").startswith("/dashboard") or "GET" not in getattr(route, "methods", ()):
+            continue
+        params = {param.name for param in route.dependant.query_params}
+        routes.append((route.path, {"start_date", "end_date"} <= params))
+    return routes
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def time_request(app, path: str, headers: dict, query: str) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    status, size = await asgi_request(app, path, headers, query)
+    return (time.perf_counter() - start) * 1000, status, size
+
+
+async def run(app, clear_caches, end: date, ranges: list[int], repeat: int, headers: dict) -> list[dict]:
+    results = []
+    for path, ranged in dashboard_routes(app):
+        for days in ranges if ranged else [None]:
+            query = ""
+            if days:
+                query = urlencode({"start_date": end - timedelta(days=days - 1), "end_date": end})
+            clear_caches()
+            cold_ms, status, size = await time_request(app, path, headers, query)
+            warm = [(await time_request(app, path, headers, query))[0] for _ in range(repeat)]
+            results.append({
+                "endpoint": path,
+                "range_days": days,
+                "status": status,
+                "bytes": size,
+                "cold_ms": round(cold_ms, 3),
+                "warm_p50_ms": round(statistics.median(warm), 3),
+                "warm_p95_ms": round(percentile(warm, 0.95), 3),
+            })
+            print(f"  {path:<36} {str(days or '-'):>5} {status:>4} "
+                  f"cold {cold_ms:>9.2f} ms   warm p50 {results[-1]['warm_p50_ms']:>7.3f} ms")
+    return results
+
+
+def compare(current: list[dict], baseline_path: str) -> None:
+    with open(baseline_path, "rb") as f:
+        baseline = {(r["endpoint"], r["range_days"]): r for r in orjson.loads(f.read())["results"]}
+    print(f"\nPerbandingan dengan {baseline_path} (rasio current/baseline, <1 = lebih cepat)")
+    for result in current:
+        old = baseline.get((result["endpoint"], result["range_days"]))
+        if not old:
+            continue
+        ratios = [
+            result[key] / old[key] if old[key] else float("nan")
+            for key in ("cold_ms", "warm_p50_ms")
+        ]
+        print(f"  {result['endpoint']:<36} {str(result['range_days'] or '-'):>5} "
+              f"cold x{ratios[0]:>6.2f}   warm x{ratios[1]:>6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Default: DATABASE_URL dari konfigurasi")
+    parser.add_argument("--ranges", type=int, nargs="+", default=DEFAULT_RANGES, help="Panjang rentang (hari)")
+    parser.add_argument("--repeat", type=int, default=50, help="Jumlah request warm per kombinasi")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Default: tanggal transaksi TBS terakhir")
+    parser.add_argument("--out", default="bench_endpoints.json")
+    parser.add_argument("--compare", help="Laporan JSON sebelumnya sebagai baseline")
+    args = parser.parse_args()
+
+    # Konfigurasi dibaca saat import app: set sebelum import
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["CACHE_WARM_INTERVAL_SECONDS"] = "0"
+    os.environ["CHANGE_POLL_SECONDS"] = "0"
+
+    from sqlalchemy import func, select
+
+    from app.core.database import SessionLocal, async_engine, engine
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.models import TTbsDalam, TTransLintasKeluar, TTransPemasaran
+    from app.routers.dashboard import dashboard_cache, partial_store
+
+    logging.getLogger("APN-Riau").setLevel(logging.WARNING)  # log per request ikut terukur kalau dibiarkan
+
+    def clear_caches():
+        dashboard_cache.clear()
+        partial_store.cache.clear()
+
+    with SessionLocal() as db:
+        end = args.end_date or db.scalar(select(func.max(TTbsDalam.TglTransaksiOne)))
+        rows = {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model))
+            for model in (TTbsDalam, TTransLintasKeluar, TTransPemasaran)
+        }
+    if end is None:
+        raise SystemExit("Database kosong; isi dulu dengan `python -m benchmarks.datagen`")
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'bench'})}", "Accept-Encoding": "gzip"}
+    print(f"Dashboard benchmark: {engine.dialect.name}, {rows}, s/d {end}")
+
+    async def run_and_dispose():
+        try:
+            return await run(app, clear_caches, end, args.ranges, args.repeat, headers)
+        finally:
+            await async_engine.dispose()
+
+    results = asyncio.run(run_and_dispose())
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "dialect": engine.dialect.name,
+            "rows": rows,
+            "end_date": str(end),
+            "ranges": args.ranges,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.out, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    print(f"Laporan ditulis ke {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Berapa banyak logging menambah latency p50/p99 per request (endpoint kecil
+dengan middleware log + log cache per panggilan, seperti aplikasi):
+
+- none : logger dimatikan
+- sync : RotatingFileHandler + console langsung di event loop (setup lama)
+- queue: QueueHandler -> QueueListener (thread terpisah), JSON + sampling
+
+Kedua mode memakai maxBytes kecil (--max-bytes, default 16 KiB: ~1% request
+mode sync kena rotasi) dan --stall-ms mensimulasikan disk lambat saat rotasi
+(rename/fsync di volume sibuk). Dengan rotasi jarang (mis. 256 KiB, belasan
+rotasi per 20k request) stall hanya terlihat di max, dan p99/p99.9 mode queue
+bisa lebih buruk dari sync karena thread listener ikut berebut GIL. Kolom
+rotasi & dibuang: berapa kali stall terjadi dan berapa record yang dibuang
+mode queue karena antrean penuh.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_logging [--requests 20000] [--stall-ms 20] [--max-bytes 16384]
+"""
+import argparse
+import asyncio
+import io
+import logging
+import statistics
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from fastapi import FastAPI, Request
+
+from app.core.logging_config import setup_logging, stop_listener
+from benchmarks.bench_response_cache import asgi_get
+
+logger = logging.getLogger("APN-Riau.bench")
+cache_logger = logging.getLogger("APN-Riau.cache")
+
+rotations = 0
+
+
+def slow_rollover(stall_ms: float):
+    rollover = RotatingFileHandler.doRollover
+
+    def do_rollover(self):
+        global rotations
+        rotations += 1
+        time.sleep(stall_ms / 1000)
+        rollover(self)
+
+    RotatingFileHandler.doRollover = do_rollover
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def log_http_requests(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        duration = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"[bench] {request.method} {request.url.path} - {response.status_code} ({duration:.2f} ms)",
+            extra={"route": "/ping", "user": "bench", "status": response.status_code, "duration_ms": duration},
+        )
+        return response
+
+    @app.get("/ping")
+    async def ping():
+        cache_logger.info("[CACHE HIT] ping", extra={"cache": "hit", "key": "ping"})
+        return {"message": "pong"}
+
+    return app
+
+
+def configure(mode: str, log_dir: str, max_bytes: int):
+    root = logging.getLogger("APN-Riau")
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.disabled = mode == "none"
+    if mode == "sync":
+        formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(name)s: %(message)s")
+        file_handler = RotatingFileHandler(f"{log_dir}/sync.log", maxBytes=max_bytes, backupCount=3)
+        # Console diarahkan ke buffer agar terminal tidak banjir; biaya format & write tetap terjadi
+        console_handler = logging.StreamHandler(io.StringIO())
+        for handler in (file_handler, console_handler):
+            handler.setFormatter(formatter)
+            root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        return None
+    if mode == "queue":
+        listener = setup_logging(f"{log_dir}/queue.log", sample_rates={"APN-Riau.cache": 0.05}, max_bytes=max_bytes)
+        # Console listener juga ke buffer (perbandingan setara dengan mode sync)
+        listener.handlers[1].setStream(io.StringIO())
+        return listener
+    return None
+
+
+async def measure(app, requests: int) -> list[float]:
+    for _ in range(200):  # warm-up
+        await asgi_get(app, "/ping", {})
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await asgi_get(app, "/ping", {})
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--stall-ms", type=float, default=20.0)
+    parser.add_argument("--max-bytes", type=int, default=16 * 1024)
+    args = parser.parse_args()
+    slow_rollover(args.stall_ms)
+
+    global rotations
+    app = build_app()
+    print(
+        f"  {'mode':<6} {'p50 (µs)':>9} {'p99 (µs)':>9} {'p99.9 (µs)':>11} {'max (µs)':>9}"
+        f" {'rotasi':>7} {'dibuang':>8}"
+    )
+    with tempfile.TemporaryDirectory() as log_dir:
+        for mode in ("none", "sync", "queue"):
+            rotations = 0
+            listener = configure(mode, log_dir, args.max_bytes)
+            latencies = sorted(asyncio.run(measure(app, args.requests)))
+            dropped = 0
+            if listener:
+                stop_listener(listener)
+                dropped = logging.getLogger("APN-Riau").handlers[0].dropped
+            p50 = statistics.median(latencies)
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            p999 = latencies[int(len(latencies) * 0.999) - 1]
+            print(
+                f"  {mode:<6} {p50:>9.0f} {p99:>9.0f} {p999:>11.0f} {latencies[-1]:>9.0f}"
+                f" {rotations:>7} {dropped:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
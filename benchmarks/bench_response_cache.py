@@ -0,0 +1,124 @@
+"""
+Micro-benchmark CPU per request untuk response trend satu tahun (365 titik):
+
+- before: cache menyimpan dict, setiap hit tetap lewat jsonable_encoder + JSONResponse (json stdlib)
+- after : cache menyimpan bytes orjson (+ gzip), hit = lookup dict + tulis bytes
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_response_cache [--requests 2000]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+
+from fastapi import FastAPI, Query
+
+from app.core.cache import LRUTTLCache, cached_endpoint
+
+
+def trend_payload(start: date, end: date) -> dict:
+    days = (end - start).days + 1
+    data = [
+        {"tanggal": (start + timedelta(days=i)).isoformat(), "total": 180_000 + (i * 7919) % 40_000}
+        for i in range(days)
+    ]
+    return {
+        "message": "Production trend retrieved successfully",
+        "period": {"start_date": str(start), "end_date": str(end)},
+        "data": data,
+    }
+
+
+def make_cache() -> LRUTTLCache:
+    return LRUTTLCache(name="bench", max_entries=1024, max_bytes=64 * 1024 * 1024, default_ttl=3600)
+
+
+def build_apps():
+    before_cache = make_cache()
+    after_cache = make_cache()
+
+    # Perilaku lama: dict di-cache, FastAPI meng-encode ulang pada setiap request
+    before = FastAPI()
+
+    @before.get("/trend")
+    @cached_endpoint(before_cache, "trend")
+    async def before_trend(start_date: date = Query(date(2024, 1, 1)), end_date: date = Query(date(2024, 12, 30))):
+        return trend_payload(start_date, end_date)
+
+    # Perilaku baru: bytes final di-cache
+    after = FastAPI()
+
+    @after.get("/trend")
+    @cached_endpoint(after_cache, "trend", encode=True, gzip_min_bytes=1024)
+    async def after_trend(start_date: date = Query(date(2024, 1, 1)), end_date: date = Query(date(2024, 12, 30))):
+        return trend_payload(start_date, end_date)
+
+    return {"before": (before, before_cache), "after": (after, after_cache)}
+
+
+async def asgi_request(app, path: str, headers: dict, query: str = "") -> tuple[int, int]:
+    """
+    Panggil app ASGI langsung (tanpa socket/klien HTTP) agar yang terukur hanya CPU server.
+    Mengembalikan (status, ukuran body).
+    """
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    status = 0
+    body_size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, body_size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body_size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, body_size
+
+
+async def asgi_get(app, path: str, headers: dict) -> int:
+    return (await asgi_request(app, path, headers))[1]
+
+
+async def measure(app, cache: LRUTTLCache, requests: int, hit: bool, headers: dict) -> tuple[float, int]:
+    """Rata-rata CPU time (process_time) per request dalam mikrodetik + ukuran body."""
+    size = await asgi_get(app, "/trend", headers)  # warm-up (+ isi cache untuk skenario hit)
+    start = time.process_time()
+    for _ in range(requests):
+        if not hit:
+            cache.clear()
+        await asgi_get(app, "/trend", headers)
+    return (time.process_time() - start) / requests * 1_000_000, size
+
+
+async def run(requests: int):
+    print(f"Trend 365 hari, {requests} request per skenario (CPU us/request, ukuran body)")
+    for encoding in ("identity", "gzip"):
+        headers = {"Accept-Encoding": encoding}
+        for name, (app, cache) in build_apps().items():
+            miss, size = await measure(app, cache, requests, False, headers)
+            hit, _ = await measure(app, cache, requests, True, headers)
+            print(f"  {name:<6} [{encoding:<8}] miss: {miss:8.1f}   hit: {hit:8.1f}   body: {size:6d} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.getLogger("APN-Riau.cache").disabled = True
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Load test dashboard: N user virtual bersamaan memutar skenario berbobot lalu
+melaporkan throughput, latency p50/p95/p99, error rate, dan cache hit ratio
+per route; bisa dibandingkan dengan baseline untuk menandai regresi.
+
+Skenario:
+- login   : POST /auth/token (hanya jika --username diberikan)
+- home    : fan-out paralel summary/trend/by-location/composition/activities (periode default)
+- explore : rentang acak 7-365 hari, trend + by-location + composition (kadang filter kebun)
+
+Target in-process (httpx ASGITransport, tanpa socket) atau server lokal:
+    python -m benchmarks.loadtest --users 50 --duration 30 --out release.json
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000 --users 50 --baseline release.json
+
+Tanpa --username token dibuat sendiri dari SECRET_KEY konfigurasi (server
+lokal harus memakai .env yang sama). Browser mengirim If-None-Match karena
+response dashboard `Cache-Control: no-cache`; perilaku itu ditiru kecuali --no-etag.
+Exit code 1 jika ada regresi terhadap baseline.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import orjson
+
+from benchmarks.bench_endpoints import git_revision, percentile
+
+HOME_ROUTES = [
+    "/dashboard/summary",
+    "/dashboard/production/trend",
+    "/dashboard/production/by-location",
+    "/dashboard/production/composition",
+    "/dashboard/activities",
+]
+EXPLORE_ROUTES = [
+    "/dashboard/production/trend",
+    "/dashboard/production/by-location",
+    "/dashboard/production/composition",
+]
+EXPLORE_RANGES = [7, 30, 90, 365]
+EXPLORE_KEBUN = ["KENCANA AMAL TANI 1", "PALMA S-1", "BANYU BENING UTAMA 2"]
+DEFAULT_WEIGHTS = {"home": 6, "explore": 3, "login": 1}
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    cache: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def summary(self, duration: float) -> dict:
+        count = len(self.latencies)
+        lookups = self.cache["HIT"] + self.cache["MISS"] + self.cache["ETAG"]
+        return {
+            "requests": count,
+            "rps": round(count / duration, 2),
+            "p50_ms": round(percentile(self.latencies, 0.50), 2) if count else None,
+            "p95_ms": round(percentile(self.latencies, 0.95), 2) if count else None,
+            "p99_ms": round(percentile(self.latencies, 0.99), 2) if count else None,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            # 304 (ETag) dihitung sebagai hit: server tidak menghitung ulang apa pun
+            "cache_hit_ratio": round((self.cache["HIT"] + self.cache["ETAG"]) / lookups, 4) if lookups else None,
+        }
+
+
+class LoadRun:
+    def __init__(self, client: httpx.AsyncClient, args, token: str | None):
+        self.client = client
+        self.args = args
+        self.token = token
+        self.stats: dict[str, RouteStats] = defaultdict(RouteStats)
+        self.measure_from = 0.0
+        self.deadline = 0.0
+
+    async def request(self, method: str, route: str, headers: dict, etags: dict | None = None, **kwargs):
+        key = (route, str(kwargs.get("params")))
+        if etags is not None and key in etags:
+            headers = {**headers, "If-None-Match": etags[key]}
+        start = time.perf_counter()
+        # Request selama ramp-up tidak ikut statistik
+        stats = self.stats[f"{method} {route}"] if start >= self.measure_from else RouteStats()
+        try:
+            res = await self.client.request(method, route, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            stats.latencies.append((time.perf_counter() - start) * 1000)
+            stats.errors += 1
+            return None
+        stats.latencies.append((time.perf_counter() - start) * 1000)
+        if res.status_code >= 400:
+            stats.errors += 1
+        if res.status_code == 304:
+            stats.cache["ETAG"] += 1
+        elif "X-Cache" in res.headers:
+            stats.cache[res.headers["X-Cache"]] += 1
+        if etags is not None and "ETag" in res.headers:
+            etags[key] = res.headers["ETag"]
+        return res
+
+    async def login(self) -> str | None:
+        res = await self.request(
+            "POST", "/auth/token", {},
+            data={"username": self.args.username, "password": self.args.password},
+        )
+        return res.json()["access_token"] if res is not None and res.status_code == 200 else None
+
+    async def home(self, headers: dict, etags: dict | None) -> None:
+        await asyncio.gather(*[self.request("GET", route, headers, etags) for route in HOME_ROUTES])
+
+    async def explore(self, headers: dict, etags: dict | None, rng: random.Random) -> None:
+        end = self.args.end_date - timedelta(days=rng.randrange(0, 365))
+        start = end - timedelta(days=rng.choice(EXPLORE_RANGES) - 1)
+        for route in EXPLORE_ROUTES:
+            params = {"start_date": str(start), "end_date": str(end)}
+            if route.endswith("composition") and rng.random() < 0.3:
+                params["nama_kebun"] = rng.choice(EXPLORE_KEBUN)
+            await self.request("GET", route, headers, etags, params=params)
+
+    async def user(self, user_id: int, weights: dict[str, int]) -> None:
+        rng = random.Random(self.args.seed + user_id)
+        await asyncio.sleep(self.args.ramp_up * user_id / self.args.users)
+        token = await self.login() if self.args.username else self.token
+        etags = None if self.args.no_etag else {}
+        scenarios, scenario_weights = list(weights), list(weights.values())
+        while time.perf_counter() < self.deadline:
+            scenario = rng.choices(scenarios, weights=scenario_weights)[0]
+            headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+            if scenario == "login":
+                token = await self.login() or token
+            elif scenario == "home":
+                await self.home(headers, etags)
+            else:
+                await self.explore(headers, etags, rng)
+            await asyncio.sleep(rng.expovariate(1 / self.args.think_time) if self.args.think_time else 0)
+
+    async def run(self, weights: dict[str, int]) -> float:
+        """Jalankan semua user; kembalikan lama jendela pengukuran (setelah ramp-up)."""
+        self.measure_from = time.perf_counter() + self.args.ramp_up
+        self.deadline = self.measure_from + self.args.duration
+        await asyncio.gather(*[self.user(i, weights) for i in range(self.args.users)])
+        return time.perf_counter() - self.measure_from
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regresi: latency p95/p99 naik > tolerance, error rate naik > 1 poin, throughput turun > tolerance."""
+    problems = []
+    old_total, new_total = baseline["total"], report["total"]
+    if new_total["rps"] < old_total["rps"] * (1 - tolerance):
+        problems.append(f"throughput {old_total['rps']} -> {new_total['rps']} rps")
+    for route, new in report["routes"].items():
+        old = baseline["routes"].get(route)
+        if not old or not new["requests"]:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if old[key] and new[key] > old[key] * (1 + tolerance):
+                problems.append(f"{route} {key} {old[key]} -> {new[key]}")
+        if new["error_rate"] > old["error_rate"] + 0.01:
+            problems.append(f"{route} error_rate {old['error_rate']} -> {new['error_rate']}")
+    return problems
+
+
+def print_report(report: dict) -> None:
+    print(f"  {'route':<44} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6} {'hit%':>6}")
+    for route, s in [*report["routes"].items(), ("TOTAL", report["total"])]:
+        hit = f"{s['cache_hit_ratio'] * 100:.1f}" if s["cache_hit_ratio"] is not None else "-"
+        print(f"  {route:<44} {s['requests']:>7} {s['rps']:>8.1f} {s['p50_ms'] or 0:>8.1f} "
+              f"{s['p95_ms'] or 0:>8.1f} {s['p99_ms'] or 0:>8.1f} {s['error_rate'] * 100:>6.2f} {hit:>6}")
+
+
+def parse_weights(value: str) -> dict[str, int]:
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_WEIGHTS:
+            raise argparse.ArgumentTypeError(f"Skenario tidak dikenal: {name}")
+        weights[name] = int(weight)
+    return weights
+
+
+async def main_async(args) -> dict:
+    token = None
+    if not args.username:
+        from app.core.security import create_access_token
+        token = create_access_token({"sub": "loadtest"}, expires_delta=timedelta(hours=1))
+
+    if args.target == "asgi":
+        from app.core.database import async_engine
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        async_engine = None
+        transport = None
+        base_url = args.target
+
+    weights = dict(args.scenarios)
+    if not args.username:
+        weights.pop("login", None)
+    limits = httpx.Limits(max_connections=args.users * len(HOME_ROUTES))
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=60) as client:
+        load = LoadRun(client, args, token)
+        if args.username and await load.login() is None:
+            raise SystemExit(f"Login {args.username} gagal; periksa --username/--password")
+        measured = await load.run(weights)
+    if async_engine is not None:
+        await async_engine.dispose()
+
+    total = RouteStats()
+    for stats in load.stats.values():
+        total.latencies += stats.latencies
+        total.errors += stats.errors
+        for outcome, count in stats.cache.items():
+            total.cache[outcome] += count
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "target": args.target,
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_time_s": args.think_time,
+            "scenarios": weights,
+            "etag": not args.no_etag,
+        },
+        "routes": {route: stats.summary(measured) for route, stats in sorted(load.stats.items())},
+        "total": total.summary(measured),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="asgi", help='"asgi" (in-process) atau base URL server')
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="Detik pengukuran setelah ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=5)
+    parser.add_argument("--think-time", type=float, default=1.0, help="Rata-rata jeda antar skenario (detik)")
+    parser.add_argument("--scenarios", type=parse_weights, default=DEFAULT_WEIGHTS, help="mis. home=6,explore=3,login=1")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="Akhir rentang explore")
+    parser.add_argument("--no-etag", action="store_true", help="Jangan kirim If-None-Match")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="Hanya untuk --target asgi")
+    parser.add_argument("--out", default="loadtest.json")
+    parser.add_argument("--baseline", help="Laporan sebelumnya; regresi -> exit code 1")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Toleransi regresi relatif (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.target == "asgi":
+        # Konfigurasi dibaca saat import app: set sebelum import
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+            os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["CACHE_WARM_INTERVAL_SECONDS"] = "0"
+        os.environ["CHANGE_POLL_SECONDS"] = "0"
+        os.environ.setdefault("LOG_SAMPLE_RATES", '{"APN-Riau": 0.01, "APN-Riau.cache": 0.0}')
+
+    print(f"Load test {args.target}: {args.users} user, {args.duration:.0f} s (+{args.ramp_up:.0f} s ramp-up)")
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    with open(args.out, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+    print(f"Laporan ditulis ke {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "rb") as f:
+            problems = find_regressions(report, orjson.loads(f.read()), args.tolerance)
+        for problem in problems:
+            print(f"  REGRESI: {problem}")
+        if problems:
+            sys.exit(1)
+        print("  Tidak ada regresi terhadap baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.database import slow_queries
+from app.main import app
+
+client = TestClient(app)
+
+VALID_USERNAME = "admin"
+VALID_PASSWORD = "secret123"
+
+
+def get_token():
+    res = client.post(
+        "/auth/token",
+        data={"username": VALID_USERNAME, "password": VALID_PASSWORD},
+    )
+    assert res.status_code == 200
+    return res.json()["access_token"]
+
+
+@pytest.fixture(autouse=True)
+def admin_username():
+    """Admin bersifat opt-in lewat ADMIN_USERNAMES; test ini memakai user admin"""
+    with patch.object(settings, "ADMIN_USERNAMES", [VALID_USERNAME]):
+        yield
+
+
+def test_invalidate_period_requires_login():
+    """Endpoint admin menolak request tanpa token"""
+    res = client.post(
+        "/admin/cache/invalidate",
+        params={"start_date": "2025-01-01", "end_date": "2025-01-31"},
+    )
+    assert res.status_code == 401
+
+
+def test_admin_is_opt_in():
+    """User yang tidak terdaftar di ADMIN_USERNAMES ditolak 403"""
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    with patch.object(settings, "ADMIN_USERNAMES", []):
+        res = client.get("/admin/cache/stats", headers=headers)
+    assert res.status_code == 403
+
+
+def test_invalidate_period_drops_overlapping_entries():
+    """Invalidasi periode menghapus cache summary yang beririsan"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    period = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+
+    assert client.get("/dashboard/summary", params=period, headers=headers).status_code == 200
+
+    res = client.post(
+        "/admin/cache/invalidate",
+        params={"start_date": "2025-01-15", "end_date": "2025-01-15"},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    assert res.json()["data"]["responses"] >= 1
+
+
+def test_cache_stats_endpoint():
+    """Statistik cache berisi counter hit/miss/eviction"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.get("/admin/cache/stats", headers=headers)
+    assert res.status_code == 200
+
+    stats = res.json()["data"][0]
+    for key in ("hits", "misses", "evictions", "entries", "bytes"):
+        assert key in stats
+
+
+def test_slow_queries_record_route_and_explain():
+    """Statement di atas ambang tercatat dengan route pemanggil dan EXPLAIN per shape"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    threshold = slow_queries.threshold
+    slow_queries.clear()
+    slow_queries.threshold = 0.0  # semua statement dianggap lambat
+    try:
+        res = client.get(
+            "/transactions/tbs-dalam",
+            params={"start_date": "2025-01-01", "end_date": "2025-01-31"},
+            headers=headers,
+        )
+        assert res.status_code == 200
+    finally:
+        slow_queries.threshold = threshold
+
+    res = client.get("/admin/db/slow-queries", headers=headers)
+    assert res.status_code == 200
+    entries = [e for e in res.json()["data"] if e["route"] == "/transactions/tbs-dalam"]
+    assert entries
+    listing = next(e for e in entries if "ttbsdalam" in e["statement"])
+    assert "2025-01-01" in listing["parameters"]
+    assert isinstance(listing["explain"], list) and listing["explain"]
+
+
+def test_slow_queries_redact_string_parameters():
+    """Parameter string (username, hash password) tidak tersimpan apa adanya di slow-query log"""
+    threshold = slow_queries.threshold
+    slow_queries.clear()
+    slow_queries.threshold = 0.0
+    try:
+        get_token()
+    finally:
+        slow_queries.threshold = threshold
+
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    entries = client.get("/admin/db/slow-queries", headers=headers).json()["data"]
+    login = [e for e in entries if e["route"] == "/auth/token"]
+    assert login
+    for entry in login:
+        assert VALID_USERNAME not in entry["parameters"]
+        assert "$argon2" not in entry["parameters"]
@@ -3,8 +3,17 @@ Test file untuk autentikasi (JWT)
 Letakkan di folder: tests/test_auth.py
 Jalankan: pytest -q
 """
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
 from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
 from app.main import app
+from app.core.database import SessionLocal
+from app.core.security import PasswordHashPool, PasswordHashPoolBusy, password_hash_pool
+from app.models.user import User
 
 client = TestClient(app)
 
@@ -47,3 +56,85 @@ def test_me_endpoint_after_login():
     data = me_res.json()
     assert "username" in data
     assert data["username"] == VALID_USERNAME
+
+
+def test_token_verified_once_and_user_row_cached():
+    """Request berulang dengan token yang sama tidak memverifikasi JWT ulang maupun SELECT users"""
+    login_res = client.post(
+        "/auth/token",
+        data={"username": VALID_USERNAME, "password": VALID_PASSWORD},
+    )
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    client.get("/auth/me", headers=headers)  # isi cache token & user
+
+    with patch("app.core.security.jwt.decode") as jwt_decode, \
+            patch("app.routers.auth.Session.query") as query:
+        me_res = client.get("/auth/me", headers=headers)
+        jwt_decode.assert_not_called()
+        query.assert_not_called()
+    assert me_res.json()["username"] == VALID_USERNAME
+
+
+def test_invalid_token_rejected():
+    """Token rusak ditolak dengan 401 (bukan 500)"""
+    headers = {"Authorization": "Bearer bukan-token"}
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.post("/auth/refresh", headers=headers).status_code == 401
+
+
+def test_bcrypt_hash_upgraded_to_argon2_on_login():
+    """Login dengan hash bcrypt lama berhasil dan hash-nya di-upgrade ke argon2"""
+    with SessionLocal() as db:
+        db.add(User(username="legacy_bcrypt", email="legacy@example.com",
+                    hashed_password=bcrypt.hash("rahasia123")))
+        db.commit()
+    try:
+        response = client.post("/auth/token", data={"username": "legacy_bcrypt", "password": "rahasia123"})
+        assert response.status_code == 200
+        with SessionLocal() as db:
+            user = db.query(User).filter(User.username == "legacy_bcrypt").one()
+            assert user.hashed_password.startswith("$argon2")
+        # Login berikutnya memakai hash argon2
+        response = client.post("/auth/token", data={"username": "legacy_bcrypt", "password": "rahasia123"})
+        assert response.status_code == 200
+    finally:
+        with SessionLocal() as db:
+            db.query(User).filter(User.username == "legacy_bcrypt").delete()
+            db.commit()
+
+
+def test_login_rejected_with_503_when_hash_pool_is_full():
+    """Antrean hashing penuh -> 503 cepat dengan Retry-After"""
+    with patch.object(password_hash_pool, "capacity", 0):
+        response = client.post(
+            "/auth/token",
+            data={"username": VALID_USERNAME, "password": VALID_PASSWORD},
+        )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_hash_pool_keeps_slot_until_cancelled_hash_finishes():
+    """Request yang dibatalkan tidak melepas slot selama thread masih hashing"""
+    pool = PasswordHashPool(workers=1, queue_limit=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        task = asyncio.create_task(pool.run(slow_hash))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.stats()["pending"] == 1
+        with pytest.raises(PasswordHashPoolBusy):
+            await pool.run(slow_hash)
+
+        release.set()
+        await asyncio.to_thread(pool.executor.shutdown, wait=True)
+        assert pool.stats()["pending"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,122 @@
+import math
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.core.cache import LRUTTLCache, age_based_ttl, cached_endpoint, make_cache_key
+
+
+def make_cache(**kwargs):
+    options = {"name": "test", "max_entries": 3, "max_bytes": 10_000, "default_ttl": 60}
+    options.update(kwargs)
+    return LRUTTLCache(**options)
+
+
+def test_lru_eviction_by_entry_count():
+    """Entry yang paling lama tidak dipakai dibuang saat jumlah entry penuh"""
+    cache = make_cache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    cache.get("a")  # a jadi paling baru dipakai
+    cache.set("d", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_is_respected():
+    """Total ukuran entry tidak boleh melebihi max_bytes"""
+    cache = make_cache(max_entries=100, max_bytes=2_000, sizeof=lambda v: len(v))
+    for i in range(10):
+        cache.set(f"k{i}", b"x" * 500)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 2_000
+    assert stats["entries"] == 4
+
+
+def test_ttl_expiry_counts_as_miss():
+    """Entry kedaluwarsa dianggap miss dan dihapus"""
+    cache = make_cache(default_ttl=10)
+    with patch("app.core.cache.time.monotonic", return_value=1000.0):
+        cache.set("a", 1)
+    with patch("app.core.cache.time.monotonic", return_value=1011.0):
+        assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 0
+
+
+def test_cache_key_is_normalized():
+    """Cache key tidak bergantung urutan parameter maupun spasi di string"""
+    key_a = make_cache_key("composition", start_date=date(2025, 1, 1), nama_kebun=" PALMA S-1 ")
+    key_b = make_cache_key("composition", nama_kebun="PALMA S-1", start_date=date(2025, 1, 1))
+    assert key_a == key_b
+
+
+def test_cached_endpoint_hits_after_first_call():
+    """Decorator hanya memanggil fungsi asli sekali untuk parameter yang sama"""
+    cache = make_cache()
+    calls = []
+
+    @cached_endpoint(cache, "demo")
+    def endpoint(start_date: date | None = None):
+        calls.append(start_date)
+        return {"start_date": str(start_date), "at": time.time()}
+
+    first = endpoint(start_date=date(2025, 1, 1))
+    second = endpoint(start_date=date(2025, 1, 1))
+
+    assert first == second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_age_based_ttl_caches_settled_periods_forever():
+    """Periode sebelum horizon settle tidak kedaluwarsa, ekor periode memakai TTL pendek"""
+    ttl_for = age_based_ttl(settle_days=3, volatile_ttl=300)
+    today = date.today()
+
+    assert math.isinf(ttl_for((today - timedelta(days=40), today - timedelta(days=10))))
+    assert ttl_for((today - timedelta(days=10), today)) == 300
+    assert ttl_for(None) == 300
+
+
+def test_encoded_endpoint_serves_cached_bytes():
+    """Dengan encode=True cache menyimpan bytes JSON final dan hit tidak encode ulang"""
+    cache = make_cache()
+
+    @cached_endpoint(cache, "demo", encode=True, gzip_min_bytes=None)
+    def endpoint(start_date: date | None = None):
+        return {"start_date": start_date, "total": Decimal("12")}
+
+    first = endpoint(start_date=date(2025, 1, 1))
+    with patch("app.core.cache.encode_response") as encode:
+        second = endpoint(start_date=date(2025, 1, 1))
+        encode.assert_not_called()
+
+    assert first.body == second.body == b'{"start_date":"2025-01-01","total":12}'
+    assert first.media_type == "application/json"
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+
+
+def test_refresh_recomputes_and_overwrites_entry():
+    """wrapper.refresh (dipakai cache warmer) selalu menghitung ulang dan menimpa entry"""
+    cache = make_cache()
+    calls = []
+
+    @cached_endpoint(cache, "demo")
+    def endpoint(start_date: date | None = None):
+        calls.append(start_date)
+        return {"call": len(calls)}
+
+    endpoint(start_date=date(2025, 1, 1))
+    endpoint.refresh(start_date=date(2025, 1, 1))
+
+    assert endpoint(start_date=date(2025, 1, 1)) == {"call": 2}
+    assert len(calls) == 2
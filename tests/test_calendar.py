@@ -0,0 +1,28 @@
+from datetime import date
+
+from app.services.calendar import calendar_row
+from app.services.downsample import lttb
+
+
+def test_calendar_row_fiscal_periods():
+    """Tahun fiskal mulai Juli dinamai menurut tahun berakhirnya, kuartal fiskal dihitung dari awalnya"""
+    row = calendar_row(date(2025, 11, 20), fiscal_start_month=7)
+    assert row["tahun_fiskal"] == 2026
+    assert row["periode_fiskal"] == 5
+    assert row["tahun_fiskal_mulai"] == date(2025, 7, 1)
+    assert row["kuartal_fiskal_mulai"] == date(2025, 10, 1)
+    assert row["minggu_mulai"] == date(2025, 11, 17)  # Senin
+
+    calendar_year = calendar_row(date(2025, 11, 20), fiscal_start_month=1)
+    assert calendar_year["tahun_fiskal"] == 2025
+    assert calendar_year["kuartal_fiskal_mulai"] == calendar_year["kuartal_mulai"]
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    """LTTB memilih tepat `threshold` titik termasuk ujung dan lonjakan tajam"""
+    points = [(x, 100.0 if x == 37 else 1.0) for x in range(100)]
+    selected = lttb(points, 10)
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert 37 in selected
+    assert selected == sorted(selected)
@@ -1,5 +1,21 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.cache import make_cache_key
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.m_kalender import MKalender
+from app.models.m_kebun import MKebunAlias
+from app.models.t_tbs_dalam import TTbsDalam
+from app.routers.dashboard import dashboard_cache, invalidate_period, watermarks
+from app.services.calendar import seed_calendar
+from app.services.mapping_kebun import kebun_directory, seed_default_kebun
+from app.services.rekap_tbs import rebuild_rekap_tbs
+from app.services.watermark import WATERMARK_SOURCES, DataWatermarks
 
 client = TestClient(app)
 
@@ -16,6 +32,32 @@ def get_token():
     return res.json()["access_token"]
 
 
+TREND_DAYS = 15
+
+
+@pytest.fixture
+def trend_tickets():
+    """Satu tiket per hari selama TREND_DAYS hari terakhir (+ rekap harian), dihapus lagi setelah test"""
+    first, last = date.today() - timedelta(days=TREND_DAYS), date.today() - timedelta(days=1)
+    with SessionLocal() as db:
+        db.add_all(
+            TTbsDalam(NoTransaksi=f"ZZZ-TREND-{i:02d}", TglTransaksiOne=first + timedelta(days=i),
+                      NamaKebun="PALMA S-1", Total=1000 + (i * 379) % 2000)
+            for i in range(TREND_DAYS)
+        )
+        db.commit()
+        rebuild_rekap_tbs(db, first, last)  # tanpa trigger (SQLite) rekap harian diisi manual
+    invalidate_period(first, last)
+    try:
+        yield first, last
+    finally:
+        with SessionLocal() as db:
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi.like("ZZZ-TREND-%")).delete(synchronize_session=False)
+            db.commit()
+            rebuild_rekap_tbs(db, first, last)
+        invalidate_period(first, last)
+
+
 def test_summary_endpoint():
     """Pastikan /dashboard/summary mengembalikan struktur data baru (wrapper JSON)"""
     token = get_token()
@@ -36,7 +78,7 @@ def test_summary_endpoint():
     assert "rata_rata_ffa" in data["cpo"]
 
 
-def test_trend_endpoint():
+def test_trend_endpoint(trend_tickets):
     """Pastikan /dashboard/production/trend mengembalikan data list di dalam wrapper JSON"""
     token = get_token()
     headers = {"Authorization": f"Bearer {token}"}
@@ -51,6 +93,55 @@ def test_trend_endpoint():
     assert "total" in body["data"][0]
 
 
+def test_trend_granularity_groups_by_calendar_period():
+    """granularity=month dikelompokkan per awal bulan dan totalnya sama dengan trend harian"""
+    with SessionLocal() as db:
+        seed_calendar(db, settings.FISCAL_YEAR_START_MONTH)
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    params = {"start_date": (date.today() - timedelta(days=70)).isoformat(), "end_date": date.today().isoformat()}
+    daily = client.get("/dashboard/production/trend", params=params, headers=headers).json()["data"]
+    res = client.get("/dashboard/production/trend", params={**params, "granularity": "month"}, headers=headers)
+    assert res.status_code == 200
+
+    body = res.json()
+    assert body["granularity"] == "month"
+    assert all(date.fromisoformat(p["tanggal"]).day == 1 for p in body["data"])
+    assert sum(p["total"] for p in body["data"]) == sum(p["total"] for p in daily)
+
+
+def test_trend_granularity_outside_calendar_is_rejected():
+    """Periode di luar rentang mkalender ditolak 422 tanpa menulis ke mkalender"""
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    with SessionLocal() as db:
+        before = db.query(MKalender).count()
+    res = client.get(
+        "/dashboard/production/trend",
+        params={"start_date": "0001-01-01", "end_date": "2025-01-31", "granularity": "month"},
+        headers=headers,
+    )
+    assert res.status_code == 422
+    with SessionLocal() as db:
+        assert db.query(MKalender).count() == before
+
+
+def test_trend_max_points_downsamples_with_lttb(trend_tickets):
+    """max_points membatasi jumlah titik dan tetap menyertakan titik pertama & terakhir"""
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    params = {"start_date": (date.today() - timedelta(days=70)).isoformat(), "end_date": date.today().isoformat()}
+    daily = client.get("/dashboard/production/trend", params=params, headers=headers).json()["data"]
+    sampled = client.get(
+        "/dashboard/production/trend", params={**params, "max_points": 10}, headers=headers
+    ).json()["data"]
+
+    assert len(daily) > 10
+    assert len(sampled) == 10
+    assert sampled[0] == daily[0] and sampled[-1] == daily[-1]
+    assert all(point in daily for point in sampled)
+
+    res = client.get("/dashboard/production/trend", params={**params, "max_points": 2}, headers=headers)
+    assert res.status_code == 422
+
+
 def test_by_location_endpoint():
     """Pastikan /dashboard/production/by-location mengembalikan list di dalam key 'data'"""
     token = get_token()
@@ -65,3 +156,218 @@ def test_by_location_endpoint():
         first_item = body["data"][0]
         assert "kode_kebun" in first_item
         assert "total" in first_item
+
+
+def test_by_location_follows_kebun_aliases():
+    """
+    By-location dikelompokkan per kode kebun; alias baru di mkebunalias terbaca tanpa restart.
+    Ejaan beda huruf besar/kecil & spasi di akhir cocok sama di by-location, komposisi, dan listing.
+    """
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    params = {"start_date": (date.today() - timedelta(days=70)).isoformat(), "end_date": date.today().isoformat()}
+    alias = "ZZZ KEBUN ALIAS TEST"
+    spelling = "Zzz Kebun Alias Test  "
+    day = date.today() - timedelta(days=1)
+    with SessionLocal() as db:
+        seed_default_kebun(db)
+    kebun_directory.refreshed_at = None
+
+    with SessionLocal() as db:
+        db.add(TTbsDalam(NoTransaksi="ZZZ-ALIAS-TEST", TglTransaksiOne=day, NamaKebun=spelling, Total=1234))
+        db.commit()
+        rebuild_rekap_tbs(db, day, day)  # tanpa trigger (SQLite) rekap harian diisi manual
+    try:
+        watermarks.refreshed_at = None  # tiket baru -> buang cache tanggal tersebut
+        before = {p["kode_kebun"]: p["total"] for p in
+                  client.get("/dashboard/production/by-location", params=params, headers=headers).json()["data"]}
+
+        with SessionLocal() as db:
+            db.add(MKebunAlias(alias=alias, kode_kebun="PS1"))
+            db.commit()
+        kebun_directory.refreshed_at = None  # paksa cek mkebun pada request berikutnya
+        after = {p["kode_kebun"]: p["total"] for p in
+                 client.get("/dashboard/production/by-location", params=params, headers=headers).json()["data"]}
+        assert after["PS1"] == before.get("PS1", 0) + 1234
+
+        composition = client.get(
+            "/dashboard/production/composition", params={**params, "kode_kebun": "ps1"}, headers=headers
+        ).json()["data"]
+        assert sum(p["total"] for p in composition) == after["PS1"]
+
+        listing = client.get(
+            "/transactions/tbs-dalam", params={**params, "kode_kebun": "ps1", "limit": 500}, headers=headers
+        ).json()["data"]
+        assert "ZZZ-ALIAS-TEST" in {row["NoTransaksi"] for row in listing}
+    finally:
+        with SessionLocal() as db:
+            db.query(MKebunAlias).filter(MKebunAlias.alias == alias).delete()
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi == "ZZZ-ALIAS-TEST").delete()
+            db.commit()
+            rebuild_rekap_tbs(db, day, day)
+        kebun_directory.refreshed_at = None
+        watermarks.refreshed_at = None
+        client.get("/dashboard/production/by-location", params=params, headers=headers)
+
+
+def test_activities_endpoint_paginates_with_cursor():
+    """Pastikan /dashboard/activities urut terbaru dan next_cursor melanjutkan tanpa duplikat"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.get("/dashboard/activities", params={"limit": 5}, headers=headers)
+    assert res.status_code == 200
+
+    body = res.json()
+    assert "data" in body
+    assert "next_cursor" in body
+    first_page = body["data"]
+    assert len(first_page) <= 5
+    keys = [(a["tanggal"], a["waktu"] or "") for a in first_page]
+    assert keys == sorted(keys, reverse=True)
+
+    if body["next_cursor"]:
+        res = client.get(
+            "/dashboard/activities",
+            params={"limit": 5, "before": body["next_cursor"]},
+            headers=headers,
+        )
+        assert res.status_code == 200
+        second_page = res.json()["data"]
+        first_ids = {(a["source"], a["no_transaksi"]) for a in first_page}
+        assert not first_ids & {(a["source"], a["no_transaksi"]) for a in second_page}
+        assert (second_page[0]["tanggal"], second_page[0]["waktu"] or "") <= keys[-1]
+
+
+def test_activities_rejects_invalid_cursor():
+    """Cursor yang tidak valid menghasilkan 400"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.get("/dashboard/activities", params={"before": "bukan-cursor"}, headers=headers)
+    assert res.status_code == 400
+
+
+def test_overview_matches_individual_endpoints():
+    """Setiap bagian /dashboard/overview sama dengan endpoint widget-nya masing-masing"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.get("/dashboard/overview", headers=headers)
+    assert res.status_code == 200
+
+    data = res.json()["data"]
+    assert data["summary"] == client.get("/dashboard/summary", headers=headers).json()["data"]
+    assert data["trend"] == client.get("/dashboard/production/trend", headers=headers).json()["data"]
+    assert data["by_location"] == client.get("/dashboard/production/by-location", headers=headers).json()["data"]
+    assert data["composition"] == client.get("/dashboard/production/composition", headers=headers).json()["data"]
+
+
+def test_etag_returns_304_when_data_unchanged():
+    """Request ulang dengan If-None-Match yang sama dijawab 304 tanpa body"""
+    token = get_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.get("/dashboard/production/trend", headers=headers)
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+
+    res = client.get("/dashboard/production/trend", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+
+    # Parameter berbeda -> ETag berbeda
+    other = client.get("/dashboard/production/trend?start_date=2025-01-01", headers=headers)
+    assert other.headers["ETag"] != etag
+
+
+def test_etag_does_not_bypass_auth():
+    """Route yang butuh login tetap 401 walau ETag cocok tapi token tidak ada"""
+    token = get_token()
+    res = client.get("/dashboard/activities", headers={"Authorization": f"Bearer {token}"})
+    etag = res.headers["ETag"]
+
+    res = client.get("/dashboard/activities", headers={"If-None-Match": etag})
+    assert res.status_code == 401
+
+
+def test_new_ticket_invalidates_only_overlapping_periods():
+    """Tiket baru hanya membuang cache yang periodenya mencakup tanggal tiket tersebut"""
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    affected = {"start_date": "2020-01-01", "end_date": "2020-01-31"}
+    untouched = {"start_date": "2019-01-01", "end_date": "2019-01-31"}
+    # Watermark awal harus sudah punya MAX(NoTransaksi), juga di database kosong
+    with SessionLocal() as db:
+        db.add(TTbsDalam(NoTransaksi="ZZZ-CHANGE-BASE", TglTransaksiOne=date(2019, 6, 1), Total=1))
+        db.commit()
+    watermarks.refreshed_at = None
+    client.get("/dashboard/summary", headers=headers)
+    for params in (affected, untouched):
+        client.get("/dashboard/production/trend", params=params, headers=headers)
+
+    key = lambda p: make_cache_key("trend", start_date=date.fromisoformat(p["start_date"]),
+                                   end_date=date.fromisoformat(p["end_date"]),
+                                   granularity="day", max_points=None)
+    assert dashboard_cache.get(key(affected)) is not None
+
+    try:
+        with SessionLocal() as db:
+            db.add(TTbsDalam(NoTransaksi="ZZZ-CHANGE-TEST", TglTransaksiOne=date(2020, 1, 15), Total=1))
+            db.commit()
+        watermarks.refreshed_at = None  # paksa cek watermark pada request berikutnya
+        client.get("/dashboard/summary", headers=headers)
+
+        assert dashboard_cache.get(key(affected)) is None
+        assert dashboard_cache.get(key(untouched)) is not None
+    finally:
+        with SessionLocal() as db:
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi.like("ZZZ-CHANGE-%")).delete(synchronize_session=False)
+            db.commit()
+        watermarks.refreshed_at = None
+        client.get("/dashboard/summary", headers=headers)
+
+
+def test_concurrent_watermark_refresh_runs_once():
+    """Request bersamaan yang menemukan watermark basi hanya memicu satu refresh"""
+    marks = DataWatermarks(WATERMARK_SOURCES, refresh_seconds=60)
+    calls = []
+
+    async def slow_refresh():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        marks.refreshed_at = time.monotonic()
+
+    async def concurrent_tokens():
+        return await asyncio.gather(*(marks.token() for _ in range(5)))
+
+    marks._refresh = slow_refresh
+    tokens = asyncio.run(concurrent_tokens())
+    assert len(calls) == 1
+    assert len(set(tokens)) == 1
+
+
+def test_in_place_update_of_recent_ticket_invalidates_cache():
+    """UPDATE Total (timbang kedua) di hari yang belum final ikut membuang cache periodenya"""
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    today = date.today()
+    params = {"start_date": str(today - timedelta(days=1)), "end_date": str(today)}
+    key = make_cache_key("trend", start_date=today - timedelta(days=1), end_date=today,
+                         granularity="day", max_points=None)
+
+    with SessionLocal() as db:
+        db.add(TTbsDalam(NoTransaksi="ZZZ-UPDATE-TEST", TglTransaksiOne=today, Total=1))
+        db.commit()
+    try:
+        watermarks.refreshed_at = None
+        client.get("/dashboard/summary", headers=headers)  # watermark menyerap tiket baru
+        client.get("/dashboard/production/trend", params=params, headers=headers)
+        assert dashboard_cache.get(key) is not None
+
+        with SessionLocal() as db:
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi == "ZZZ-UPDATE-TEST").update({"Total": 5000})
+            db.commit()
+        watermarks.refreshed_at = None
+        client.get("/dashboard/summary", headers=headers)
+
+        assert dashboard_cache.get(key) is None
+    finally:
+        with SessionLocal() as db:
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi == "ZZZ-UPDATE-TEST").delete()
+            db.commit()
+        watermarks.refreshed_at = None
+        client.get("/dashboard/summary", headers=headers)
@@ -0,0 +1,108 @@
+import csv
+import gzip
+import io
+from datetime import date, time, timedelta
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import SessionLocal
+from app.models.t_tbs_dalam import TTbsDalam
+
+client = TestClient(app)
+
+VALID_USERNAME = "admin"
+VALID_PASSWORD = "secret123"
+
+
+def get_headers():
+    res = client.post(
+        "/auth/token",
+        data={"username": VALID_USERNAME, "password": VALID_PASSWORD},
+    )
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+PERIOD = {"start_date": "2000-01-01", "end_date": "2100-12-31"}
+
+
+@pytest.fixture
+def tickets():
+    """Tiket TBS milik test ini (dihapus lagi setelahnya), agar export tidak kosong di database baru"""
+    day = date.today() - timedelta(days=1)
+    rows = [
+        TTbsDalam(NoTransaksi=f"ZZZ-EXP-{i}", TglTransaksiOne=day, TimeTmbOne=time(8, i),
+                  NamaKebun="PALMA S-1", NamaProduk="TBS", Total=1000 + i)
+        for i in range(3)
+    ]
+    ids = [row.NoTransaksi for row in rows]
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+    try:
+        yield ids
+    finally:
+        with SessionLocal() as db:
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi.like("ZZZ-EXP-%")).delete(synchronize_session=False)
+            db.commit()
+
+
+def test_export_requires_login():
+    """Export data mentah hanya untuk user yang login"""
+    res = client.get("/export/ttbsdalam", params=PERIOD)
+    assert res.status_code == 401
+
+
+def test_export_csv_and_ndjson_have_same_rows(tickets):
+    """CSV dan NDJSON berisi baris yang sama, dengan header kolom sesuai model"""
+    headers = get_headers()
+    res_csv = client.get("/export/ttbsdalam", params=PERIOD, headers=headers)
+    assert res_csv.status_code == 200
+    assert res_csv.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(res_csv.text)))
+
+    res_ndjson = client.get("/export/ttbsdalam", params={**PERIOD, "format": "ndjson"}, headers=headers)
+    assert res_ndjson.status_code == 200
+    records = [orjson.loads(line) for line in res_ndjson.content.splitlines()]
+
+    assert len(rows) == len(records) > 0
+    assert set(tickets) <= {r["NoTransaksi"] for r in rows}
+    assert [r["NoTransaksi"] for r in rows] == [r["NoTransaksi"] for r in records]
+
+
+def test_export_gzip():
+    """Opsi gzip menghasilkan file .gz yang isinya sama dengan CSV biasa"""
+    headers = get_headers()
+    plain = client.get("/export/ttranspemasaran", params=PERIOD, headers=headers)
+    packed = client.get("/export/ttranspemasaran", params={**PERIOD, "gzip": True}, headers=headers)
+    assert packed.status_code == 200
+    assert packed.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(packed.content) == plain.content
+
+
+def test_export_unknown_table():
+    """Tabel di luar daftar export ditolak"""
+    res = client.get("/export/users", params=PERIOD, headers=get_headers())
+    assert res.status_code == 404
+
+
+def test_export_arrow_and_parquet(tickets):
+    """Export kolumnar memakai skema dari tipe kolom model dan isinya sama dengan CSV"""
+    headers = get_headers()
+    rows = list(csv.DictReader(io.StringIO(client.get("/export/ttbsdalam", params=PERIOD, headers=headers).text)))
+
+    res = client.get("/export/ttbsdalam", params={**PERIOD, "format": "arrow"}, headers=headers)
+    assert res.status_code == 200
+    table = pa.ipc.open_stream(res.content).read_all()
+    assert table.num_rows == len(rows)
+    assert table.schema.field("TglTransaksiOne").type == pa.date32()
+    assert pa.types.is_dictionary(table.schema.field("NamaKebun").type)
+    assert table.column("NoTransaksi").to_pylist() == [r["NoTransaksi"] for r in rows]
+
+    res = client.get("/export/ttbsdalam", params={**PERIOD, "format": "parquet"}, headers=headers)
+    assert res.status_code == 200
+    assert pq.read_table(io.BytesIO(res.content)).equals(table)
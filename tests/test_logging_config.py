@@ -0,0 +1,45 @@
+import logging
+import queue
+
+import orjson
+
+from app.core.logging_config import DroppingQueueHandler, JsonFormatter, SamplingFilter
+
+
+def make_record(name="APN-Riau", level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    """Record JSON berisi pesan terformat plus field `extra` (route, status, cache, ...)"""
+    record = make_record(route="/dashboard/trend", status=200, duration_ms=1.5, cache="hit")
+    data = orjson.loads(JsonFormatter().format(record))
+
+    assert data["msg"] == "hello world"
+    assert data["level"] == "INFO"
+    assert data["logger"] == "APN-Riau"
+    assert data["route"] == "/dashboard/trend"
+    assert data["status"] == 200
+    assert data["cache"] == "hit"
+
+
+def test_sampling_filter_only_samples_info():
+    """INFO dari logger bervolume tinggi disampling; WARNING selalu lolos"""
+    sampler = SamplingFilter({"APN-Riau.cache": 0.0})
+
+    assert not sampler.filter(make_record(name="APN-Riau.cache"))
+    assert sampler.filter(make_record(name="APN-Riau.cache", level=logging.WARNING))
+    assert sampler.filter(make_record(name="APN-Riau.dashboard"))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """Antrean penuh: record dibuang dan dihitung, caller tidak pernah menunggu"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().msg == "hello world"
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import create_engine, literal, select
+
+from app.services.mapping_kebun import KebunDirectory, kebun_key, normalize_alias
+
+
+def make_directory():
+    directory = KebunDirectory(refresh_seconds=60)
+    directory.load((
+        ("PS1", "PALMA S-1", "PALMA S-1", "palma s-1"),
+        ("PS1", "PALMA S-1", "Palma S1", "palma s1"),
+        ("PS2", "PALMA S-2", "PALMA S-2", "palma s-2"),
+    ))
+    return directory
+
+
+@pytest.mark.parametrize("nama", ["PALMA S-1", "palma s-1  ", "Banyu Bening Utama 2 ", " KAT1", ""])
+def test_normalize_alias_matches_sql_key(nama):
+    """Aturan Python (agregat parsial) sama dengan kunci SQL yang dipakai join by-location"""
+    with create_engine("sqlite://").connect() as conn:
+        assert conn.scalar(select(kebun_key(literal(nama)))) == normalize_alias(nama)
+
+
+def test_nama_and_kode_filters_are_combined():
+    """nama_kebun + kode_kebun: nama harus alias dari kode, selain itu hasilnya kosong"""
+    directory = make_directory()
+    assert directory.names_for("PS1", "palma s1 ") == ["palma s1 "]
+    assert directory.names_for("PS2", "PALMA S-1") == []
+    assert directory.names_for("PS1") == ["PALMA S-1", "Palma S1"]
+    assert directory.names_for(None, "PALMA S-1") == ["PALMA S-1"]
+    assert directory.names_for(None, None) is None
@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram, statement_labels
+from app.main import app
+
+client = TestClient(app)
+
+VALID_USERNAME = "admin"
+VALID_PASSWORD = "secret123"
+
+
+def get_token():
+    res = client.post(
+        "/auth/token",
+        data={"username": VALID_USERNAME, "password": VALID_PASSWORD},
+    )
+    assert res.status_code == 200
+    return res.json()["access_token"]
+
+
+def test_metrics_use_route_templates():
+    """Latency dicatat per template route (bukan path mentah), plus cache & statement DB"""
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    client.get("/export/tabel_tidak_ada_1", params={"start_date": "2025-01-01", "end_date": "2025-01-02"}, headers=headers)
+    client.get("/export/tabel_tidak_ada_2", params={"start_date": "2025-01-01", "end_date": "2025-01-02"}, headers=headers)
+    client.get("/dashboard/summary", params={"start_date": "2025-01-01", "end_date": "2025-01-31"}, headers=headers)
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = res.text
+
+    assert 'route="/export/{table}"' in body
+    assert "tabel_tidak_ada" not in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/dashboard/summary",status="200"}' in body
+    assert 'cache_hits_total{cache="dashboard"}' in body
+    assert 'db_statement_duration_seconds_bucket{engine=' in body
+    assert "http_requests_in_flight" in body
+
+
+def test_histogram_buckets_are_cumulative():
+    """Bucket histogram kumulatif dan _count sama dengan bucket +Inf"""
+    histogram = Histogram("t_seconds", "test", labels=("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/x")
+    lines = histogram.render()
+
+    assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/x",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{route="/x"} 3' in lines
+
+
+def test_statement_labels_bounded():
+    """Label statement hanya memakai operasi SQL umum dan nama tabel model yang dikenal"""
+    tables = {"ttbsdalam"}
+    assert statement_labels("SELECT * FROM ttbsdalam WHERE x = 1", tables) == ("SELECT", "ttbsdalam")
+    assert statement_labels("SELECT * FROM tmp_12345", tables) == ("SELECT", "other")
+    assert statement_labels("PRAGMA foo", tables) == ("OTHER", "other")
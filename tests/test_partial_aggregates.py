@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+
+from app.core.cache import LRUTTLCache
+from app.services.partial_aggregates import (
+    CPO,
+    TBS,
+    CpoAggregate,
+    PartialAggregateStore,
+    split_period,
+)
+
+
+def make_store():
+    return PartialAggregateStore(
+        LRUTTLCache(name="test", max_entries=1000, max_bytes=10_000_000, default_ttl=60)
+    )
+
+
+def test_split_period_uses_closed_months():
+    """Bulan penuh yang sudah lewat jadi satu potongan, sisanya per hari"""
+    pieces = split_period(date(2025, 1, 30), date(2025, 3, 2), today=date(2025, 6, 1))
+    assert pieces == [
+        (date(2025, 1, 30), date(2025, 1, 30)),
+        (date(2025, 1, 31), date(2025, 1, 31)),
+        (date(2025, 2, 1), date(2025, 2, 28)),
+        (date(2025, 3, 1), date(2025, 3, 1)),
+        (date(2025, 3, 2), date(2025, 3, 2)),
+    ]
+
+
+def test_split_period_keeps_open_month_per_day():
+    """Bulan berjalan tidak boleh digabung menjadi potongan bulan"""
+    pieces = split_period(date(2025, 6, 1), date(2025, 6, 30), today=date(2025, 6, 15))
+    assert len(pieces) == 30
+
+
+def test_cpo_merge_keeps_exact_average():
+    """Rata-rata FFA hasil merge sama dengan rata-rata langsung"""
+    values = {date(2025, 1, 1): [3.0, 4.0, 5.0], date(2025, 1, 2): [2.0]}
+    parts = [
+        CpoAggregate(total_terjual=10, ffa_sum=sum(v), ffa_count=len(v), ffa_min=min(v), ffa_max=max(v))
+        for v in values.values()
+    ]
+    merged = CpoAggregate.merge(parts)
+    all_values = [x for v in values.values() for x in v]
+
+    assert merged.total_terjual == 20
+    assert merged.rata_rata_ffa == sum(all_values) / len(all_values)
+    assert merged.ffa_min == 2.0
+    assert merged.ffa_max == 5.0
+
+
+def test_merge_order_does_not_depend_on_cache_state():
+    """Potongan digabung kronologis, jadi hasil float sama baik cache kosong maupun sebagian terisi"""
+    start = date.today() - timedelta(days=10)
+    days = [start + timedelta(days=i) for i in range(3)]
+    rows = [(d, 1, ffa, 1, ffa, ffa) for d, ffa in zip(days, [1e16, 1.0, -1e16])]
+
+    cold = make_store()
+    expected = cold.fill(cold.plan(CPO, days[0], days[-1]), rows)
+
+    warm = make_store()
+    warm.fill(warm.plan(CPO, days[-1], days[-1]), rows[-1:])
+    merged = warm.fill(warm.plan(CPO, days[0], days[-1]), rows[:-1])
+    assert merged.ffa_sum == expected.ffa_sum
+
+
+def test_shifted_period_only_queries_missing_days():
+    """Menggeser periode satu hari hanya membutuhkan satu hari baru dari database"""
+    store = make_store()
+    end = date.today()
+    start = end - timedelta(days=29)
+    rows = [(start + timedelta(days=i), "PALMA S-1", "TBS", 100) for i in range(30)]
+
+    plan = store.plan(TBS, start, end)
+    first = store.fill(plan, rows)
+    assert first.total == 3000
+    assert first.jumlah_hari == 30
+
+    shifted = store.plan(TBS, start - timedelta(days=1), end - timedelta(days=1))
+    assert shifted.missing_spans == [(start - timedelta(days=1), start - timedelta(days=1))]
+
+    second = store.fill(shifted, [])
+    assert second.total == 2900
+    assert second.totals == {("PALMA S-1", "TBS"): 2900}
+
+
+def test_empty_days_are_cached():
+    """Hari tanpa transaksi tetap disimpan agar tidak di-query ulang"""
+    store = make_store()
+    day = date.today() - timedelta(days=3)
+    store.fill(store.plan(CPO, day, day), [])
+
+    assert store.plan(CPO, day, day).missing == []
+
+
+def test_only_edge_months_are_cached_per_day():
+    """Bulan di tengah periode panjang tidak disimpan per hari (cukup potongan bulan)"""
+    store = make_store()
+    start = date(2024, 1, 1)
+    end = date(2024, 12, 31)
+    store.fill(store.plan(TBS, start, end), [])
+
+    # 12 potongan bulan + per hari untuk Januari dan Desember saja
+    assert store.cache.stats()["entries"] == 12 + 31 + 31
+    assert store.plan(TBS, date(2024, 1, 2), date(2024, 12, 30)).missing == []
+    assert store.plan(TBS, date(2024, 6, 2), date(2024, 6, 2)).missing == [(date(2024, 6, 2), date(2024, 6, 2))]
@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+
+from app.core.pool_metrics import PoolTelemetry, timed_queue_pool
+
+
+def test_pool_telemetry_tracks_checkout_and_wait(tmp_path):
+    """Telemetri mencatat connect, checkout/checkin, dan waktu tunggu koneksi"""
+    telemetry = PoolTelemetry("test")
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=timed_queue_pool(telemetry),
+        pool_size=2,
+        max_overflow=1,
+    )
+    telemetry.attach(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        during = telemetry.snapshot()
+    after = telemetry.snapshot()
+    engine.dispose()
+
+    assert during["checked_out"] == 1
+    assert after["checked_out"] == 0
+    assert after["connects"] == 1
+    assert after["checkouts"] == after["checkins"] == 1
+    assert after["acquire"]["count"] == 1
+    assert after["pool_class"] == "TimedQueuePool"
+
+
+def test_invalidated_connections_are_counted(tmp_path):
+    """Koneksi yang di-invalidate (mis. putus dari server) ikut terhitung"""
+    telemetry = PoolTelemetry("test")
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=timed_queue_pool(telemetry))
+    telemetry.attach(engine)
+
+    with engine.connect() as conn:
+        conn.invalidate()
+    engine.dispose()
+
+    assert telemetry.snapshot()["invalidations"] == 1
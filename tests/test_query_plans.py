@@ -0,0 +1,123 @@
+"""
+Regresi rencana query dashboard: setiap statement yang dipakai endpoint
+/dashboard di-EXPLAIN terhadap database seed (benchmarks/datagen.py) dan gagal
+bila ada full table scan atau sort (filesort / temp B-tree). Index yang
+dibutuhkan dideklarasikan di model dan di migrasi Alembic; test ini menjaga
+keduanya tetap cocok dengan query.
+
+Database-nya khusus untuk test ini (isinya dikosongkan lalu di-generate ulang):
+SQLite sementara, atau QUERY_PLAN_DATABASE_URL untuk memeriksa rencana MySQL.
+"""
+import os
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.core.config import settings
+from app.core.slow_query import explain_statement
+from app.routers.dashboard import ACTIVITY_SOURCES, activity_branch
+from app.services.calendar import GRANULARITY_COLUMNS, bucket_totals_statement
+from app.services.mapping_kebun import kebun_totals_statement
+from app.services.partial_aggregates import cpo_partials_statement, tbs_partials_statement
+from benchmarks.datagen import generate
+
+END = date.today()
+START = END - timedelta(days=70)
+# Sebagian periode sudah ada di cache parsial -> beberapa span dengan celah
+SPANS = [(START, START + timedelta(days=30)), (END - timedelta(days=5), END)]
+CURSOR = {"tanggal": END, "waktu": time(12, 0), "urutan": 1, "no_transaksi": "T000500"}
+SEED_ROWS = 10_000
+SEED_DAYS = 365
+
+
+def dashboard_statements() -> dict:
+    """nama -> (statement, index yang wajib dipakai atau None bila cukup bebas scan & sort)."""
+    cpo_index = "idx_ttranspemasaran_produk_tgl_cover"
+    statements = {
+        "tbs_partials": (tbs_partials_statement([(START, END)]), None),
+        "tbs_partials_gaps": (tbs_partials_statement(SPANS), None),
+        "cpo_partials": (cpo_partials_statement([(START, END)]), cpo_index),
+        "cpo_partials_gaps": (cpo_partials_statement(SPANS), cpo_index),
+        "by_location": (kebun_totals_statement(START, END), "idx_ttbsdalamharian_kebunkey_tgl_cover"),
+    }
+    for granularity, column in GRANULARITY_COLUMNS.items():
+        statements[f"trend_{granularity}"] = (
+            bucket_totals_statement(granularity, START, END, settings.FISCAL_YEAR_START_MONTH),
+            f"idx_mkalender_{column}_tanggal",
+        )
+    for source in ACTIVITY_SOURCES:
+        index = f"idx_{source[5].table.name}_tgl_time_desc"
+        statements[f"activities_{source[0]}"] = (activity_branch(source, 20, None), index)
+        statements[f"activities_{source[0]}_cursor"] = (activity_branch(source, 20, CURSOR), index)
+    return statements
+
+
+def explain(conn, statement) -> list[dict]:
+    """Jalankan statement, lalu EXPLAIN SQL & parameter persis seperti yang dikirim ke driver."""
+    executed = []
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        executed.append((sql, parameters))
+
+    event.listen(conn, "before_cursor_execute", capture)
+    try:
+        conn.execute(statement).all()
+    finally:
+        event.remove(conn, "before_cursor_execute", capture)
+    return explain_statement(conn, *executed[-1])
+
+
+def plan_problems(dialect: str, plan: list[dict]) -> list[str]:
+    problems = []
+    for row in plan:
+        if dialect == "sqlite":
+            detail = row["detail"]
+            # "SCAN t USING [COVERING] INDEX" = baca index berurutan (mis. top-N), bukan full scan
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                problems.append(f"full scan: {detail}")
+            if "TEMP B-TREE" in detail:
+                problems.append(f"sort: {detail}")
+        else:
+            extra = row.get("Extra") or ""
+            if row.get("type") == "ALL":
+                problems.append(f"full scan: {row.get('table')}")
+            if "Using filesort" in extra or "Using temporary" in extra:
+                problems.append(f"sort: {row.get('table')} ({extra})")
+    return problems
+
+
+def uses_index(dialect: str, plan: list[dict], index: str) -> bool:
+    if dialect == "sqlite":
+        return any(f" INDEX {index} " in f"{row['detail']} " for row in plan)
+    return any(row.get("key") == index for row in plan)
+
+
+@pytest.fixture(scope="module")
+def analyzed_db(tmp_path_factory):
+    """
+    Database dengan data fakta + rekap harian + dimensi dari generator benchmark
+    (seed tetap) dan statistik planner terbaru, agar rencana query deterministik.
+    """
+    url = os.environ.get("QUERY_PLAN_DATABASE_URL") or f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    plan_engine = create_engine(url)
+    if plan_engine.dialect.name not in ("sqlite", "mysql"):
+        pytest.skip(f"EXPLAIN untuk {plan_engine.dialect.name} tidak didukung test ini")
+    generate(url, SEED_ROWS, SEED_DAYS, END, seed=42, truncate=True)
+    if plan_engine.dialect.name == "mysql":
+        with plan_engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE TABLE TTbsDalam, ttbsdalamharian, TTransPemasaran, mkebunalias, mkalender")
+    yield plan_engine
+    plan_engine.dispose()
+
+
+@pytest.mark.parametrize("name", list(dashboard_statements()))
+def test_dashboard_query_uses_indexes(analyzed_db, name):
+    """Query dashboard tidak boleh full scan maupun sort; tambahkan index bila query berubah"""
+    statement, index = dashboard_statements()[name]
+    with analyzed_db.connect() as conn:
+        plan = explain(conn, statement)
+        problems = plan_problems(conn.dialect.name, plan)
+        if index and not uses_index(conn.dialect.name, plan, index):
+            problems.append(f"index {index} tidak dipakai")
+    assert not problems, f"{name}: {problems}\nplan: {plan}"
@@ -0,0 +1,106 @@
+from datetime import date, time, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.database import SessionLocal
+from app.models.t_tbs_dalam import TTbsDalam
+from app.services.mapping_kebun import kebun_directory, seed_default_kebun
+
+client = TestClient(app)
+
+VALID_USERNAME = "admin"
+VALID_PASSWORD = "secret123"
+
+
+def get_headers():
+    res = client.post(
+        "/auth/token",
+        data={"username": VALID_USERNAME, "password": VALID_PASSWORD},
+    )
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+@pytest.fixture
+def tickets():
+    """Tiket TBS milik test ini (dihapus lagi setelahnya), agar tidak bergantung data lokal"""
+    day = date.today() - timedelta(days=1)
+    rows = [
+        TTbsDalam(NoTransaksi="ZZZ-TRX-1", TglTransaksiOne=day, TimeTmbOne=time(8, 0),
+                  NamaKebun="ZZZ KEBUN TRX", NamaProduk="ZZZ PRODUK A", Total=1000),
+        TTbsDalam(NoTransaksi="ZZZ-TRX-2", TglTransaksiOne=day, TimeTmbOne=time(9, 0),
+                  NamaKebun="ZZZ KEBUN TRX", NamaProduk="ZZZ PRODUK B", Total=2000),
+        TTbsDalam(NoTransaksi="ZZZ-TRX-3", TglTransaksiOne=day, TimeTmbOne=time(10, 0),
+                  NamaKebun="PALMA S-1", NamaProduk="ZZZ PRODUK A", Total=3000),
+    ]
+    ids = [row.NoTransaksi for row in rows]
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+    try:
+        yield ids
+    finally:
+        with SessionLocal() as db:
+            db.query(TTbsDalam).filter(TTbsDalam.NoTransaksi.like("ZZZ-TRX-%")).delete(synchronize_session=False)
+            db.commit()
+
+
+def test_listing_requires_login():
+    """Listing transaksi hanya untuk user yang login"""
+    res = client.get("/transactions/tbs-dalam")
+    assert res.status_code == 401
+
+
+def test_keyset_pages_cover_all_rows_without_overlap(tickets):
+    """Menelusuri semua halaman lewat next_cursor menghasilkan urutan yang sama dengan satu halaman besar"""
+    headers = get_headers()
+    full = client.get("/transactions/tbs-dalam", params={"limit": 500}, headers=headers).json()["data"]
+
+    collected, cursor = [], None
+    while True:
+        params = {"limit": 7, **({"before": cursor} if cursor else {})}
+        body = client.get("/transactions/tbs-dalam", params=params, headers=headers).json()
+        collected.extend(body["data"])
+        cursor = body["next_cursor"]
+        if not cursor or len(collected) >= len(full):
+            break
+
+    collected = collected[:len(full)]
+    assert [r["NoTransaksi"] for r in collected] == [r["NoTransaksi"] for r in full]
+    assert len({r["NoTransaksi"] for r in collected}) == len(collected)
+
+
+def test_listing_filters(tickets):
+    """Filter kebun & produk hanya mengembalikan baris yang sesuai"""
+    headers = get_headers()
+    params = {"nama_kebun": "ZZZ KEBUN TRX", "nama_produk": "ZZZ PRODUK A", "limit": 50}
+    rows = client.get("/transactions/tbs-dalam", params=params, headers=headers).json()["data"]
+    assert [r["NoTransaksi"] for r in rows] == ["ZZZ-TRX-1"]
+
+
+def test_listing_filters_by_kode_kebun(tickets):
+    """kode_kebun memfilter semua alias NamaKebun untuk kode tersebut; kode tidak dikenal -> kosong"""
+    headers = get_headers()
+    with SessionLocal() as db:
+        seed_default_kebun(db)
+    kebun_directory.refreshed_at = None
+
+    res = client.get("/transactions/tbs-dalam", params={"kode_kebun": "ps1", "limit": 50}, headers=headers)
+    assert res.status_code == 200
+    assert res.json()["filters"]["kode_kebun"] == "PS1"
+    data = res.json()["data"]
+    assert "ZZZ-TRX-3" in {row["NoTransaksi"] for row in data}
+    assert all(row["NamaKebun"] == "PALMA S-1" for row in data)
+
+    res = client.get("/transactions/tbs-dalam", params={"kode_kebun": "XXX"}, headers=headers)
+    assert res.json()["data"] == []
+
+
+def test_cursor_is_bound_to_its_table(tickets):
+    """Cursor dari satu tabel ditolak di endpoint tabel lain"""
+    headers = get_headers()
+    cursor = client.get("/transactions/tbs-dalam", params={"limit": 1}, headers=headers).json()["next_cursor"]
+    assert cursor
+    res = client.get("/transactions/pemasaran", params={"before": cursor}, headers=headers)
+    assert res.status_code == 400